@@ -0,0 +1,335 @@
+"""
+Module d'analyse du corpus par lots, pour les corpus plus grands que la mémoire.
+
+L'analyse en mémoire de data_visualisation charge tout le corpus et l'enrichit
+colonne après colonne. Ici le corpus est lu par lots de taille fixe et chaque lot
+n'alimente que des agrégats courants, si bien que la mémoire dépend de la taille
+des lots (et du vocabulaire, ou du nombre de colonnes d'un modèle TF-IDF en mode
+'hachage'), pas de celle du corpus :
+
+- moments des colonnes numériques (effectif, moyenne, minimum, maximum et
+  co-moments), d'où les statistiques de tokens et la matrice de corrélation ;
+- fréquences des termes par corpus, d'où la loi de Zipf et les termes fréquents ;
+- effectifs des catégories et comptes de la matrice de confusion de chaque seuil
+  de similarité cosine d'une grille fixe (evaluation_seuil), d'où la courbe
+  précision-rappel, le meilleur seuil et les métriques du seuil demandé ;
+- échantillon réservoir de taille fixe pour les nuages de points et l'histogramme.
+
+La similarité cosine TF-IDF demande l'IDF de tout le corpus : une première passe
+n'accumule que les fréquences documentaires, la seconde calcule les statistiques
+et les similarités lot par lot. Les comptes de termes sont tenus par le modèle
+TF-IDF persistant, si bien que la seconde passe ne retokenise rien. Seules les
+colonnes numériques dérivées, avec l'identifiant et la catégorie, sont écrites,
+lot après lot : le fichier reste lisible par evaluation_seuil.
+
+Un corpus JSON (et non JSON Lines ou Parquet) est lu en entier par le décodeur
+JSON avant d'être découpé en lots.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from evaluation_seuil import (
+    CATEGORIE_POSITIVE,
+    GRILLE_SEUILS,
+    comptes_au_dessus,
+    confusion_du_seuil,
+    courbe_depuis_comptes,
+    etiquettes_reelles,
+    precision_rappel_f1,
+)
+from metriques import compter, instrumenter
+from statistiques_texte import (
+    CORPUS,
+    ajouter_statistiques,
+    similarite_cosine_appariee,
+    termes_les_plus_frequents,
+    trier_frequences,
+)
+
+TAILLE_LOT = 10000
+
+# Colonnes écrites par l'analyse par lots, après l'identifiant
+COLONNES_NUMERIQUES = ['article_tokens', 'description_tokens', 'article_length', 'description_length',
+                       'compression_ratio', 'token_difference', 'cosine_similarity']
+
+# Colonnes de l'échantillon réservoir des figures
+COLONNES_ECHANTILLON = ['article_tokens', 'description_tokens', 'token_difference', 'cosine_similarity']
+
+# Colonnes du fichier de sortie : la catégorie sert d'étiquette à evaluation_seuil
+COLONNES_SORTIE = ['id', 'category'] + COLONNES_NUMERIQUES
+
+class MomentsCourants:
+    """
+    Effectif, moyennes, extrêmes et co-moments de colonnes numériques, lot par lot.
+
+    Les lots sont fusionnés par la formule de Chan et al., numériquement stable :
+    les co-moments d'un lot sont calculés autour de sa propre moyenne.
+    """
+
+    def __init__(self, colonnes):
+        """
+        Args:
+            colonnes (list): Noms des colonnes suivies.
+        """
+        self.colonnes = list(colonnes)
+        k = len(self.colonnes)
+        self.n = 0
+        self.moyennes = np.zeros(k)
+        self.co_moments = np.zeros((k, k))
+        self.minimums = np.full(k, np.inf)
+        self.maximums = np.full(k, -np.inf)
+
+    def ajouter(self, valeurs):
+        """
+        Ajouter un lot de lignes ; les lignes comportant une valeur non finie sont ignorées.
+
+        Args:
+            valeurs (numpy.ndarray): Tableau (lignes × colonnes).
+        """
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        valeurs = valeurs[np.isfinite(valeurs).all(axis=1)]
+        m = len(valeurs)
+        if m == 0:
+            return
+        moyennes = valeurs.mean(axis=0)
+        centrees = valeurs - moyennes
+        co_moments = centrees.T @ centrees
+        ecart = moyennes - self.moyennes
+        n = self.n + m
+        self.co_moments += co_moments + np.outer(ecart, ecart) * self.n * m / n
+        self.moyennes += ecart * m / n
+        self.n = n
+        self.minimums = np.minimum(self.minimums, valeurs.min(axis=0))
+        self.maximums = np.maximum(self.maximums, valeurs.max(axis=0))
+
+    def ecarts_types(self):
+        """
+        Returns:
+            numpy.ndarray: Écart-type (corrigé, comme pandas) de chaque colonne.
+        """
+        if self.n < 2:
+            return np.full(len(self.colonnes), np.nan)
+        return np.sqrt(np.diag(self.co_moments) / (self.n - 1))
+
+    def correlations(self):
+        """
+        Returns:
+            DataFrame: Matrice de corrélation de Pearson des colonnes.
+        """
+        normes = np.sqrt(np.diag(self.co_moments))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlations = self.co_moments / np.outer(normes, normes)
+        return pd.DataFrame(correlations, index=self.colonnes, columns=self.colonnes)
+
+    def resume(self):
+        """
+        Returns:
+            DataFrame: Effectif, moyenne, écart-type, minimum et maximum de chaque colonne.
+        """
+        return pd.DataFrame({
+            'count': self.n,
+            'mean': self.moyennes,
+            'std': self.ecarts_types(),
+            'min': self.minimums,
+            'max': self.maximums,
+        }, index=self.colonnes)
+
+
+class Reservoir:
+    """
+    Échantillon uniforme de taille fixe des lignes d'un flux (algorithme R, vectorisé par lot).
+    """
+
+    def __init__(self, taille, colonnes, graine=0):
+        """
+        Args:
+            taille (int): Nombre maximal de lignes gardées.
+            colonnes (list): Noms des colonnes.
+            graine (int, optional): Graine du tirage. Par défaut à 0.
+        """
+        self.taille = taille
+        self.colonnes = list(colonnes)
+        self.vues = 0
+        self._valeurs = np.empty((0, len(self.colonnes)))
+        self._generateur = np.random.default_rng(graine)
+
+    def ajouter(self, valeurs):
+        """
+        Proposer un lot de lignes à l'échantillon.
+
+        Args:
+            valeurs (numpy.ndarray): Tableau (lignes × colonnes).
+        """
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        libres = max(0, min(self.taille - len(self._valeurs), len(valeurs)))
+        if libres:
+            self._valeurs = np.concatenate([self._valeurs, valeurs[:libres]])
+        # Chaque ligne suivante remplace une ligne tirée au hasard avec la probabilité taille / rang
+        rangs = self.vues + np.arange(libres, len(valeurs)) + 1
+        tirages = self._generateur.integers(0, rangs) if len(rangs) else rangs
+        remplacees = np.flatnonzero(tirages < self.taille)
+        # En cas de tirages identiques, la ligne la plus récente l'emporte, comme en séquentiel
+        positions, derniers = np.unique(tirages[remplacees][::-1], return_index=True)
+        self._valeurs[positions] = valeurs[libres:][remplacees[::-1][derniers]]
+        self.vues += len(valeurs)
+
+    def colonne(self, nom):
+        """
+        Returns:
+            numpy.ndarray: Valeurs échantillonnées d'une colonne.
+        """
+        return self._valeurs[:, self.colonnes.index(nom)]
+
+
+class AnalyseParLots:
+    """
+    Agrégats d'une analyse par lots, avec l'interface de termes fréquents de StatistiquesTexte.
+    """
+
+    def __init__(self, vocabulaire, frequences, moments, categories, courbe, echantillon, seuil):
+        """
+        Args:
+            vocabulaire (numpy.ndarray): Terme de chaque colonne des fréquences.
+            frequences (dict): Fréquence de chaque terme, par corpus.
+            moments (MomentsCourants): Moments des colonnes numériques.
+            categories (Counter): Effectif de chaque catégorie de différence de tokens.
+            courbe (DataFrame): Courbe précision-rappel sur la grille des seuils.
+            echantillon (Reservoir): Échantillon des lignes pour les figures.
+            seuil (float): Seuil de similarité cosine évalué.
+        """
+        self.vocabulaire = vocabulaire
+        self._frequences = frequences
+        self.moments = moments
+        self.categories = categories
+        self.courbe = courbe
+        self.confusion = confusion_du_seuil(courbe, seuil)
+        self.echantillon = echantillon
+        self.seuil = seuil
+
+    @property
+    def nombre(self):
+        """Nombre d'articles analysés."""
+        return sum(self.categories.values())
+
+    def frequences(self, corpus):
+        """
+        Returns:
+            numpy.ndarray: Fréquence de chaque terme du vocabulaire dans un corpus.
+        """
+        return self._frequences[corpus]
+
+    def frequences_triees(self, corpus):
+        """
+        Returns:
+            list: Couples (terme, fréquence) d'un corpus, du plus fréquent au moins fréquent.
+        """
+        return trier_frequences(self.frequences(corpus), self.vocabulaire)
+
+    def termes_frequents(self, n=20, corpus=CORPUS, mots_vides=None):
+        """
+        Extraire les n termes les plus fréquents de plusieurs corpus, comme StatistiquesTexte.
+
+        Returns:
+            dict: Pour chaque corpus, liste de couples (terme, fréquence).
+        """
+        masque = np.isin(self.vocabulaire, list(mots_vides)) if mots_vides is not None else None
+        return {nom: termes_les_plus_frequents(self.frequences(nom), self.vocabulaire, n, masque) for nom in corpus}
+
+    def metriques(self):
+        """
+        Returns:
+            tuple: Précision, rappel et F-mesure du seuil de similarité cosine.
+        """
+        return precision_rappel_f1(self.confusion)
+
+
+def _etendre(valeurs, taille):
+    if len(valeurs) >= taille:
+        return valeurs
+    etendues = np.zeros(taille, dtype=valeurs.dtype)
+    etendues[:len(valeurs)] = valeurs
+    return etendues
+
+
+def _comptes_lot(modele, lot):
+    return modele.comptes(pd.concat([lot['article'], lot['description']], ignore_index=True))
+
+
+@instrumenter(elements=lambda analyse: analyse.nombre)
+def analyser_par_lots(lots, modele, sortie=None, seuil=0.5, max_points=20000, graine=0):
+    """
+    Analyser un corpus lot par lot en deux passes, en mémoire bornée.
+
+    Args:
+        lots (callable): Fonction sans argument qui renvoie un nouvel itérable sur
+            les lots du corpus (DataFrame avec id, article et description), par
+            exemple lambda: lire_par_lots(chemin, taille_lot).
+        modele (ModeleTfidf): Modèle TF-IDF persistant ; en mode 'hachage', la mémoire
+            ne dépend plus du vocabulaire du corpus.
+        sortie (str, optional): Fichier CSV des colonnes numériques et de la catégorie,
+            par identifiant. Par défaut rien n'est écrit.
+        seuil (float, optional): Seuil de similarité cosine évalué. Par défaut à 0,5.
+        max_points (int, optional): Taille de l'échantillon des figures. Par défaut à 20000.
+        graine (int, optional): Graine de l'échantillon. Par défaut à 0.
+
+    Returns:
+        AnalyseParLots: Agrégats du corpus.
+    """
+
+    # Première passe : fréquences documentaires et fréquences des termes, comme
+    # TfidfTransformer sur la matrice empilée des articles et des descriptions
+    nombre_documents = 0
+    df = np.zeros(0, dtype=np.int64)
+    frequences = {corpus: np.zeros(0, dtype=np.int64) for corpus in CORPUS}
+    for lot in lots():
+        comptes = _comptes_lot(modele, lot)
+        n = len(lot)
+        df = _etendre(df, comptes.shape[1])
+        df += np.bincount(comptes.indices, minlength=comptes.shape[1])
+        for corpus, lignes in zip(CORPUS, (comptes[:n], comptes[n:])):
+            frequences[corpus] = _etendre(frequences[corpus], comptes.shape[1])
+            frequences[corpus] += np.asarray(lignes.sum(axis=0)).ravel()
+        nombre_documents += comptes.shape[0]
+        modele.vider_cache()
+    idf = np.log((1 + nombre_documents) / (1 + df)) + 1
+
+    # Seconde passe : statistiques par article, similarités et agrégats
+    moments = MomentsCourants(COLONNES_NUMERIQUES)
+    echantillon = Reservoir(max_points, COLONNES_ECHANTILLON, graine)
+    categories = Counter()
+    seuils = np.union1d(GRILLE_SEUILS, [seuil])
+    vrais_positifs = np.zeros(len(seuils), dtype=np.int64)
+    faux_positifs = np.zeros(len(seuils), dtype=np.int64)
+    premier = True
+    for lot in lots():
+        lot = ajouter_statistiques(lot.reset_index(drop=True))
+        comptes = _comptes_lot(modele, lot)
+        modele.vider_cache()
+        n = len(lot)
+        ponderes = comptes.astype(np.float64) @ sp.diags(idf[:comptes.shape[1]])
+        lot['cosine_similarity'] = similarite_cosine_appariee(ponderes[:n], ponderes[n:])
+
+        moments.ajouter(lot[COLONNES_NUMERIQUES].to_numpy(dtype=np.float64))
+        echantillon.ajouter(lot[COLONNES_ECHANTILLON].to_numpy(dtype=np.float64))
+        categories.update(lot['category'].value_counts(sort=False).to_dict())
+        vp, fp = comptes_au_dessus(lot['cosine_similarity'], etiquettes_reelles(lot['category']), seuils)
+        vrais_positifs += vp
+        faux_positifs += fp
+        if sortie is not None:
+            lot[COLONNES_SORTIE].to_csv(sortie, mode='w' if premier else 'a', header=premier, index=False)
+        premier = False
+        compter('analyse_lots')
+
+    if premier and sortie is not None:
+        pd.DataFrame(columns=COLONNES_SORTIE).to_csv(sortie, index=False)
+    positifs = categories[CATEGORIE_POSITIVE]
+    courbe = courbe_depuis_comptes(seuils, vrais_positifs, faux_positifs, positifs,
+                                   sum(categories.values()) - positifs)
+    vocabulaire = modele.vocabulaire()
+    return AnalyseParLots(vocabulaire, {corpus: _etendre(valeurs, len(vocabulaire))
+                                        for corpus, valeurs in frequences.items()},
+                          moments, categories, courbe, echantillon, seuil)
@@ -0,0 +1,349 @@
+"""
+Banc d'essai des chemins chauds de la chaîne, sur des corpus synthétiques.
+
+Pour chaque taille de corpus (1 000, 10 000, 100 000, 1 000 000 d'articles...),
+un corpus français synthétique est généré une fois par corpus_synthetique et
+gardé en cache, puis les étapes coûteuses de la chaîne sont chronométrées (la
+meilleure de plusieurs passes, en durée et en temps CPU) :
+
+- chargement du corpus JSON Lines ;
+- découpage train/test/dev aléatoire (split_dataset) et par empreinte (split_dataset_hash) ;
+- passe de statistiques (calculer_statistiques), qui vectorise le corpus, et termes
+  fréquents (termes_frequents, l'ancien get_top_n_words) sur sa matrice de comptes,
+  sommes par colonne comprises ;
+- pondération TF-IDF et similarité cosine article/description (similarite_cosine_appariee) ;
+- longueur moyenne des phrases (longueurs_moyennes_phrases), avec le tokeniseur
+  regex et, si un modèle est installé, avec spaCy sur un sous-ensemble.
+
+La similarité cosine appariée est aussi comparée à la diagonale de
+cosine_similarity(a, b) de scikit-learn, par blocs de lignes : l'écart maximal
+est rapporté et doit rester sous 1e-12.
+
+Le scraper est mesuré sans réseau sur un site statique synthétique servi en local :
+extraction seule des pages d'article, scraper_article en HTTP sur la boucle locale,
+et crawl complet (crawler_concurrent) des pages de rubrique.
+
+Les résultats sont écrits au format de metriques (sections nommées banc[taille])
+et comparés à un fichier de référence propre à la machine ; le script termine en
+erreur si une mesure régresse au-delà du seuil.
+
+Usage :
+    python bench_chaine.py --tailles 1000 10000 [--enregistrer-reference]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from corpus_synthetique import MOTS_OUTILS, ecrire_corpus, generer_site, servir_repertoire
+from metriques import comparer, ecrire_metriques, rss_max_mo
+
+REPERTOIRE_BENCH = '../data/cache/bench'
+
+BANCS_CORPUS = ('chargement', 'split_dataset', 'split_dataset_hash', 'statistiques', 'termes_frequents',
+                'tfidf_cosine', 'phrases_regex', 'phrases_spacy')
+BANCS_SITE = ('extraction_article', 'scraper_article', 'crawl')
+
+TOLERANCE_COSINE = 1e-12
+
+
+def chronometrer(fonction, repetitions=3):
+    """
+    Chronométrer plusieurs passes d'une fonction et garder la meilleure.
+
+    Args:
+        fonction (callable): Fonction sans argument à mesurer.
+        repetitions (int, optional): Nombre de passes. Par défaut à 3.
+
+    Returns:
+        tuple: Résultat de la dernière passe, meilleure durée et meilleur temps CPU en secondes.
+    """
+    durees, cpus = [], []
+    for _ in range(repetitions):
+        debut, debut_cpu = time.perf_counter(), time.process_time()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+        cpus.append(time.process_time() - debut_cpu)
+    return resultat, min(durees), min(cpus)
+
+
+def _mesure(duree, cpu, elements, repetitions):
+    return {
+        'appels': repetitions,
+        'duree': duree,
+        'cpu': cpu,
+        'elements': elements,
+        'elements_par_seconde': elements / duree if duree > 0 else None,
+        'rss_max_mo': rss_max_mo(),
+    }
+
+
+def ecart_cosine(a, b, similarites, lignes=10000, taille_bloc=1000):
+    """
+    Comparer des similarités appariées à la diagonale de cosine_similarity(a, b).
+
+    La référence est calculée par blocs de lignes (la diagonale d'un bloc de la
+    matrice complète) pour rester en mémoire bornée.
+
+    Args:
+        a (scipy.sparse matrix): Vecteurs des articles.
+        b (scipy.sparse matrix): Vecteurs des descriptions.
+        similarites (numpy.ndarray): Similarités à vérifier, une par ligne.
+        lignes (int, optional): Nombre de premières lignes vérifiées. Par défaut à 10000.
+        taille_bloc (int, optional): Nombre de lignes par bloc. Par défaut à 1000.
+
+    Returns:
+        dict: Nombre de lignes vérifiées, écart absolu maximal et verdict.
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    lignes = min(lignes, a.shape[0])
+    ecart = 0.0
+    for debut in range(0, lignes, taille_bloc):
+        fin = min(debut + taille_bloc, lignes)
+        reference = cosine_similarity(a[debut:fin], b[debut:fin]).diagonal()
+        ecart = max(ecart, float(np.abs(reference - similarites[debut:fin]).max()))
+    return {'lignes': lignes, 'ecart_max': ecart, 'ok': ecart < TOLERANCE_COSINE}
+
+
+def bancs_corpus(chemin, bancs=BANCS_CORPUS, repetitions=3, nlp=None, limite_spacy=1000, lignes_equivalence=10000):
+    """
+    Mesurer les étapes de la chaîne sur un corpus.
+
+    Args:
+        chemin (str): Fichier JSON Lines du corpus.
+        bancs (tuple, optional): Bancs à exécuter, parmi BANCS_CORPUS. Par défaut tous.
+        repetitions (int, optional): Nombre de passes par banc. Par défaut à 3.
+        nlp (spacy.language.Language, optional): Modèle de segmentation en phrases ;
+            sans modèle, le banc phrases_spacy est sauté.
+        limite_spacy (int, optional): Nombre d'articles passés à spaCy. Par défaut à 1000.
+        lignes_equivalence (int, optional): Nombre de lignes de la vérification de la
+            similarité cosine. Par défaut à 10000.
+
+    Returns:
+        tuple: Mesures de chaque banc et résultat de la vérification de la similarité cosine.
+    """
+    from corpus_jsonl import charger_dataframe, lire_par_lots
+    from data_loading import split_dataset, split_dataset_hash
+    from statistiques_texte import StatistiquesTexte, calculer_statistiques, similarite_cosine_appariee
+    import tokeniseur_regex
+
+    mesures = {}
+    equivalence = None
+    data, duree, cpu = chronometrer(lambda: charger_dataframe(chemin), repetitions if 'chargement' in bancs else 1)
+    if 'chargement' in bancs:
+        mesures['chargement'] = _mesure(duree, cpu, len(data), repetitions)
+
+    if 'split_dataset' in bancs:
+        _, duree, cpu = chronometrer(lambda: split_dataset(data), repetitions)
+        mesures['split_dataset'] = _mesure(duree, cpu, len(data), repetitions)
+
+    if 'split_dataset_hash' in bancs:
+        repertoire = tempfile.mkdtemp(prefix='bench_splits_')
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, duree, cpu = chronometrer(lambda: split_dataset_hash(lire_par_lots(chemin), repertoire),
+                                             repetitions)
+        finally:
+            shutil.rmtree(repertoire, ignore_errors=True)
+        mesures['split_dataset_hash'] = _mesure(duree, cpu, len(data), repetitions)
+
+    statistiques = None
+    if {'statistiques', 'termes_frequents', 'tfidf_cosine'} & set(bancs):
+        statistiques, duree, cpu = chronometrer(lambda: calculer_statistiques(data.copy()),
+                                                repetitions if 'statistiques' in bancs else 1)
+        if 'statistiques' in bancs:
+            mesures['statistiques'] = _mesure(duree, cpu, len(data), repetitions)
+
+    if 'termes_frequents' in bancs:
+        # Un StatistiquesTexte neuf à chaque passe, sans fréquences en cache : la passe
+        # mesure les sommes par colonne, le masque des mots vides et la sélection. La
+        # vectorisation, partagée avec les autres statistiques, est mesurée par le banc
+        # statistiques
+        _, duree, cpu = chronometrer(
+            lambda: StatistiquesTexte(statistiques.data, statistiques.comptes, statistiques.vocabulaire)
+            .termes_frequents(20, mots_vides=MOTS_OUTILS), repetitions)
+        mesures['termes_frequents'] = _mesure(duree, cpu, len(data), repetitions)
+
+    if 'tfidf_cosine' in bancs:
+        def tfidf_cosine():
+            articles, descriptions = statistiques.tfidf()
+            return articles, descriptions, similarite_cosine_appariee(articles, descriptions)
+
+        (articles, descriptions, similarites), duree, cpu = chronometrer(tfidf_cosine, repetitions)
+        mesures['tfidf_cosine'] = _mesure(duree, cpu, len(data), repetitions)
+        equivalence = ecart_cosine(articles, descriptions, similarites, lignes_equivalence)
+
+    if 'phrases_regex' in bancs:
+        _, duree, cpu = chronometrer(
+            lambda: dict(tokeniseur_regex.longueurs_moyennes_phrases(data['id'], data['article'])), repetitions)
+        mesures['phrases_regex'] = _mesure(duree, cpu, len(data), repetitions)
+
+    if 'phrases_spacy' in bancs and nlp is not None:
+        import traitement_spacy
+
+        echantillon = data.head(limite_spacy)
+        # spaCy est bien plus lent : une seule passe suffit
+        _, duree, cpu = chronometrer(lambda: dict(traitement_spacy.longueurs_moyennes_phrases(
+            nlp, echantillon['id'], echantillon['article'])), 1)
+        mesures['phrases_spacy'] = _mesure(duree, cpu, len(echantillon), 1)
+
+    return mesures, equivalence
+
+
+def bancs_site(repertoire, pages=200, bancs=BANCS_SITE, repetitions=3, max_workers=8):
+    """
+    Mesurer le scraper sur un site synthétique servi en local.
+
+    Le site est régénéré à chaque appel, ses liens absolus dépendant du port du serveur.
+
+    Args:
+        repertoire (str): Répertoire du site.
+        pages (int, optional): Nombre de pages d'article. Par défaut à 200.
+        bancs (tuple, optional): Bancs à exécuter, parmi BANCS_SITE. Par défaut tous.
+        repetitions (int, optional): Nombre de passes par banc. Par défaut à 3.
+        max_workers (int, optional): Nombre de requêtes simultanées du crawl. Par défaut à 8.
+
+    Returns:
+        dict: Mesures de chaque banc.
+    """
+    from client_http import ClientHTTP
+    from etat_crawl import EtatCrawl
+    from extraction_html import extraire_article
+    from scrap_data import crawler_concurrent, scraper_article
+
+    mesures = {}
+    with servir_repertoire(repertoire) as base:
+        rubriques = generer_site(repertoire, base, pages)
+        urls = [f'{base}/articles/{numero}.html' for numero in range(pages)]
+
+        if 'extraction_article' in bancs:
+            html = []
+            for numero in range(pages):
+                with open(os.path.join(repertoire, 'articles', f'{numero}.html'), 'r', encoding='utf-8') as fichier:
+                    html.append(fichier.read())
+            _, duree, cpu = chronometrer(lambda: [extraire_article(url, page) for url, page in zip(urls, html)],
+                                         repetitions)
+            mesures['extraction_article'] = _mesure(duree, cpu, pages, repetitions)
+
+        # Sans versions mémorisées : chaque passe télécharge les pages au lieu de les
+        # revalider (If-Modified-Since, réponses 304) et mesure bien téléchargement et analyse
+        client = ClientHTTP(taille_pool=max_workers, memoriser_versions=False)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if 'scraper_article' in bancs:
+                    articles, duree, cpu = chronometrer(
+                        lambda: [scraper_article(url, client=client) for url in urls], repetitions)
+                    if None in articles:
+                        raise RuntimeError("Des pages du site synthétique n'ont pas pu être scrapées.")
+                    mesures['scraper_article'] = _mesure(duree, cpu, pages, repetitions)
+
+                if 'crawl' in bancs:
+                    def crawl():
+                        etat = EtatCrawl()
+                        try:
+                            articles, _ = crawler_concurrent(rubriques, limite=pages, max_workers=max_workers,
+                                                             client=client, etat=etat)
+                            return sum(1 for _ in articles)
+                        finally:
+                            etat.fermer()
+
+                    nombre, duree, cpu = chronometrer(crawl, repetitions)
+                    mesures['crawl'] = _mesure(duree, cpu, nombre, repetitions)
+        finally:
+            client.fermer()
+    return mesures
+
+
+def _charger_nlp(modele):
+    from traitement_spacy import charger_modele_phrases
+
+    try:
+        return charger_modele_phrases(modele)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"spaCy non mesuré : {e}")
+        return None
+
+
+def main(argv=None):
+    import json
+
+    parseur = argparse.ArgumentParser(description="Mesurer les chemins chauds de la chaîne sur des corpus synthétiques.")
+    parseur.add_argument('--tailles', type=int, nargs='+', default=[1000, 10000],
+                         help="Nombres d'articles des corpus synthétiques")
+    parseur.add_argument('--bancs', nargs='+', choices=BANCS_CORPUS + BANCS_SITE,
+                         default=list(BANCS_CORPUS + BANCS_SITE), help="Bancs à exécuter")
+    parseur.add_argument('--repertoire', default=REPERTOIRE_BENCH, help="Répertoire des corpus et du site générés")
+    parseur.add_argument('--pages', type=int, default=200, help="Nombre de pages d'article du site")
+    parseur.add_argument('--repetitions', type=int, default=3, help="Nombre de passes par banc")
+    parseur.add_argument('--graine', type=int, default=0, help="Graine des corpus")
+    parseur.add_argument('--modele', help="Modèle spaCy du banc phrases_spacy. Par défaut le banc est sauté")
+    parseur.add_argument('--limite-spacy', type=int, default=1000, help="Nombre d'articles passés à spaCy")
+    parseur.add_argument('--json', help="Fichier des résultats. Par défaut resultats-<date>.json dans le répertoire")
+    parseur.add_argument('--reference', help="Fichier de référence. Par défaut reference.json dans le répertoire")
+    parseur.add_argument('--enregistrer-reference', action='store_true',
+                         help="Enregistrer les résultats comme nouvelle référence")
+    parseur.add_argument('--seuil', type=float, default=1.2, help="Rapport signalé comme régression")
+    args = parseur.parse_args(argv)
+
+    chemin_json = args.json or os.path.join(args.repertoire, f"resultats-{datetime.now():%Y%m%d-%H%M%S}.json")
+    chemin_reference = args.reference or os.path.join(args.repertoire, 'reference.json')
+    nlp = _charger_nlp(args.modele) if args.modele and 'phrases_spacy' in args.bancs else None
+
+    sections, equivalences = {}, {}
+    for taille in args.tailles:
+        bancs = [banc for banc in args.bancs if banc in BANCS_CORPUS]
+        if not bancs:
+            break
+        debut = time.perf_counter()
+        chemin = ecrire_corpus(os.path.join(args.repertoire, f'corpus_{taille}_{args.graine}.jsonl'), taille,
+                               args.graine)
+        print(f"Corpus de {taille} articles prêt en {time.perf_counter() - debut:.1f} s")
+        mesures, equivalence = bancs_corpus(chemin, bancs, args.repetitions, nlp, args.limite_spacy)
+        sections.update({f'{banc}[{taille}]': mesure for banc, mesure in mesures.items()})
+        if equivalence is not None:
+            equivalences[f'cosine[{taille}]'] = equivalence
+
+    bancs = [banc for banc in args.bancs if banc in BANCS_SITE]
+    if bancs:
+        mesures = bancs_site(os.path.join(args.repertoire, 'site'), args.pages, bancs, args.repetitions)
+        sections.update({f'{banc}[{args.pages}]': mesure for banc, mesure in mesures.items()})
+
+    print(f"{'banc':<32} {'durée (s)':>10} {'CPU (s)':>10} {'éléments/s':>14}")
+    for nom, mesure in sections.items():
+        print(f"{nom:<32} {mesure['duree']:>10.3f} {mesure['cpu']:>10.3f} {mesure['elements_par_seconde']:>14,.0f}")
+    for nom, equivalence in equivalences.items():
+        print(f"{nom} : écart maximal {equivalence['ecart_max']:.1e} sur {equivalence['lignes']} lignes"
+              f"{'' if equivalence['ok'] else '  ! au-delà de la tolérance'}")
+
+    resultats = {'sections': sections, 'equivalences': equivalences, 'rss_max_mo': rss_max_mo()}
+    ecrire_metriques(chemin_json, resultats, script='bench_chaine', arguments=sys.argv[1:] if argv is None else argv)
+    print(f"Résultats écrits dans {chemin_json}")
+
+    echec = not all(equivalence['ok'] for equivalence in equivalences.values())
+    if args.enregistrer_reference:
+        ecrire_metriques(chemin_reference, resultats, script='bench_chaine')
+        print(f"Référence enregistrée dans {chemin_reference}")
+    elif os.path.exists(chemin_reference):
+        with open(chemin_reference, 'r', encoding='utf-8') as fichier:
+            reference = json.load(fichier)
+        regressions = [ligne for ligne in comparer(reference, resultats, args.seuil) if ligne[4]]
+        for nom, avant, apres, rapport, _ in regressions:
+            print(f"Régression : {nom} {avant:.3f} -> {apres:.3f} (x{rapport:.2f})")
+        print(f"{len(regressions)} régression(s) au-delà d'un rapport de {args.seuil} par rapport à {chemin_reference}")
+        echec = echec or bool(regressions)
+    else:
+        print(f"Pas de référence ({chemin_reference}) : relancer avec --enregistrer-reference pour en créer une")
+    return 1 if echec else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
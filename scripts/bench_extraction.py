@@ -0,0 +1,104 @@
+"""
+Banc d'essai des moteurs d'extraction HTML.
+
+Mesure le débit (pages par seconde) de chaque moteur de extraction_html sur un
+corpus de pages, et vérifie que la sortie de chacun est identique à celle de
+l'extracteur d'origine ('html.parser'). Le corpus est soit un répertoire de
+fichiers .html, soit un répertoire de cache HTML du scraper.
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+
+from cache_html import CacheHTML
+from extraction_html import MOTEURS, extraire_article, extraire_liens
+
+
+def charger_pages(repertoire):
+    """
+    Charger les pages du corpus de test.
+
+    Args:
+        repertoire (str): Répertoire de fichiers .html ou répertoire de cache HTML.
+
+    Returns:
+        list: Liste de couples (url, html).
+    """
+    if os.path.exists(os.path.join(repertoire, 'index.sqlite')):
+        cache = CacheHTML(repertoire)
+        pages = [(url, cache.lire(url).html) for url in cache.urls('article') + cache.urls('liens')]
+        cache.fermer()
+        return pages
+    pages = []
+    for chemin in sorted(glob.glob(os.path.join(repertoire, '*.html'))):
+        with open(chemin, 'r', encoding='utf-8') as fichier:
+            pages.append((os.path.basename(chemin), fichier.read()))
+    return pages
+
+
+def _extraire_sans_echec(url, html, moteur):
+    try:
+        return extraire_article(url, html, moteur)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def mesurer(pages, moteurs=MOTEURS, repetitions=3):
+    """
+    Mesurer le débit de chaque moteur et sa concordance avec l'extracteur d'origine.
+
+    Args:
+        pages (list): Couples (url, html) du corpus.
+        moteurs (tuple, optional): Moteurs à mesurer. Par défaut tous.
+        repetitions (int, optional): Nombre de passes sur le corpus ; la meilleure est retenue.
+
+    Returns:
+        dict: Pour chaque moteur, débit d'extraction d'articles et de liens en pages
+        par seconde, et nombre de pages dont la sortie diffère de la référence.
+    """
+    reference_articles = [_extraire_sans_echec(url, html, 'html.parser') for url, html in pages]
+    reference_liens = [extraire_liens(html, 'html.parser') for _, html in pages]
+    resultats = {}
+    for moteur in moteurs:
+        durees_articles, durees_liens = [], []
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            articles = [_extraire_sans_echec(url, html, moteur) for url, html in pages]
+            durees_articles.append(time.perf_counter() - debut)
+            debut = time.perf_counter()
+            liens = [extraire_liens(html, moteur) for _, html in pages]
+            durees_liens.append(time.perf_counter() - debut)
+        differences = [url for (url, _), article, reference in zip(pages, articles, reference_articles)
+                       if article != reference]
+        differences_liens = sum(1 for page, reference in zip(liens, reference_liens) if page != reference)
+        resultats[moteur] = {
+            'pages_par_seconde_articles': len(pages) / min(durees_articles),
+            'pages_par_seconde_liens': len(pages) / min(durees_liens),
+            'differences_articles': len(differences),
+            'differences_liens': differences_liens,
+            'exemples_differences': differences[:5],
+        }
+    return resultats
+
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Comparer les moteurs d'extraction HTML.")
+    parseur.add_argument('corpus', help="Répertoire de fichiers .html ou de cache HTML")
+    parseur.add_argument('--repetitions', type=int, default=3, help="Nombre de passes sur le corpus")
+    parseur.add_argument('--json', help="Fichier où écrire les résultats au format JSON")
+    args = parseur.parse_args()
+
+    pages = charger_pages(args.corpus)
+    resultats = mesurer(pages, repetitions=args.repetitions)
+    print(f"{len(pages)} pages")
+    print(f"{'moteur':<12} {'articles/s':>12} {'liens/s':>12} {'écarts':>8}")
+    for moteur, mesure in resultats.items():
+        ecarts = mesure['differences_articles'] + mesure['differences_liens']
+        print(f"{moteur:<12} {mesure['pages_par_seconde_articles']:>12.1f} "
+              f"{mesure['pages_par_seconde_liens']:>12.1f} {ecarts:>8}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fichier:
+            json.dump({'pages': len(pages), 'moteurs': resultats}, fichier, ensure_ascii=False, indent=4)
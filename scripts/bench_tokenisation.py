@@ -0,0 +1,128 @@
+"""
+Banc d'essai du tokeniseur par expressions régulières face à spaCy.
+
+Mesure le débit (tokens par seconde) du découpage sur les espaces, du tokeniseur
+et du segmenteur de tokeniseur_regex, et, si le modèle est installé, du tokeniseur
+et du pipeline de segmentation en phrases de spaCy, dont le temps de chargement
+est indiqué à part. La concordance avec spaCy est mesurée par la F-mesure des
+tokens (mêmes positions de début et de fin dans le texte) et des frontières de
+phrases, ainsi que par l'écart moyen du nombre de phrases par article.
+"""
+
+import argparse
+import json
+import time
+
+from corpus_jsonl import charger_dataframe
+from tokeniseur_regex import nombre_phrases, nombre_tokens, positions_phrases, positions_tokens
+from traitement_spacy import MODELE_FR, SEGMENTEURS, charger_modele_phrases
+
+
+def _chronometrer(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - debut)
+    return resultat, min(durees)
+
+
+def _f_mesure(reference, candidat):
+    reference, candidat = set(reference), set(candidat)
+    if not reference and not candidat:
+        return 1.0
+    return 2 * len(reference & candidat) / (len(reference) + len(candidat))
+
+
+def mesurer(textes, nlp=None, repetitions=3, batch_size=64):
+    """
+    Mesurer le débit de chaque moteur et la concordance du moteur regex avec spaCy.
+
+    Args:
+        textes (list): Textes du corpus.
+        nlp (spacy.language.Language, optional): Modèle de segmentation en phrases.
+            Par défaut, seuls les moteurs sans modèle sont mesurés.
+        repetitions (int, optional): Nombre de passes sur le corpus ; la meilleure est retenue.
+        batch_size (int, optional): Nombre de textes par lot de nlp.pipe. Par défaut à 64.
+
+    Returns:
+        dict: Débit de chaque moteur en tokens par seconde et, avec un modèle, concordance.
+    """
+    nombre, duree_split = _chronometrer(lambda: sum(len(texte.split()) for texte in textes), repetitions)
+    resultats = {'split': {'tokens': nombre, 'tokens_par_seconde': nombre / duree_split}}
+    nombre, duree = _chronometrer(lambda: sum(nombre_tokens(texte) for texte in textes), repetitions)
+    resultats['regex_tokens'] = {'tokens': nombre, 'tokens_par_seconde': nombre / duree}
+    phrases, duree = _chronometrer(lambda: sum(nombre_phrases(texte) for texte in textes), repetitions)
+    resultats['regex_phrases'] = {'phrases': phrases, 'tokens_par_seconde': nombre / duree}
+    if nlp is None:
+        return resultats
+
+    docs, duree = _chronometrer(lambda: list(nlp.tokenizer.pipe(textes, batch_size=batch_size)), repetitions)
+    nombre = sum(1 for doc in docs for token in doc if not token.is_space)
+    resultats['spacy_tokens'] = {'tokens': nombre, 'tokens_par_seconde': nombre / duree}
+    # Le pipeline est bien plus lent : une seule passe suffit
+    docs, duree = _chronometrer(lambda: list(nlp.pipe(textes, batch_size=batch_size)), 1)
+    resultats['spacy_phrases'] = {
+        'phrases': sum(1 for doc in docs for _ in doc.sents),
+        'tokens_par_seconde': nombre / duree,
+    }
+
+    f_tokens, f_phrases, ecarts = [], [], []
+    for texte, doc in zip(textes, docs):
+        tokens_spacy = [(token.idx, token.idx + len(token)) for token in doc if not token.is_space]
+        f_tokens.append(_f_mesure(tokens_spacy, positions_tokens(texte)))
+        phrases_spacy = [phrase for phrase in doc.sents if phrase.text.strip()]
+        phrases_regex = positions_phrases(texte)
+        # Frontières : début de chaque phrase, espaces exclus, sauf la première
+        debuts_spacy = [phrase.start_char + len(phrase.text) - len(phrase.text.lstrip())
+                        for phrase in phrases_spacy[1:]]
+        f_phrases.append(_f_mesure(debuts_spacy, [debut for debut, _ in phrases_regex[1:]]))
+        ecarts.append(abs(len(phrases_spacy) - len(phrases_regex)))
+    resultats['concordance'] = {
+        'f_mesure_tokens': sum(f_tokens) / len(textes),
+        'f_mesure_frontieres_phrases': sum(f_phrases) / len(textes),
+        'ecart_moyen_nombre_phrases': sum(ecarts) / len(textes),
+    }
+    return resultats
+
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Comparer le tokeniseur par expressions régulières à spaCy.")
+    parseur.add_argument('corpus', nargs='?', default='../data/clean/donnees_scrapees.json',
+                         help="Fichier de corpus JSON, JSON Lines ou Parquet")
+    parseur.add_argument('--colonne', default='article', help="Colonne des textes")
+    parseur.add_argument('--limite', type=int, help="Nombre maximal de textes")
+    parseur.add_argument('--modele', default=MODELE_FR, help="Nom ou chemin du modèle spaCy")
+    parseur.add_argument('--segmenteur', choices=SEGMENTEURS, default='senter', help="Composant spaCy des phrases")
+    parseur.add_argument('--sans-spacy', action='store_true', help="Ne mesurer que les moteurs sans modèle")
+    parseur.add_argument('--repetitions', type=int, default=3, help="Nombre de passes sur le corpus")
+    parseur.add_argument('--json', help="Fichier où écrire les résultats au format JSON")
+    args = parseur.parse_args()
+
+    textes = charger_dataframe(args.corpus, [args.colonne])[args.colonne].fillna('').tolist()[:args.limite]
+    nlp, chargement = None, None
+    if not args.sans_spacy:
+        try:
+            debut = time.perf_counter()
+            nlp = charger_modele_phrases(args.modele, args.segmenteur)
+            chargement = time.perf_counter() - debut
+        except (ImportError, OSError, ValueError) as e:
+            print(f"spaCy non mesuré : {e}")
+
+    resultats = mesurer(textes, nlp, args.repetitions)
+    print(f"{len(textes)} textes")
+    if chargement is not None:
+        print(f"Chargement du modèle : {chargement:.2f} s")
+    print(f"{'moteur':<15} {'tokens/s':>14}")
+    for moteur, mesure in resultats.items():
+        if 'tokens_par_seconde' in mesure:
+            print(f"{moteur:<15} {mesure['tokens_par_seconde']:>14,.0f}")
+    if 'concordance' in resultats:
+        concordance = resultats['concordance']
+        print(f"F-mesure des tokens : {concordance['f_mesure_tokens']:.3f}")
+        print(f"F-mesure des frontières de phrases : {concordance['f_mesure_frontieres_phrases']:.3f}")
+        print(f"Écart moyen du nombre de phrases : {concordance['ecart_moyen_nombre_phrases']:.2f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fichier:
+            json.dump({'textes': len(textes), 'chargement_modele': chargement, 'moteurs': resultats},
+                      fichier, ensure_ascii=False, indent=4)
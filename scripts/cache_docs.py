@@ -0,0 +1,294 @@
+"""
+Module de cache disque des documents annotés par spaCy.
+
+Les Doc produits par un modèle sont sérialisés en fragments DocBin (.spacy). Un
+index SQLite associe chaque texte, identifié par son empreinte et par la
+configuration du modèle (nom, version et composants actifs), à sa place dans un
+fragment. Une analyse relit donc les documents déjà annotés au lieu de repasser le
+modèle ; seuls les textes nouveaux, ou modifiés, sont annotés puis ajoutés au cache.
+Les identifiants des articles ne servent pas de clé : réordonner ou redécouper le
+corpus ne fausse pas le cache.
+
+Après une analyse de tout le corpus, collecter() oublie les textes qui n'y
+figurent plus : les fragments sans document vivant sont supprimés, et ceux dont
+la plupart des documents sont morts sont réécrits.
+
+spaCy n'est importé qu'à la lecture ou à l'écriture d'un fragment.
+"""
+
+import hashlib
+import os
+import sqlite3
+from collections import OrderedDict
+
+from metriques import compter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    signature TEXT NOT NULL,
+    empreinte TEXT NOT NULL,
+    fragment INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (signature, empreinte)
+);
+CREATE TABLE IF NOT EXISTS fragments (
+    numero INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL,
+    taille INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_fragment ON docs (fragment);
+"""
+
+# Version du schéma : les index des versions précédentes (clés par identifiant
+# d'article) sont vidés à l'ouverture
+VERSION_SCHEMA = 2
+
+# Nombre maximal de paramètres d'une requête SQLite
+TAILLE_REQUETE = 500
+
+# Part de documents vivants en dessous de laquelle collecter() réécrit un fragment
+TAUX_COMPACTAGE = 0.5
+
+
+def signature_modele(nlp):
+    """
+    Identifier la configuration d'un modèle spaCy, dont dépendent les annotations.
+
+    Args:
+        nlp (spacy.language.Language): Modèle.
+
+    Returns:
+        str: Langue, nom, version et composants actifs du modèle.
+    """
+    meta = nlp.meta
+    return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}:{'+'.join(nlp.pipe_names)}"
+
+
+def empreinte_texte(texte):
+    """
+    Calculer l'empreinte du texte d'un article, qui l'identifie dans le cache.
+
+    Args:
+        texte (str): Texte.
+
+    Returns:
+        str: Empreinte BLAKE2b (128 bits) en hexadécimal.
+    """
+    return hashlib.blake2b(texte.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CacheDocs:
+    """
+    Cache persistant de Doc spaCy indexé par modèle et par empreinte de texte.
+    """
+
+    def __init__(self, repertoire='../data/cache/docs', taille_lot=1000, fragments_en_memoire=4):
+        """
+        Args:
+            repertoire (str, optional): Répertoire du cache.
+            taille_lot (int, optional): Nombre d'articles traités à la fois ; les articles
+                annotés d'un lot forment un fragment. Par défaut à 1000.
+            fragments_en_memoire (int, optional): Nombre de fragments relus gardés en
+                mémoire. Par défaut à 4.
+        """
+        self.repertoire = repertoire
+        self.taille_lot = taille_lot
+        self.fragments_en_memoire = fragments_en_memoire
+        os.makedirs(os.path.join(repertoire, 'fragments'), exist_ok=True)
+        self._connexion = sqlite3.connect(os.path.join(repertoire, 'index.sqlite'))
+        if self._connexion.execute('PRAGMA user_version').fetchone()[0] < VERSION_SCHEMA:
+            self._vider()
+        self._connexion.executescript(SCHEMA)
+        self._fragments = OrderedDict()
+        # Clés (signature, empreinte) lues ou annotées depuis l'ouverture du cache
+        self._utilisees = set()
+        self.lus = 0
+        self.annotes = 0
+
+    def _vider(self):
+        numeros = []
+        if self._connexion.execute("SELECT 1 FROM sqlite_master WHERE name = 'fragments'").fetchone():
+            numeros = [numero for (numero,) in self._connexion.execute('SELECT numero FROM fragments')]
+        self._connexion.executescript('DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS fragments;')
+        self._connexion.execute(f'PRAGMA user_version = {VERSION_SCHEMA}')
+        self._connexion.commit()
+        for numero in numeros:
+            self._supprimer_fichier(numero)
+
+    def _chemin_fragment(self, numero):
+        return os.path.join(self.repertoire, 'fragments', f'{numero:05d}.spacy')
+
+    def _supprimer_fichier(self, numero):
+        try:
+            os.remove(self._chemin_fragment(numero))
+        except FileNotFoundError:
+            pass
+
+    def _positions(self, signature, empreintes):
+        positions = {}
+        for debut in range(0, len(empreintes), TAILLE_REQUETE):
+            morceau = empreintes[debut:debut + TAILLE_REQUETE]
+            lignes = self._connexion.execute(
+                'SELECT empreinte, fragment, position FROM docs WHERE signature = ? AND empreinte IN (%s)'
+                % ','.join('?' * len(morceau)),
+                [signature] + morceau,
+            )
+            positions.update((empreinte, (fragment, position)) for empreinte, fragment, position in lignes)
+        return positions
+
+    def _docs_fragment(self, numero, vocab):
+        from spacy.tokens import DocBin
+
+        if numero in self._fragments:
+            self._fragments.move_to_end(numero)
+        else:
+            self._fragments[numero] = list(DocBin().from_disk(self._chemin_fragment(numero)).get_docs(vocab))
+            if len(self._fragments) > self.fragments_en_memoire:
+                self._fragments.popitem(last=False)
+        return self._fragments[numero]
+
+    def _enregistrer(self, signature, empreintes, docs):
+        from spacy.tokens import DocBin
+
+        numero = self._connexion.execute('SELECT COALESCE(MAX(numero) + 1, 0) FROM fragments').fetchone()[0]
+        fragment = DocBin(docs=docs)
+        fragment.to_disk(self._chemin_fragment(numero))
+        self._connexion.execute(
+            'INSERT INTO fragments (numero, signature, taille) VALUES (?, ?, ?)', (numero, signature, len(docs))
+        )
+        self._connexion.executemany(
+            'INSERT OR REPLACE INTO docs (signature, empreinte, fragment, position) VALUES (?, ?, ?, ?)',
+            ((signature, empreinte, numero, position) for position, empreinte in enumerate(empreintes)),
+        )
+        self._connexion.commit()
+        return numero
+
+    def docs(self, nlp, ids, textes, batch_size=64, n_process=1):
+        """
+        Parcourir les Doc annotés d'articles, en n'annotant que ceux absents du cache.
+
+        Args:
+            nlp (spacy.language.Language): Modèle qui annote les articles.
+            ids (iterable): Identifiants des articles, rendus tels quels.
+            textes (iterable): Textes des articles, dans le même ordre.
+            batch_size (int, optional): Nombre de textes par lot de nlp.pipe. Par défaut à 64.
+            n_process (int, optional): Nombre de processus de nlp.pipe. Par défaut à 1.
+
+        Yields:
+            tuple: Identifiant de l'article et son Doc, dans l'ordre des articles.
+        """
+        signature = signature_modele(nlp)
+        lot = []
+        for identifiant, texte in zip(ids, textes):
+            lot.append((identifiant, texte))
+            if len(lot) >= self.taille_lot:
+                yield from self._docs_lot(nlp, signature, lot, batch_size, n_process)
+                lot = []
+        if lot:
+            yield from self._docs_lot(nlp, signature, lot, batch_size, n_process)
+
+    def _docs_lot(self, nlp, signature, lot, batch_size, n_process):
+        empreintes = [empreinte_texte(texte) for _, texte in lot]
+        positions = self._positions(signature, list(set(empreintes)))
+
+        # Un texte répété n'est annoté qu'une fois
+        manquants = {}
+        for (_, texte), empreinte in zip(lot, empreintes):
+            if empreinte not in positions and empreinte not in manquants:
+                manquants[empreinte] = texte
+        annotes = {}
+        if manquants:
+            docs = list(nlp.pipe(manquants.values(), batch_size=batch_size, n_process=n_process))
+            self._enregistrer(signature, list(manquants), docs)
+            annotes = dict(zip(manquants, docs))
+            self.annotes += len(docs)
+            compter('cache_docs_annotes', len(docs))
+
+        for (identifiant, _), empreinte in zip(lot, empreintes):
+            self._utilisees.add((signature, empreinte))
+            doc = annotes.get(empreinte)
+            if doc is None:
+                fragment, position = positions[empreinte]
+                doc = self._docs_fragment(fragment, nlp.vocab)[position]
+                self.lus += 1
+                compter('cache_docs_lus')
+            yield identifiant, doc
+
+    def collecter(self, taux_compactage=TAUX_COMPACTAGE):
+        """
+        Oublier les textes qui n'ont pas été lus depuis l'ouverture du cache, puis
+        supprimer ou réécrire les fragments devenus (presque) vides.
+
+        À n'appeler qu'après avoir parcouru tout le corpus : pour les configurations
+        de modèle utilisées depuis l'ouverture, seuls les textes lus ou annotés
+        restent vivants. Les entrées des autres configurations sont conservées.
+
+        Args:
+            taux_compactage (float, optional): Part de documents vivants en dessous de
+                laquelle un fragment est réécrit. Par défaut à 0,5.
+
+        Returns:
+            dict: Nombres de documents oubliés, de fragments supprimés et de fragments réécrits.
+        """
+        from spacy.tokens import DocBin
+        from spacy.vocab import Vocab
+
+        signatures = {signature for signature, _ in self._utilisees}
+        self._connexion.execute('CREATE TEMP TABLE IF NOT EXISTS vivants (signature TEXT, empreinte TEXT)')
+        self._connexion.execute('DELETE FROM vivants')
+        self._connexion.executemany('INSERT INTO vivants (signature, empreinte) VALUES (?, ?)', self._utilisees)
+        oublies = 0
+        for signature in signatures:
+            oublies += self._connexion.execute(
+                """
+                DELETE FROM docs WHERE signature = ? AND NOT EXISTS (
+                    SELECT 1 FROM vivants
+                    WHERE vivants.signature = docs.signature AND vivants.empreinte = docs.empreinte
+                )
+                """,
+                (signature,),
+            ).rowcount
+        self._connexion.execute('DROP TABLE vivants')
+
+        occupation = self._connexion.execute(
+            """
+            SELECT fragments.numero, fragments.signature, fragments.taille, COUNT(docs.empreinte)
+            FROM fragments LEFT JOIN docs ON docs.fragment = fragments.numero
+            GROUP BY fragments.numero ORDER BY fragments.numero
+            """
+        ).fetchall()
+        vides = [numero for numero, _, _, vivants in occupation if vivants == 0]
+        a_reecrire = {}
+        for numero, signature, taille, vivants in occupation:
+            if 0 < vivants < taux_compactage * taille:
+                a_reecrire.setdefault(signature, []).append(numero)
+
+        # Les documents vivants des fragments peu occupés sont regroupés par configuration,
+        # dans de nouveaux fragments numérotés après tous les anciens
+        vocab = Vocab()
+        reecrits = []
+        for signature, numeros in a_reecrire.items():
+            empreintes, docs = [], []
+            for numero in numeros:
+                fragment = list(DocBin().from_disk(self._chemin_fragment(numero)).get_docs(vocab))
+                for empreinte, position in self._connexion.execute(
+                    'SELECT empreinte, position FROM docs WHERE fragment = ? ORDER BY position', (numero,)
+                ):
+                    empreintes.append(empreinte)
+                    docs.append(fragment[position])
+            self._enregistrer(signature, empreintes, docs)
+            reecrits.extend(numeros)
+        self._connexion.executemany('DELETE FROM fragments WHERE numero = ?',
+                                    [(numero,) for numero in vides + reecrits])
+        self._connexion.commit()
+
+        for numero in vides + reecrits:
+            self._supprimer_fichier(numero)
+        self._fragments.clear()
+        compter('cache_docs_oublies', oublies)
+        return {'oublies': oublies, 'fragments_supprimes': len(vides), 'fragments_reecrits': len(reecrits)}
+
+    def fermer(self):
+        """Fermer l'index du cache."""
+        self._connexion.close()
+        self._fragments.clear()
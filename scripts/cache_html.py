@@ -0,0 +1,226 @@
+"""
+Module de cache disque des pages HTML récupérées par le scraper.
+
+Le HTML brut est stocké compressé (gzip) sous le nom de son empreinte SHA-256,
+si bien que deux URL servant le même contenu partagent un seul fichier. Un index
+SQLite associe chaque URL à son empreinte et aux métadonnées de récupération
+(ETag, Last-Modified, date), ce qui permet l'expiration (TTL), l'éviction LRU
+et la relecture hors ligne des pages.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from metriques import compter
+
+EntreeCache = namedtuple('EntreeCache', ['url', 'html', 'etag', 'last_modified', 'recupere_le', 'frais'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    empreinte TEXT NOT NULL,
+    type_page TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    recupere_le REAL NOT NULL,
+    dernier_acces REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS objets (
+    empreinte TEXT PRIMARY KEY,
+    taille INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_acces ON pages (dernier_acces);
+CREATE INDEX IF NOT EXISTS pages_empreinte ON pages (empreinte);
+"""
+
+
+class CacheHTML:
+    """
+    Cache persistant de pages HTML indexé par URL et adressé par contenu.
+
+    Une même instance peut être partagée entre plusieurs threads.
+    """
+
+    def __init__(self, repertoire='../data/cache/html', ttl=7 * 24 * 3600, taille_max=1024 ** 3):
+        """
+        Args:
+            repertoire (str, optional): Répertoire du cache.
+            ttl (float, optional): Durée en secondes pendant laquelle une page est
+                servie sans être revalidée. Par défaut une semaine.
+            taille_max (int, optional): Taille maximale en octets des pages compressées.
+                Par défaut 1 Gio.
+        """
+        self.repertoire = repertoire
+        self.ttl = ttl
+        self.taille_max = taille_max
+        os.makedirs(os.path.join(repertoire, 'objets'), exist_ok=True)
+        self._connexion = sqlite3.connect(os.path.join(repertoire, 'index.sqlite'), check_same_thread=False)
+        self._connexion.executescript(SCHEMA)
+        self._verrou = threading.Lock()
+        # Objets laissés par un index antérieur au nettoyage des contenus remplacés
+        self._supprimer_orphelins()
+        self._connexion.commit()
+
+    def _chemin_objet(self, empreinte):
+        return os.path.join(self.repertoire, 'objets', empreinte[:2], empreinte + '.html.gz')
+
+    def lire(self, url):
+        """
+        Lire une page du cache.
+
+        Args:
+            url (str): URL de la page.
+
+        Returns:
+            EntreeCache or None: Entrée du cache, `frais` indiquant si elle est encore
+            dans sa durée de validité ; None si la page est absente.
+        """
+        with self._verrou:
+            ligne = self._connexion.execute(
+                'SELECT empreinte, etag, last_modified, recupere_le FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if ligne is None:
+                compter('cache_html_absentes')
+                return None
+            empreinte, etag, last_modified, recupere_le = ligne
+            try:
+                with gzip.open(self._chemin_objet(empreinte), 'rt', encoding='utf-8') as fichier:
+                    html = fichier.read()
+            except OSError:
+                # Objet disparu du disque : l'entrée est inutilisable
+                self._connexion.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._supprimer_si_orphelin(empreinte)
+                self._connexion.commit()
+                compter('cache_html_absentes')
+                return None
+            maintenant = time.time()
+            self._connexion.execute('UPDATE pages SET dernier_acces = ? WHERE url = ?', (maintenant, url))
+            self._connexion.commit()
+        compter('cache_html_trouvees')
+        return EntreeCache(url, html, etag, last_modified, recupere_le, maintenant - recupere_le < self.ttl)
+
+    def ecrire(self, url, html, etag=None, last_modified=None, type_page='article'):
+        """
+        Enregistrer une page dans le cache.
+
+        Args:
+            url (str): URL de la page.
+            html (str): HTML brut de la page.
+            etag (str, optional): En-tête ETag de la réponse.
+            last_modified (str, optional): En-tête Last-Modified de la réponse.
+            type_page (str, optional): 'article' ou 'liens' (page de rubrique).
+        """
+        empreinte = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        chemin = self._chemin_objet(empreinte)
+        with self._verrou:
+            if not os.path.exists(chemin):
+                os.makedirs(os.path.dirname(chemin), exist_ok=True)
+                temporaire = f"{chemin}.{threading.get_ident()}.tmp"
+                with open(temporaire, 'wb') as fichier:
+                    fichier.write(gzip.compress(html.encode('utf-8'), mtime=0))
+                os.replace(temporaire, chemin)
+            self._connexion.execute(
+                'INSERT OR IGNORE INTO objets (empreinte, taille) VALUES (?, ?)',
+                (empreinte, os.path.getsize(chemin)),
+            )
+            ancienne = self._connexion.execute('SELECT empreinte FROM pages WHERE url = ?', (url,)).fetchone()
+            maintenant = time.time()
+            # ON CONFLICT conserve le rowid, donc l'ordre de première récupération
+            self._connexion.execute(
+                """
+                INSERT INTO pages (url, empreinte, type_page, etag, last_modified, recupere_le, dernier_acces)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    empreinte = excluded.empreinte, type_page = excluded.type_page,
+                    etag = excluded.etag, last_modified = excluded.last_modified,
+                    recupere_le = excluded.recupere_le, dernier_acces = excluded.dernier_acces
+                """,
+                (url, empreinte, type_page, etag, last_modified, maintenant, maintenant),
+            )
+            # Le contenu de l'URL a changé : l'ancien objet n'est peut-être plus référencé
+            if ancienne is not None and ancienne[0] != empreinte:
+                self._supprimer_si_orphelin(ancienne[0])
+            self._evincer()
+            self._connexion.commit()
+
+    def rafraichir(self, url):
+        """
+        Marquer une page comme revalidée (réponse 304) sans réécrire son contenu.
+
+        Args:
+            url (str): URL de la page.
+        """
+        with self._verrou:
+            maintenant = time.time()
+            self._connexion.execute(
+                'UPDATE pages SET recupere_le = ?, dernier_acces = ? WHERE url = ?', (maintenant, maintenant, url)
+            )
+            self._connexion.commit()
+
+    def _supprimer_objet(self, empreinte):
+        """Supprimer un objet de l'index et du disque, et renvoyer sa taille."""
+        ligne = self._connexion.execute('SELECT taille FROM objets WHERE empreinte = ?', (empreinte,)).fetchone()
+        self._connexion.execute('DELETE FROM objets WHERE empreinte = ?', (empreinte,))
+        try:
+            os.remove(self._chemin_objet(empreinte))
+        except FileNotFoundError:
+            pass
+        return ligne[0] if ligne else 0
+
+    def _supprimer_si_orphelin(self, empreinte):
+        """Supprimer un objet qu'aucune page ne référence plus, et renvoyer la taille libérée."""
+        encore_utilise = self._connexion.execute(
+            'SELECT 1 FROM pages WHERE empreinte = ? LIMIT 1', (empreinte,)
+        ).fetchone()
+        return 0 if encore_utilise else self._supprimer_objet(empreinte)
+
+    def _supprimer_orphelins(self):
+        """Supprimer tous les objets qu'aucune page ne référence, et renvoyer la taille libérée."""
+        orphelins = self._connexion.execute(
+            'SELECT empreinte FROM objets WHERE empreinte NOT IN (SELECT empreinte FROM pages)'
+        ).fetchall()
+        return sum(self._supprimer_objet(empreinte) for (empreinte,) in orphelins)
+
+    def _evincer(self):
+        """
+        Supprimer les objets orphelins, puis les pages les moins récemment utilisées tant
+        que le cache dépasse sa taille maximale.
+        """
+        taille = self._connexion.execute('SELECT COALESCE(SUM(taille), 0) FROM objets').fetchone()[0]
+        if taille <= self.taille_max:
+            return
+        taille -= self._supprimer_orphelins()
+        if taille <= self.taille_max:
+            return
+        pages = self._connexion.execute('SELECT url, empreinte FROM pages ORDER BY dernier_acces').fetchall()
+        for url, empreinte in pages:
+            self._connexion.execute('DELETE FROM pages WHERE url = ?', (url,))
+            taille -= self._supprimer_si_orphelin(empreinte)
+            if taille <= self.taille_max:
+                return
+
+    def urls(self, type_page='article'):
+        """
+        Lister les URL en cache dans l'ordre de leur première récupération.
+
+        Args:
+            type_page (str, optional): Type de page à lister. Par défaut 'article'.
+
+        Returns:
+            list: URL en cache.
+        """
+        with self._verrou:
+            lignes = self._connexion.execute(
+                'SELECT url FROM pages WHERE type_page = ? ORDER BY rowid', (type_page,)
+            ).fetchall()
+        return [url for (url,) in lignes]
+
+    def fermer(self):
+        """Fermer l'index du cache."""
+        with self._verrou:
+            self._connexion.close()
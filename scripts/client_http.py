@@ -0,0 +1,204 @@
+"""
+Module de récupération HTTP partagé par le scraper.
+
+Ce module fournit un client réutilisant ses connexions (keep-alive), qui relance
+les requêtes en échec avec un backoff exponentiel et envoie des requêtes
+conditionnelles (ETag / Last-Modified) pour les pages déjà récupérées.
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metriques import compter, instrumenter
+
+EN_TETES_PAR_DEFAUT = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+}
+
+# Codes HTTP pour lesquels une nouvelle tentative a une chance d'aboutir
+STATUTS_A_RELANCER = {408, 425, 429, 500, 502, 503, 504}
+
+Reponse = namedtuple('Reponse', ['url', 'statut', 'texte', 'etag', 'last_modified', 'non_modifie'])
+
+
+class LimiteurHote:
+    """
+    Espacer les requêtes adressées à un même hôte.
+
+    Remplace la pause fixe entre deux requêtes : chaque hôte dispose de son propre
+    créneau, si bien que des hôtes différents peuvent être interrogés en parallèle.
+    """
+
+    def __init__(self, delai=0.1):
+        """
+        Args:
+            delai (float, optional): Délai minimal en secondes entre deux requêtes
+                vers un même hôte. Par défaut à 0.1.
+        """
+        self.delai = delai
+        self._prochains_creneaux = {}
+        self._verrou = threading.Lock()
+
+    def attendre(self, url):
+        """
+        Bloquer jusqu'à ce que l'hôte de l'URL puisse de nouveau être interrogé.
+
+        Args:
+            url (str): URL sur le point d'être récupérée.
+        """
+        hote = urlparse(url).netloc
+        with self._verrou:
+            maintenant = time.monotonic()
+            creneau = max(maintenant, self._prochains_creneaux.get(hote, maintenant))
+            self._prochains_creneaux[hote] = creneau + self.delai
+        pause = creneau - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+
+class ClientHTTP:
+    """
+    Client HTTP avec pool de connexions, relances et requêtes conditionnelles.
+
+    Une même instance peut être partagée entre plusieurs threads.
+    """
+
+    def __init__(self, taille_pool=16, tentatives=3, backoff=0.5, backoff_max=30.0, timeout=10, limiteur=None,
+                 memoriser_versions=True):
+        """
+        Args:
+            taille_pool (int, optional): Nombre de connexions gardées ouvertes par hôte.
+            tentatives (int, optional): Nombre de relances après un premier échec.
+            backoff (float, optional): Délai de base en secondes avant la première relance.
+            backoff_max (float, optional): Délai maximal en secondes entre deux tentatives.
+            timeout (float, optional): Délai d'attente d'une réponse en secondes.
+            limiteur (LimiteurHote, optional): Politesse appliquée avant chaque requête.
+                Par défaut aucune.
+            memoriser_versions (bool, optional): Garder en mémoire la dernière version
+                des pages pour les requêtes conditionnelles suivantes. Inutile lorsque
+                l'appelant tient son propre cache.
+        """
+        self.limiteur = limiteur
+        self.memoriser_versions = memoriser_versions
+        self.tentatives = tentatives
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(EN_TETES_PAR_DEFAUT)
+        adaptateur = HTTPAdapter(pool_connections=taille_pool, pool_maxsize=taille_pool)
+        self.session.mount('http://', adaptateur)
+        self.session.mount('https://', adaptateur)
+        # Dernière version connue de chaque page : (etag, last_modified, texte)
+        self._versions = {}
+        self._verrou = threading.Lock()
+
+    def _delai(self, tentative, reponse=None):
+        """
+        Calculer l'attente avant la prochaine tentative.
+
+        Respecte l'en-tête Retry-After lorsqu'il est fourni, sinon applique un
+        backoff exponentiel avec gigue (« full jitter »).
+
+        Args:
+            tentative (int): Numéro de la tentative qui vient d'échouer (à partir de 0).
+            reponse (requests.Response, optional): Réponse reçue, le cas échéant.
+
+        Returns:
+            float: Délai en secondes.
+        """
+        if reponse is not None:
+            retry_after = reponse.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** tentative))
+
+    @instrumenter()
+    def recuperer(self, url, etag=None, last_modified=None):
+        """
+        Récupérer une page en relançant les échecs transitoires.
+
+        Si des validateurs sont fournis (ou connus d'une récupération précédente),
+        la requête est conditionnelle et une réponse 304 renvoie le texte déjà connu.
+
+        Args:
+            url (str): URL de la page.
+            etag (str, optional): ETag de la version déjà en possession de l'appelant.
+            last_modified (str, optional): Date Last-Modified de cette version.
+
+        Returns:
+            Reponse: Réponse de la page ; `texte` vaut None pour un 304 sans version connue.
+
+        Raises:
+            requests.RequestException: Si la page reste inaccessible après toutes les tentatives.
+        """
+        with self._verrou:
+            version = self._versions.get(url)
+        en_tetes = {}
+        if etag is None and last_modified is None and version:
+            etag, last_modified = version[0], version[1]
+        if etag:
+            en_tetes['If-None-Match'] = etag
+        if last_modified:
+            en_tetes['If-Modified-Since'] = last_modified
+
+        for tentative in range(self.tentatives + 1):
+            derniere = tentative == self.tentatives
+            if self.limiteur:
+                self.limiteur.attendre(url)
+            try:
+                reponse = self.session.get(url, headers=en_tetes, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if derniere:
+                    raise
+                compter('http_relances')
+                time.sleep(self._delai(tentative))
+                continue
+
+            compter('http_octets_telecharges', len(reponse.content))
+            if reponse.status_code in STATUTS_A_RELANCER and not derniere:
+                compter('http_relances')
+                time.sleep(self._delai(tentative, reponse))
+                continue
+
+            if reponse.status_code == 304:
+                compter('http_non_modifiees')
+                texte = version[2] if version else None
+                return Reponse(url, 304, texte, etag, last_modified, True)
+
+            reponse.raise_for_status()
+            compter('http_pages_recuperees')
+            nouvel_etag = reponse.headers.get('ETag')
+            nouveau_last_modified = reponse.headers.get('Last-Modified')
+            if self.memoriser_versions and (nouvel_etag or nouveau_last_modified):
+                with self._verrou:
+                    self._versions[url] = (nouvel_etag, nouveau_last_modified, reponse.text)
+            return Reponse(url, reponse.status_code, reponse.text, nouvel_etag, nouveau_last_modified, False)
+
+    def fermer(self):
+        """Fermer les connexions du pool."""
+        self.session.close()
+
+
+_client_partage = None
+_verrou_client = threading.Lock()
+
+
+def client_partage():
+    """
+    Renvoyer le client HTTP commun à tout le processus, créé à la première utilisation.
+
+    Returns:
+        ClientHTTP: Client partagé.
+    """
+    global _client_partage
+    with _verrou_client:
+        if _client_partage is None:
+            _client_partage = ClientHTTP()
+        return _client_partage
@@ -0,0 +1,2 @@
+# test_de_significativite.py est un script d'analyse, pas un module de tests
+collect_ignore = ['test_de_significativite.py']
@@ -0,0 +1,198 @@
+"""
+Module d'écriture et de lecture en flux du corpus d'articles.
+
+Le corpus peut être enregistré au format JSON Lines (un article par ligne),
+éventuellement compressé en gzip (.jsonl.gz) ou zstd (.jsonl.zst). Chaque article
+est écrit et vidé sur disque dès qu'il est scrapé, et la lecture se fait article
+par article ou par lots de DataFrame, si bien que la mémoire ne dépend pas de la
+taille du corpus. Les fichiers JSON écrits par ecrire_json restent lisibles, de
+même que les corpus Parquet de corpus_parquet.
+"""
+
+import gzip
+import json
+import os
+
+import pandas as pd
+
+EXTENSIONS_JSONL = ('.jsonl', '.jsonl.gz', '.jsonl.zst')
+
+
+def est_jsonl(chemin):
+    """
+    Indiquer si un fichier de corpus est au format JSON Lines d'après son extension.
+
+    Args:
+        chemin (str): Chemin du fichier.
+
+    Returns:
+        bool: True pour .jsonl, .jsonl.gz et .jsonl.zst.
+    """
+    return chemin.endswith(EXTENSIONS_JSONL)
+
+
+def chemin_partiel(chemin):
+    """
+    Renvoyer le chemin du fichier temporaire où EcrivainJSONL écrit un corpus.
+
+    Le fichier est caché dans le même répertoire et garde l'extension du fichier
+    final, donc sa compression.
+
+    Args:
+        chemin (str): Fichier de sortie.
+
+    Returns:
+        str: Chemin du fichier temporaire.
+    """
+    repertoire, nom = os.path.split(chemin)
+    return os.path.join(repertoire, f".partiel.{nom}")
+
+
+def _ouvrir(chemin, mode):
+    """
+    Ouvrir un fichier texte en choisissant la compression d'après l'extension.
+
+    Args:
+        chemin (str): Chemin du fichier.
+        mode (str): 'r', 'w' ou 'a'.
+
+    Returns:
+        io.TextIOBase: Flux texte UTF-8.
+    """
+    if chemin.endswith('.gz'):
+        return gzip.open(chemin, mode + 't', encoding='utf-8')
+    if chemin.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("La compression zstd nécessite le paquet zstandard (pip install zstandard).") from e
+        return zstandard.open(chemin, mode + 't', encoding='utf-8')
+    return open(chemin, mode, encoding='utf-8')
+
+
+class EcrivainJSONL:
+    """
+    Écrire un corpus article par article au format JSON Lines.
+
+    Les articles sont écrits dans un fichier temporaire (voir chemin_partiel) qui ne
+    remplace le fichier de sortie qu'à la fermeture : un crawl interrompu ne laisse
+    jamais un corpus à moitié écrit à la place du précédent.
+    """
+
+    def __init__(self, chemin):
+        """
+        Args:
+            chemin (str): Fichier de sortie ; l'extension choisit la compression.
+        """
+        self.chemin = chemin
+        self.chemin_partiel = chemin_partiel(chemin)
+        repertoire = os.path.dirname(chemin)
+        if repertoire:
+            os.makedirs(repertoire, exist_ok=True)
+        self._flux = _ouvrir(self.chemin_partiel, 'w')
+        self.ecrits = 0
+
+    def ecrire(self, article):
+        """
+        Écrire un article et le vider sur disque.
+
+        Args:
+            article (dict): Article à écrire.
+        """
+        self._flux.write(json.dumps(article, ensure_ascii=False))
+        self._flux.write('\n')
+        self._flux.flush()
+        self.ecrits += 1
+
+    def fermer(self):
+        """Fermer le fichier et le mettre à la place du fichier de sortie."""
+        self._flux.close()
+        os.replace(self.chemin_partiel, self.chemin)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exception, exception, trace):
+        if type_exception is None:
+            self.fermer()
+        else:
+            self._flux.close()
+
+
+def iterer_articles(chemin):
+    """
+    Parcourir les articles d'un fichier de corpus sans le charger en entier.
+
+    Les fichiers JSON Lines sont lus ligne à ligne ; une dernière ligne tronquée
+    (crawl interrompu) est ignorée. Les fichiers JSON classiques sont lus d'un bloc.
+
+    Args:
+        chemin (str): Fichier .json, .jsonl, .jsonl.gz ou .jsonl.zst.
+
+    Yields:
+        dict: Article.
+    """
+    if not est_jsonl(chemin):
+        with open(chemin, 'r', encoding='utf-8') as fichier:
+            yield from json.load(fichier)
+        return
+    with _ouvrir(chemin, 'r') as fichier:
+        try:
+            for ligne in fichier:
+                if not ligne.strip():
+                    continue
+                try:
+                    yield json.loads(ligne)
+                except json.JSONDecodeError:
+                    if not ligne.endswith('\n'):
+                        return
+                    raise
+        except EOFError:
+            # Flux compressé tronqué : on s'arrête au dernier article complet
+            return
+
+
+def lire_par_lots(chemin, taille_lot=10000, colonnes=None):
+    """
+    Lire un fichier de corpus par lots de taille fixe.
+
+    Args:
+        chemin (str): Fichier de corpus JSON, JSON Lines ou Parquet.
+        taille_lot (int, optional): Nombre d'articles par lot. Par défaut à 10000.
+        colonnes (list, optional): Colonnes à conserver. Par défaut toutes.
+
+    Yields:
+        DataFrame: Lot d'articles.
+    """
+    if chemin.endswith('.parquet'):
+        from corpus_parquet import lire_corpus_parquet_par_lots
+        yield from lire_corpus_parquet_par_lots(chemin, taille_lot, colonnes)
+        return
+    lot = []
+    for article in iterer_articles(chemin):
+        lot.append(article if colonnes is None else {cle: article.get(cle) for cle in colonnes})
+        if len(lot) >= taille_lot:
+            yield pd.DataFrame(lot, columns=colonnes)
+            lot = []
+    if lot:
+        yield pd.DataFrame(lot, columns=colonnes)
+
+
+def charger_dataframe(chemin, colonnes=None):
+    """
+    Charger tout un fichier de corpus, JSON, JSON Lines ou Parquet, dans un DataFrame.
+
+    Args:
+        chemin (str): Fichier de corpus.
+        colonnes (list, optional): Colonnes à conserver. Par défaut toutes.
+
+    Returns:
+        DataFrame: Articles du corpus.
+    """
+    if chemin.endswith('.parquet'):
+        from corpus_parquet import lire_corpus_parquet
+        return lire_corpus_parquet(chemin, colonnes)
+    lots = list(lire_par_lots(chemin, colonnes=colonnes))
+    if not lots:
+        return pd.DataFrame(columns=colonnes)
+    return pd.concat(lots, ignore_index=True)
@@ -0,0 +1,146 @@
+"""
+Module de stockage du corpus au format colonnaire Parquet.
+
+Le corpus (id, url, article, description) est enregistré une seule fois avec des
+colonnes typées et les nombres de tokens déjà calculés. La lecture est projetée sur
+les seules colonnes demandées et passe par une projection mémoire du fichier, ce qui
+évite de réanalyser du CSV ou du JSON à chaque script.
+
+Comme dans le CSV de data_loading, l'identifiant `id` est le rang entier de l'article
+dans le corpus, si bien que les deux stockages se joignent sur `id` ; l'identifiant
+d'origine du scraping (l'URL) est conservé dans la colonne `url`.
+
+Usage :
+    python corpus_parquet.py ../data/clean/donnees_scrapees.json ../data/clean/corpus.parquet
+"""
+
+import argparse
+
+import pandas as pd
+
+from statistiques_texte import compter_tokens
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Colonnes lues dans le corpus du scraping, dont l'id d'origine (URL)
+COLONNES_TEXTE = ['id', 'article', 'description']
+COLONNES_TOKENS = ['article_tokens', 'description_tokens']
+
+
+def _verifier_pyarrow():
+    if pa is None:
+        raise ImportError("Le format Parquet nécessite le paquet pyarrow (pip install pyarrow).")
+
+
+def schema_corpus():
+    """
+    Renvoyer le schéma Arrow du corpus.
+
+    Returns:
+        pyarrow.Schema: Rang, URL, colonnes texte et nombres de tokens.
+    """
+    _verifier_pyarrow()
+    return pa.schema([
+        ('id', pa.int64()),
+        ('url', pa.string()),
+        ('article', pa.string()),
+        ('description', pa.string()),
+        ('article_tokens', pa.int32()),
+        ('description_tokens', pa.int32()),
+    ])
+
+
+def preparer_lot(df, debut=0):
+    """
+    Mettre un lot d'articles au format du corpus en calculant les nombres de tokens.
+
+    Les tokens sont comptés par compter_tokens de statistiques_texte (découpage
+    sur les espaces), comme dans data_visualisation.
+
+    Args:
+        df (DataFrame): Lot avec au moins les colonnes id (identifiant d'origine),
+            article et description.
+        debut (int, optional): Rang dans le corpus du premier article du lot.
+
+    Returns:
+        DataFrame: Lot avec les colonnes du schéma, dans l'ordre.
+    """
+    lot = df[COLONNES_TEXTE].copy()
+    lot.insert(1, 'url', lot['id'].astype(str))
+    lot['id'] = pd.RangeIndex(debut, debut + len(lot)).to_numpy(dtype='int64')
+    lot['article_tokens'] = compter_tokens(lot['article']).astype('int32')
+    lot['description_tokens'] = compter_tokens(lot['description']).astype('int32')
+    return lot
+
+
+def ecrire_corpus_parquet(lots, chemin):
+    """
+    Écrire un corpus au format Parquet, un groupe de lignes par lot.
+
+    Args:
+        lots (DataFrame or iterable): Corpus entier ou lots successifs d'articles.
+        chemin (str): Fichier Parquet de sortie.
+
+    Returns:
+        int: Nombre d'articles écrits.
+    """
+    _verifier_pyarrow()
+    if isinstance(lots, pd.DataFrame):
+        lots = [lots]
+    schema = schema_corpus()
+    total = 0
+    with pq.ParquetWriter(chemin, schema, compression='zstd') as ecrivain:
+        for lot in lots:
+            table = pa.Table.from_pandas(preparer_lot(lot, total), schema=schema, preserve_index=False)
+            ecrivain.write_table(table)
+            total += table.num_rows
+    return total
+
+
+def lire_corpus_parquet(chemin, colonnes=None):
+    """
+    Lire un corpus Parquet en ne chargeant que les colonnes demandées.
+
+    Args:
+        chemin (str): Fichier Parquet.
+        colonnes (list, optional): Colonnes à lire. Par défaut toutes.
+
+    Returns:
+        DataFrame: Corpus.
+    """
+    _verifier_pyarrow()
+    return pq.read_table(chemin, columns=colonnes, memory_map=True).to_pandas()
+
+
+def lire_corpus_parquet_par_lots(chemin, taille_lot=10000, colonnes=None):
+    """
+    Parcourir un corpus Parquet par lots sans le charger en entier.
+
+    Args:
+        chemin (str): Fichier Parquet.
+        taille_lot (int, optional): Nombre d'articles par lot. Par défaut à 10000.
+        colonnes (list, optional): Colonnes à lire. Par défaut toutes.
+
+    Yields:
+        DataFrame: Lot d'articles.
+    """
+    _verifier_pyarrow()
+    fichier = pq.ParquetFile(chemin, memory_map=True)
+    for lot in fichier.iter_batches(batch_size=taille_lot, columns=colonnes):
+        yield lot.to_pandas()
+
+
+if __name__ == "__main__":
+    from corpus_jsonl import lire_par_lots
+
+    parseur = argparse.ArgumentParser(description="Convertir un corpus JSON ou JSON Lines en Parquet.")
+    parseur.add_argument('entree', help="Fichier JSON ou JSON Lines du corpus")
+    parseur.add_argument('sortie', help="Fichier Parquet de sortie")
+    parseur.add_argument('--taille-lot', type=int, default=10000, help="Nombre d'articles par groupe de lignes")
+    args = parseur.parse_args()
+    nombre = ecrire_corpus_parquet(lire_par_lots(args.entree, args.taille_lot, COLONNES_TEXTE), args.sortie)
+    print(f"{nombre} articles enregistrés dans {args.sortie}")
@@ -0,0 +1,326 @@
+"""
+Module de génération de corpus synthétiques en français, pour les bancs d'essai.
+
+Les articles imitent ceux du scraper (identifiant URL, titre et paragraphes dans
+le champ article, description) : les mots suivent une loi de Zipf sur un
+vocabulaire de mots outils, de mots pleins, de formes élidées (l'état, d'abord),
+d'abréviations (M., etc.), de nombres et de pseudo-mots pour la longue traîne. Les
+phrases commencent par une majuscule et se terminent par une ponctuation forte ;
+les descriptions reprennent surtout des mots de leur article, ce qui donne des
+similarités cosines réalistes. Tout le corpus est déterminé par sa graine.
+
+Le module produit aussi un site HTML statique (pages de rubrique et articles au
+format attendu par extraction_html) et le sert en local, pour mesurer le scraper
+sans réseau.
+
+Usage :
+    python corpus_synthetique.py corpus 10000 ../data/cache/bench/corpus_10000.jsonl
+    python corpus_synthetique.py site ../data/cache/bench/site --pages 200
+"""
+
+import argparse
+import contextlib
+import functools
+import html
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+MOTS_OUTILS = [
+    'de', 'la', 'le', 'et', 'les', 'des', 'en', 'un', 'une', 'du', 'à', 'est', 'pour', 'que', 'qui',
+    'dans', 'a', 'par', 'plus', 'pas', 'au', 'sur', 'ne', 'se', 'ce', 'il', 'sont', 'avec', 'son',
+    'elle', 'aux', 'ou', 'ont', 'sa', 'ses', 'mais', 'comme', 'on', 'tout', 'nous', 'été', 'leur',
+    'cette', 'ils', 'y', 'entre', 'après', 'depuis', 'sans', 'selon', 'encore', 'lors', 'aussi',
+]
+
+MOTS_PLEINS = [
+    'gouvernement', 'ministre', 'président', 'ville', 'projet', 'police', 'enquête', 'habitants',
+    'commune', 'maire', 'conseil', 'élection', 'budget', 'travaux', 'transport', 'école', 'hôpital',
+    'entreprise', 'salariés', 'grève', 'match', 'équipe', 'saison', 'victoire', 'joueurs', 'public',
+    'festival', 'concert', 'exposition', 'musée', 'théâtre', 'film', 'réseau', 'région', 'département',
+    'tribunal', 'procès', 'victime', 'suspect', 'justice', 'loi', 'réforme', 'santé', 'climat',
+    'énergie', 'logement', 'prix', 'marché', 'économie', 'emploi', 'association', 'quartier', 'rue',
+    'gare', 'métro', 'vélo', 'voiture', 'accident', 'incendie', 'pompiers', 'secours', 'témoin',
+    'semaine', 'année', 'mois', 'jour', 'soir', 'matin', 'heure', 'nombreux', 'nouveau', 'grand',
+    'premier', 'dernier', 'important', 'national', 'local', 'public', 'annoncé', 'expliqué', 'déclaré',
+    'indiqué', 'précisé', 'estimé', 'décidé', 'ouvert', 'fermé', 'lancé', 'prévu', 'attendu',
+]
+
+# Mots pleins commençant par une voyelle, pour les formes élidées
+MOTS_ELIDABLES = ['état', 'enquête', 'école', 'hôpital', 'entreprise', 'équipe', 'exposition', 'emploi',
+                  'association', 'accident', 'incendie', 'année', 'heure', 'abord', 'ailleurs', 'été']
+
+ABREVIATIONS = ['M.', 'Mme', 'Dr', 'etc.', 'p.', 'av.', 'n°']
+
+SYLLABES = ['ba', 'be', 'bri', 'ca', 'co', 'cla', 'da', 'de', 'dou', 'fa', 'fi', 'gra', 'ja', 'la', 'le',
+            'li', 'lo', 'ma', 'me', 'mi', 'mo', 'na', 'ne', 'no', 'pa', 'pe', 'pi', 'po', 'pra', 'ra',
+            're', 'ri', 'ro', 'sa', 'se', 'si', 'so', 'ta', 'te', 'ti', 'to', 'tra', 'va', 've', 'vi']
+
+TERMINAISONS = ['', 'on', 'ent', 'ique', 'ment', 'eur', 'ie', 'age', 'ais', 'elle', 'isme', 'é']
+
+RUBRIQUES = ['politique', 'faits-divers', 'societe', 'sports', 'culture', 'economie', 'environnement']
+
+# Nombre médian de mots par article et par description ; les longueurs suivent une
+# loi log-normale à longue traîne, comme celles du corpus scrapé
+MOTS_ARTICLE = 60
+MOTS_DESCRIPTION = 23
+
+
+@functools.lru_cache(maxsize=8)
+def vocabulaire_synthetique(taille=20000, graine=0):
+    """
+    Construire le vocabulaire, du plus fréquent au moins fréquent.
+
+    Args:
+        taille (int, optional): Nombre de mots. Par défaut à 20000.
+        graine (int, optional): Graine des pseudo-mots. Par défaut à 0.
+
+    Returns:
+        numpy.ndarray: Mots du vocabulaire (objets str), par rang.
+    """
+    rng = np.random.default_rng([graine, 1])
+    # Mots outils aux premiers rangs, puis les autres mots réels mélangés, puis les pseudo-mots
+    reels = list(dict.fromkeys(
+        [f"{elision}'{mot}" for mot in MOTS_ELIDABLES for elision in ('l', 'd')] + MOTS_PLEINS + ABREVIATIONS
+        + [str(annee) for annee in range(1990, 2026)] + ['3,5', '12,8', '1.200']
+    ))
+    rng.shuffle(reels)
+    mots = list(dict.fromkeys(MOTS_OUTILS + reels))
+    connus = set(mots)
+    while len(mots) < taille:
+        mot = ''.join(rng.choice(SYLLABES, rng.integers(2, 5))) + rng.choice(TERMINAISONS)
+        if mot not in connus:
+            connus.add(mot)
+            mots.append(mot)
+    return np.array(mots[:taille], dtype=object)
+
+
+def _probabilites_zipf(taille, exposant=1.07):
+    poids = 1.0 / np.arange(1, taille + 1) ** exposant
+    return poids / poids.sum()
+
+
+def _textes(rng, vocabulaire, majuscules, indices, longueurs, avec_point, fin_paragraphe=0.0):
+    """Assembler des phrases de mots tirés, une chaîne par texte."""
+    n_mots = int(longueurs.sum())
+    # Fins de phrase tous les 6 à 28 mots, et à la fin de chaque texte
+    debut_textes = np.concatenate([[0], np.cumsum(longueurs)[:-1]])
+    fins = np.zeros(n_mots, dtype=bool)
+    fins[np.cumsum(longueurs) - 1] = True
+    positions = np.cumsum(rng.integers(6, 29, size=n_mots // 6 + 1))
+    fins[positions[positions < n_mots]] = True
+    debuts = np.zeros(n_mots, dtype=bool)
+    debuts[debut_textes] = True
+    debuts[1:] |= fins[:-1]
+    jetons = np.where(debuts, majuscules[indices], vocabulaire[indices])
+    if avec_point:
+        ponctuation = rng.choice(np.array(['.', '.', '.', '.', '!', '?', '…'], dtype=object), int(fins.sum()))
+        paragraphe = rng.random(int(fins.sum())) < fin_paragraphe
+        jetons[fins] = jetons[fins] + ponctuation + np.where(paragraphe, '\n', '')
+    textes = []
+    for debut, longueur in zip(debut_textes.tolist(), longueurs.tolist()):
+        texte = ' '.join(jetons[debut:debut + longueur].tolist())
+        textes.append(texte.replace('\n ', '\n').strip() if fin_paragraphe else texte)
+    return textes
+
+
+def generer_lot(debut, n, graine=0, vocabulaire=None):
+    """
+    Générer les articles debut à debut + n - 1 d'un corpus synthétique.
+
+    Args:
+        debut (int): Numéro du premier article.
+        n (int): Nombre d'articles.
+        graine (int, optional): Graine du corpus. Par défaut à 0.
+        vocabulaire (numpy.ndarray, optional): Vocabulaire. Par défaut vocabulaire_synthetique().
+
+    Returns:
+        DataFrame: Colonnes id, article et description, au format du scraper.
+    """
+    vocabulaire = vocabulaire_synthetique() if vocabulaire is None else vocabulaire
+    probabilites = _probabilites_zipf(len(vocabulaire))
+    majuscules = np.array([mot[:1].upper() + mot[1:] for mot in vocabulaire.tolist()], dtype=object)
+    # Une graine par lot : un article ne dépend que de la graine et de son numéro de lot
+    rng = np.random.default_rng([graine, 2, debut])
+
+    longueurs_titres = rng.integers(6, 13, size=n)
+    longueurs_articles = np.clip(rng.lognormal(np.log(MOTS_ARTICLE), 1.3, size=n), 10, 20000).astype(np.int64)
+    longueurs_descriptions = np.clip(rng.lognormal(np.log(MOTS_DESCRIPTION), 0.4, size=n), 3, 100).astype(np.int64)
+
+    indices_titres = rng.choice(len(vocabulaire), longueurs_titres.sum(), p=probabilites)
+    titres = _textes(rng, vocabulaire, majuscules, indices_titres, longueurs_titres, avec_point=False)
+    indices_articles = rng.choice(len(vocabulaire), longueurs_articles.sum(), p=probabilites)
+    corps = _textes(rng, vocabulaire, majuscules, indices_articles, longueurs_articles, avec_point=True,
+                    fin_paragraphe=0.3)
+
+    # Les descriptions reprennent surtout des mots de leur article
+    debuts_articles = np.concatenate([[0], np.cumsum(longueurs_articles)[:-1]])
+    proprietaire = np.repeat(np.arange(n), longueurs_descriptions)
+    repris = indices_articles[debuts_articles[proprietaire]
+                              + (rng.random(len(proprietaire)) * longueurs_articles[proprietaire]).astype(np.int64)]
+    nouveaux = rng.choice(len(vocabulaire), len(proprietaire), p=probabilites)
+    indices_descriptions = np.where(rng.random(len(proprietaire)) < 0.7, repris, nouveaux)
+    descriptions = _textes(rng, vocabulaire, majuscules, indices_descriptions, longueurs_descriptions, avec_point=True)
+
+    numeros = np.arange(debut, debut + n)
+    rubriques = np.array(RUBRIQUES, dtype=object)[numeros % len(RUBRIQUES)]
+    return pd.DataFrame({
+        'id': [f'https://www.exemple.fr/{rubrique}/article-{numero}.php'
+               for rubrique, numero in zip(rubriques.tolist(), numeros.tolist())],
+        'article': [f'{titre}\n\n{texte}' for titre, texte in zip(titres, corps)],
+        'description': descriptions,
+    })
+
+
+def generer_corpus(n, graine=0, taille_lot=10000):
+    """
+    Générer un corpus synthétique par lots.
+
+    Args:
+        n (int): Nombre d'articles.
+        graine (int, optional): Graine du corpus. Par défaut à 0.
+        taille_lot (int, optional): Nombre d'articles par lot. Par défaut à 10000.
+
+    Yields:
+        DataFrame: Lots d'articles ; les n premiers articles d'un corpus plus grand
+        de même graine et de même taille de lot sont identiques.
+    """
+    for debut in range(0, n, taille_lot):
+        yield generer_lot(debut, min(taille_lot, n - debut), graine)
+
+
+def ecrire_corpus(chemin, n, graine=0, taille_lot=10000):
+    """
+    Écrire un corpus synthétique en JSON Lines, sauf s'il existe déjà.
+
+    Args:
+        chemin (str): Fichier JSON Lines (.jsonl, .jsonl.gz, .jsonl.zst).
+        n (int): Nombre d'articles.
+        graine (int, optional): Graine du corpus. Par défaut à 0.
+        taille_lot (int, optional): Nombre d'articles par lot. Par défaut à 10000.
+
+    Returns:
+        str: Chemin du fichier.
+    """
+    from corpus_jsonl import EcrivainJSONL
+
+    if os.path.exists(chemin):
+        return chemin
+    if os.path.dirname(chemin):
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    with EcrivainJSONL(chemin) as sortie:
+        for lot in generer_corpus(n, graine, taille_lot):
+            for article in lot.to_dict('records'):
+                sortie.ecrire(article)
+    return chemin
+
+
+def _page_article(titre, paragraphes, description):
+    contenu = '\n'.join(f'<p>{html.escape(paragraphe)}</p>' for paragraphe in paragraphes)
+    return f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titre)}</title>
+<meta name="description" content="{html.escape(description, quote=True)}">
+<script>window.dataLayer = window.dataLayer || [];</script>
+<style>body {{ font-family: sans-serif; }}</style>
+</head>
+<body>
+<nav><a href="/">Accueil</a> <a href="/rubrique-0.html">Actualités</a></nav>
+<article>
+<h1>{html.escape(titre)}</h1>
+<meta name="description" content="Résumé interne à l'article">
+{contenu}
+</article>
+<footer><p>Mentions légales</p></footer>
+</body>
+</html>
+"""
+
+
+def generer_site(repertoire, base, pages=200, rubriques=5, graine=0):
+    """
+    Écrire un site statique : pages de rubrique liant des pages d'article.
+
+    Args:
+        repertoire (str): Répertoire du site.
+        base (str): URL de base du site (les liens sont absolus, comme sur le site réel).
+        pages (int, optional): Nombre de pages d'article. Par défaut à 200.
+        rubriques (int, optional): Nombre de pages de rubrique. Par défaut à 5.
+        graine (int, optional): Graine du contenu. Par défaut à 0.
+
+    Returns:
+        list: URL des pages de rubrique.
+    """
+    os.makedirs(os.path.join(repertoire, 'articles'), exist_ok=True)
+    articles = generer_lot(0, pages, graine)
+    for numero, (texte, description) in enumerate(zip(articles['article'], articles['description'])):
+        titre, _, corps = texte.partition('\n\n')
+        with open(os.path.join(repertoire, 'articles', f'{numero}.html'), 'w', encoding='utf-8') as fichier:
+            fichier.write(_page_article(titre, corps.split('\n'), description))
+
+    urls = []
+    for rubrique in range(rubriques):
+        liens = [f'{base}/articles/{numero}.html' for numero in range(rubrique, pages, rubriques)]
+        # Liens de navigation, vers une ancre et hors du site, comme sur une vraie page
+        liens += [f'{base}/', f'{base}/rubrique-{(rubrique + 1) % rubriques}.html#haut', 'mailto:contact@exemple.fr']
+        contenu = '\n'.join(f'<li><a href="{lien}">{lien}</a></li>' for lien in liens)
+        with open(os.path.join(repertoire, f'rubrique-{rubrique}.html'), 'w', encoding='utf-8') as fichier:
+            fichier.write(f'<!DOCTYPE html>\n<html lang="fr"><head><meta charset="utf-8"><title>Rubrique {rubrique}'
+                          f'</title></head>\n<body><ul>\n{contenu}\n</ul></body></html>\n')
+        urls.append(f'{base}/rubrique-{rubrique}.html')
+    with open(os.path.join(repertoire, 'urls.txt'), 'w', encoding='utf-8') as fichier:
+        fichier.write('\n'.join(urls) + '\n')
+    return urls
+
+
+class _GestionnaireSilencieux(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def servir_repertoire(repertoire):
+    """
+    Servir un répertoire en HTTP sur l'interface locale, sur un port libre.
+
+    Args:
+        repertoire (str): Répertoire à servir.
+
+    Yields:
+        str: URL de base du serveur.
+    """
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0),
+                                  functools.partial(_GestionnaireSilencieux, directory=repertoire))
+    fil = threading.Thread(target=serveur.serve_forever, daemon=True)
+    fil.start()
+    try:
+        yield f'http://127.0.0.1:{serveur.server_address[1]}'
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Générer un corpus ou un site synthétique en français.")
+    sous_parseurs = parseur.add_subparsers(dest='commande', required=True)
+    parseur_corpus = sous_parseurs.add_parser('corpus', help="Écrire un corpus JSON Lines")
+    parseur_corpus.add_argument('n', type=int, help="Nombre d'articles")
+    parseur_corpus.add_argument('sortie', help="Fichier .jsonl, .jsonl.gz ou .jsonl.zst")
+    parseur_corpus.add_argument('--graine', type=int, default=0, help="Graine du corpus")
+    parseur_site = sous_parseurs.add_parser('site', help="Écrire un site HTML statique")
+    parseur_site.add_argument('repertoire', help="Répertoire du site")
+    parseur_site.add_argument('--base', default='http://127.0.0.1:8000', help="URL de base des liens")
+    parseur_site.add_argument('--pages', type=int, default=200, help="Nombre de pages d'article")
+    parseur_site.add_argument('--graine', type=int, default=0, help="Graine du contenu")
+    args = parseur.parse_args()
+
+    if args.commande == 'corpus':
+        print(f"Corpus écrit dans {ecrire_corpus(args.sortie, args.n, args.graine)}")
+    else:
+        urls = generer_site(args.repertoire, args.base, args.pages, graine=args.graine)
+        print(f"{args.pages} articles et {len(urls)} rubriques écrits dans {args.repertoire}")
@@ -5,70 +5,250 @@ Ce module charge les données JSON générées par un script de scraping, vérif
 les convertit en DataFrame, et enregistre les données dans un fichier CSV. Il charge également
 un jeu de données de référence à l'aide de la librairie datasets de Huggingface.
 pour finir le script permet de split le data set en train dev et test. 
+
+Chaque traitement est une étape appelable ; l'import du module n'effectue aucune
+lecture, écriture ni accès réseau, et pandas, datasets et sklearn ne sont
+importés qu'à l'usage. Les étapes se lancent en ligne de commande :
+    python data_loading.py [csv|parquet|cache-reference|reference|split|tout]
 """
 
-import pandas as pd
+import argparse
 import json
-from datasets import load_dataset
-from sklearn.model_selection import train_test_split
+import os
+
+# Chemin vers le fichier JSON (ou JSON Lines : .jsonl, .jsonl.gz, .jsonl.zst)
+FICHIER_SCRAPE = '../data/clean/donnees_scrapees.json'
+FICHIER_CSV = '../data/clean/donnees_scrapees.csv'
+FICHIER_PARQUET = '../data/clean/corpus.parquet'
+REPERTOIRE_SPLITS = '../data/clean'
+REPERTOIRE_REFERENCE = '../data/cache/reference'
 
-# Chemin vers le fichier JSON
-file_path = '../data/clean/donnees_scrapees.json'
+def charger_donnees_scrapees(file_path=FICHIER_SCRAPE):
+    """
+    Charge les données générées par le script scrap_data.py et vérifie leur structure.
+    
+    Parameters:
+    file_path (str): Chemin vers le fichier JSON ou JSON Lines du scraping.
+    
+    Returns:
+    DataFrame: Articles, identifiés par leur rang (colonne id) avec leur URL d'origine
+    (colonne url), ou DataFrame vide si le fichier est invalide.
+    """
+    import pandas as pd
+    from corpus_jsonl import charger_dataframe
 
-# Charger les données JSON générées par le script scrap_data.py
-with open(file_path, 'r', encoding='utf-8') as file:
+    # Charger les données, lues en flux par lots
     try:
-        data = json.load(file)
+        df = charger_dataframe(file_path)
     except json.JSONDecodeError as e:
         print(f"Erreur de décodage JSON: {e}")
-        data = []
+        df = pd.DataFrame()
 
-# Vérifier la structure des données JSON
-if data and isinstance(data, list):
-    df = pd.DataFrame(data)
-    df["id"] = df.index
-else:
-    print("Les données JSON ne sont pas au format attendu.")
-    df = pd.DataFrame()
+    # Vérifier la structure des données JSON
+    if not df.empty and 'article' in df.columns:
+        if 'id' in df.columns and 'url' not in df.columns:
+            # L'identifiant d'origine (URL) est conservé, comme dans le corpus Parquet
+            df = df.rename(columns={'id': 'url'})
+        if 'id' in df.columns:
+            df["id"] = df.index
+        else:
+            df.insert(0, "id", df.index)
+    else:
+        print("Les données JSON ne sont pas au format attendu.")
+        df = pd.DataFrame()
+    return df
 
-# Afficher les premières lignes du DataFrame pour vérification
-print(df.head(10))
+def convertir_en_csv(file_path=FICHIER_SCRAPE, output_path=FICHIER_CSV):
+    """
+    Enregistre les données du scraping dans un fichier CSV.
+    
+    Parameters:
+    file_path (str): Chemin vers le fichier JSON ou JSON Lines du scraping.
+    output_path (str): Chemin du fichier CSV de sortie.
+    
+    Returns:
+    DataFrame: Données enregistrées.
+    """
+    df = charger_donnees_scrapees(file_path)
 
-# Enregistrer les données extraites dans un fichier CSV
-output_path_json = '../data/clean/donnees_scrapees.csv'
-df.to_csv(output_path_json, index=False, encoding='utf-8')
-print(f"Données JSON enregistrées dans {output_path_json}")
+    # Afficher les premières lignes du DataFrame pour vérification
+    print(df.head(10))
 
-# Charger un jeu de données de référence avec la librairie datasets de huggingface
-dataset = load_dataset("cnn_dailymail", "3.0.0")
-train_df = dataset['train'].to_pandas()
+    df.to_csv(output_path, index=False, encoding='utf-8')
+    print(f"Données JSON enregistrées dans {output_path}")
+    return df
 
-# Afficher les premières lignes du jeu de données de référence
-print(train_df.head())
+def convertir_en_parquet(file_path=FICHIER_SCRAPE, output_path=FICHIER_PARQUET):
+    """
+    Enregistre le corpus au format Parquet, avec les nombres de tokens, pour des lectures
+    rapides et projetées sur les colonnes. Les articles y sont identifiés par leur rang,
+    comme dans le CSV, et leur URL d'origine est conservée dans la colonne url.
+    
+    Parameters:
+    file_path (str): Chemin vers le fichier JSON ou JSON Lines du scraping.
+    output_path (str): Chemin du fichier Parquet de sortie.
+    
+    Returns:
+    int: Nombre d'articles enregistrés.
+    """
+    from corpus_jsonl import lire_par_lots
+    from corpus_parquet import COLONNES_TEXTE, ecrire_corpus_parquet
 
-def load_articles_data(filepath):
+    nombre = ecrire_corpus_parquet(lire_par_lots(file_path, colonnes=COLONNES_TEXTE), output_path)
+    print(f"Corpus enregistré dans {output_path}")
+    return nombre
+
+def _chemin_reference(repertoire, nom, version):
+    return os.path.join(repertoire, f"{nom.replace('/', '__')}-{version}")
+
+def _passer_hors_ligne():
     """
-    Charge les données des articles à partir d'un fichier CSV.
+    Empêche datasets et huggingface_hub de contacter le réseau.
+    """
+    os.environ['HF_DATASETS_OFFLINE'] = '1'
+    os.environ['HF_HUB_OFFLINE'] = '1'
+    import datasets
+    if hasattr(datasets.config, 'HF_DATASETS_OFFLINE'):
+        datasets.config.HF_DATASETS_OFFLINE = True
+    if hasattr(datasets.config, 'HF_HUB_OFFLINE'):
+        datasets.config.HF_HUB_OFFLINE = True
+
+def preparer_cache_reference(nom="cnn_dailymail", version="3.0.0", repertoire=REPERTOIRE_REFERENCE):
+    """
+    Télécharge le jeu de données de référence et l'enregistre au format Arrow dans un
+    répertoire local, à faire une fois sur une machine ayant accès au réseau.
     
     Parameters:
-    filepath (str): Chemin vers le fichier CSV contenant les données des articles.
+    nom (str): Nom du jeu de données sur le hub.
+    version (str): Configuration du jeu de données.
+    repertoire (str): Répertoire du cache local, à copier ensuite sur les machines hors ligne.
+    
+    Returns:
+    str: Chemin du jeu de données enregistré.
+    """
+    from datasets import load_dataset
+
+    chemin = _chemin_reference(repertoire, nom, version)
+    load_dataset(nom, version).save_to_disk(chemin)
+    print(f"Jeu de données de référence enregistré dans {chemin}")
+    return chemin
+
+def iterer_reference(nom="cnn_dailymail", version="3.0.0", split='train', colonnes=None,
+                     echantillon=None, taille_lot=10000, repertoire=REPERTOIRE_REFERENCE,
+                     streaming=False, hors_ligne=False, graine=42):
+    """
+    Parcourt un jeu de données de référence par lots, sans le matérialiser en mémoire.
+    
+    Le jeu est lu en priorité depuis le cache local de preparer_cache_reference,
+    projeté en mémoire (Arrow) et donc utilisable sans réseau. À défaut, il est
+    chargé par datasets, soit depuis son propre cache, soit en flux (streaming).
+    
+    Parameters:
+    nom (str): Nom du jeu de données sur le hub.
+    version (str): Configuration du jeu de données.
+    split (str): Ensemble à lire ('train', 'validation' ou 'test').
+    colonnes (list, optional): Colonnes à lire, par exemple ['article', 'highlights']. Par défaut toutes.
+    echantillon (int, optional): Nombre d'exemples tirés au hasard. Par défaut tous.
+    taille_lot (int): Nombre d'exemples par lot.
+    repertoire (str): Répertoire du cache local.
+    streaming (bool): Lire en flux depuis le hub quand le cache local est absent.
+    hors_ligne (bool): Interdire tout accès réseau ; échoue si rien n'est en cache.
+    graine (int): Graine aléatoire de l'échantillonnage.
+    
+    Yields:
+    DataFrame: Lot d'exemples.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if hors_ligne:
+        _passer_hors_ligne()
+    from datasets import DatasetDict, load_dataset, load_from_disk
+
+    chemin = _chemin_reference(repertoire, nom, version)
+    if os.path.isdir(chemin):
+        dataset = load_from_disk(chemin)
+        if isinstance(dataset, DatasetDict):
+            dataset = dataset[split]
+    elif streaming and not hors_ligne:
+        dataset = load_dataset(nom, version, split=split, streaming=True)
+    else:
+        dataset = load_dataset(nom, version, split=split)
+
+    if colonnes:
+        dataset = dataset.select_columns(colonnes)
+    if echantillon is not None:
+        if streaming and not os.path.isdir(chemin) and not hors_ligne:
+            dataset = dataset.shuffle(seed=graine, buffer_size=10000).take(echantillon)
+        else:
+            # Indices triés : les lectures restent séquentielles dans le fichier Arrow
+            indices = np.random.default_rng(graine).choice(len(dataset), min(echantillon, len(dataset)), replace=False)
+            dataset = dataset.select(np.sort(indices))
+
+    for lot in dataset.iter(batch_size=taille_lot):
+        yield pd.DataFrame(lot)
+
+def charger_reference(nom="cnn_dailymail", version="3.0.0", repertoire=REPERTOIRE_REFERENCE, hors_ligne=False):
+    """
+    Affiche les premières lignes du jeu de données de référence de huggingface.
+    
+    Parameters:
+    nom (str): Nom du jeu de données sur le hub.
+    version (str): Configuration du jeu de données.
+    repertoire (str): Répertoire du cache local.
+    hors_ligne (bool): Interdire tout accès réseau.
+    
+    Returns:
+    DataFrame: Premières lignes de l'ensemble d'entraînement du jeu de données de référence.
+    """
+    train_head = next(iterer_reference(nom, version, taille_lot=5, repertoire=repertoire, hors_ligne=hors_ligne))
+
+    # Afficher les premières lignes du jeu de données de référence
+    print(train_head)
+    return train_head
+
+def _lire_table(filepath, columns=None):
+    """
+    Lire un fichier de données tabulaires, Parquet ou CSV, en projetant les colonnes.
+    
+    Parameters:
+    filepath (str): Chemin vers le fichier Parquet ou CSV.
+    columns (list, optional): Colonnes à lire. Par défaut toutes.
+    
+    Returns:
+    DataFrame: Données chargées.
+    """
+    if filepath.endswith('.parquet'):
+        from corpus_parquet import lire_corpus_parquet
+        return lire_corpus_parquet(filepath, columns)
+    import pandas as pd
+    return pd.read_csv(filepath, usecols=columns)
+
+def load_articles_data(filepath, columns=None):
+    """
+    Charge les données des articles à partir d'un fichier Parquet ou CSV.
+    
+    Parameters:
+    filepath (str): Chemin vers le fichier Parquet ou CSV contenant les données des articles.
+    columns (list, optional): Colonnes à lire, par exemple ['id', 'article']. Par défaut toutes.
     
     Returns:
     DataFrame: Données des articles chargées.
     """
-    return pd.read_csv(filepath)
+    return _lire_table(filepath, columns)
 
-def load_descriptions_data(filepath):
+def load_descriptions_data(filepath, columns=None):
     """
-    Charge les données des descriptions à partir d'un fichier CSV.
+    Charge les données des descriptions à partir d'un fichier Parquet ou CSV.
     
     Parameters:
-    filepath (str): Chemin vers le fichier CSV contenant les données des descriptions.
+    filepath (str): Chemin vers le fichier Parquet ou CSV contenant les données des descriptions.
+    columns (list, optional): Colonnes à lire, par exemple ['id', 'description']. Par défaut toutes.
     
     Returns:
     DataFrame: Données des descriptions chargées.
     """
-    return pd.read_csv(filepath)
+    return _lire_table(filepath, columns)
 
 def split_dataset(df, test_size=0.2, dev_size=0.1, random_state=42):
     """
@@ -83,15 +263,236 @@ def split_dataset(df, test_size=0.2, dev_size=0.1, random_state=42):
     Returns:
     tuple: DataFrames pour les ensembles d'entraînement, de test et de développement.
     """
+    from sklearn.model_selection import train_test_split
+
     train_df, test_df = train_test_split(df, test_size=test_size, random_state=random_state)
     train_df, dev_df = train_test_split(train_df, test_size=dev_size/(1-test_size), random_state=random_state)
     return train_df, test_df, dev_df
 
-# Exemple d'utilisation de la fonction split_dataset
-train_set, test_set, dev_set = split_dataset(df)
+def rubrique_depuis_url(url):
+    """
+    Extrait la rubrique d'un article du premier segment du chemin de son URL.
+    
+    Parameters:
+    url (str): URL de l'article, par exemple https://www.leparisien.fr/sports/....
+    
+    Returns:
+    str: Rubrique ('sports'), ou chaîne vide si l'URL n'a pas de chemin.
+    """
+    from urllib.parse import urlsplit
+
+    return urlsplit(str(url)).path.strip('/').split('/')[0]
+
+def position_hachee(cles, sel=''):
+    """
+    Associe à chaque clé une position stable dans [0, 1) à partir de son empreinte.
+    
+    La position ne dépend que de la clé (et du sel) : elle ne change ni avec l'ordre
+    des articles, ni avec l'ajout d'autres articles, ni d'une version de Python à l'autre.
+    
+    Parameters:
+    cles (iterable): Clés à hacher, par exemple les URL des articles.
+    sel (str): Préfixe ajouté aux clés pour obtenir un autre découpage.
+    
+    Returns:
+    numpy.ndarray: Positions dans [0, 1).
+    """
+    import hashlib
+    import numpy as np
+
+    empreintes = [
+        int.from_bytes(hashlib.blake2b(f"{sel}{cle}".encode('utf-8'), digest_size=8).digest(), 'big')
+        for cle in cles
+    ]
+    return np.array(empreintes, dtype=np.uint64) / 2.0 ** 64
+
+def attribuer_split(cles, test_size=0.2, dev_size=0.1, sel=''):
+    """
+    Attribue chaque clé à l'ensemble train, dev ou test selon sa position hachée.
+    
+    Parameters:
+    cles (iterable): Clés des articles (ou de leurs groupes).
+    test_size (float): Proportion attendue du jeu de test.
+    dev_size (float): Proportion attendue du jeu de développement.
+    sel (str): Préfixe ajouté aux clés pour obtenir un autre découpage.
+    
+    Returns:
+    numpy.ndarray: Nom de l'ensemble ('train', 'dev' ou 'test') de chaque clé.
+    """
+    import numpy as np
+
+    positions = position_hachee(cles, sel)
+    return np.select([positions < test_size, positions < test_size + dev_size], ['test', 'dev'], 'train')
+
+def numeroter_lots(lots):
+    """
+    Identifie les articles d'un corpus lu par lots par leur rang, comme charger_donnees_scrapees.
+    
+    L'identifiant d'origine (URL) passe dans la colonne url. Les lots qui ont déjà
+    une colonne url (corpus Parquet) sont rendus tels quels.
+    
+    Parameters:
+    lots (iterable): Lots successifs d'articles (DataFrame), par exemple lire_par_lots(...).
+    
+    Yields:
+    DataFrame: Lot d'articles avec les colonnes id (rang dans le corpus) et url.
+    """
+    debut = 0
+    for lot in lots:
+        if 'url' not in lot.columns:
+            lot = lot.rename(columns={'id': 'url'})
+            lot.insert(0, 'id', range(debut, debut + len(lot)))
+        debut += len(lot)
+        yield lot
+
+def split_dataset_hash(lots, repertoire=REPERTOIRE_SPLITS, test_size=0.2, dev_size=0.1, cle='url',
+                       groupe=None, sel='', incremental=False):
+    """
+    Divise un corpus lu par lots en ensembles train, dev et test, en une seule passe.
+    
+    Chaque article est attribué d'après l'empreinte de sa clé (son URL par défaut) :
+    l'attribution est déterministe et n'est pas remise en cause par l'ajout d'articles.
+    Avec un groupe (par exemple la rubrique), tous les articles d'un même groupe
+    tombent dans le même ensemble, ce qui évite les fuites entre ensembles.
+    
+    Les fichiers ont les mêmes colonnes que ceux de sauvegarder_splits : id (rang de
+    l'article dans le corpus) et url. Les lots sans colonne url sont numérotés par
+    numeroter_lots ; un corpus filtré avant le découpage (quasi-doublons) doit
+    l'être avant le filtrage, pour garder les rangs du corpus complet.
+    
+    Parameters:
+    lots (iterable): Lots successifs d'articles (DataFrame), par exemple lire_par_lots(...).
+    repertoire (str): Répertoire des fichiers train_set.csv, test_set.csv et dev_set.csv.
+    test_size (float): Proportion attendue du jeu de test.
+    dev_size (float): Proportion attendue du jeu de développement.
+    cle (str): Colonne identifiant les articles, hachée pour l'attribution. Par défaut l'URL.
+    groupe (str or callable, optional): Colonne, ou fonction appliquée à la clé, qui
+        définit les groupes à ne pas séparer. Par défaut chaque article est son propre groupe.
+    sel (str): Préfixe ajouté aux clés pour obtenir un autre découpage.
+    incremental (bool): Ajouter aux fichiers existants les seuls articles qui n'y sont pas encore.
+    
+    Returns:
+    dict: Nombre d'articles écrits dans chaque ensemble.
+    """
+    import pandas as pd
+
+    chemins = {nom: os.path.join(repertoire, f"{nom}_set.csv") for nom in ('train', 'test', 'dev')}
+    deja_presents = set()
+    if incremental:
+        for chemin in chemins.values():
+            if os.path.exists(chemin) and os.path.getsize(chemin):
+                deja_presents.update(pd.read_csv(chemin, usecols=[cle])[cle].astype(str))
+    else:
+        # Vider les trois fichiers : un ensemble qui ne reçoit aucun article ne doit
+        # pas garder celui d'une exécution précédente
+        for chemin in chemins.values():
+            open(chemin, 'w', encoding='utf-8').close()
+    en_tete = {nom: not (os.path.exists(chemin) and os.path.getsize(chemin)) for nom, chemin in chemins.items()}
+    comptes = {nom: 0 for nom in chemins}
+
+    for lot in numeroter_lots(lots):
+        if deja_presents:
+            lot = lot[~lot[cle].astype(str).isin(deja_presents)]
+        if lot.empty:
+            continue
+        if groupe is None:
+            cles = lot[cle].astype(str)
+        elif callable(groupe):
+            cles = lot[cle].map(groupe)
+        else:
+            cles = lot[groupe].astype(str)
+        ensembles = attribuer_split(cles, test_size, dev_size, sel)
+        for nom, chemin in chemins.items():
+            # En-têtes des trois fichiers dès le premier lot, même pour un ensemble vide
+            if en_tete[nom]:
+                lot.iloc[:0].to_csv(chemin, index=False, encoding='utf-8')
+                en_tete[nom] = False
+            selection = lot[ensembles == nom]
+            if selection.empty:
+                continue
+            selection.to_csv(chemin, mode='a', header=False, index=False, encoding='utf-8')
+            comptes[nom] += len(selection)
+
+    print(f"Ensembles train, test et dev enregistrés : {comptes}")
+    return comptes
+
+def sauvegarder_splits(df, repertoire=REPERTOIRE_SPLITS):
+    """
+    Divise le dataset et enregistre les ensembles train, test et dev dans des fichiers CSV.
+    
+    Parameters:
+    df (DataFrame): Le dataset à diviser.
+    repertoire (str): Répertoire des fichiers train_set.csv, test_set.csv et dev_set.csv.
+    
+    Returns:
+    tuple: DataFrames pour les ensembles d'entraînement, de test et de développement.
+    """
+    train_set, test_set, dev_set = split_dataset(df)
+    train_set.to_csv(os.path.join(repertoire, 'train_set.csv'), index=False, encoding='utf-8')
+    test_set.to_csv(os.path.join(repertoire, 'test_set.csv'), index=False, encoding='utf-8')
+    dev_set.to_csv(os.path.join(repertoire, 'dev_set.csv'), index=False, encoding='utf-8')
+    print("Ensembles train, test et dev enregistrés dans les fichiers correspondants.")
+    return train_set, test_set, dev_set
+
+def main(argv=None):
+    """
+    Point d'entrée en ligne de commande : lance une étape, ou toutes dans l'ordre.
+    
+    Parameters:
+    argv (list, optional): Arguments de la ligne de commande. Par défaut sys.argv.
+    """
+    parseur = argparse.ArgumentParser(description="Chargement, conversion et découpage du corpus.")
+    parseur.add_argument('etape', nargs='?', default='tout',
+                         choices=['csv', 'parquet', 'cache-reference', 'reference', 'split', 'tout'],
+                         help="Étape à lancer. Par défaut toutes.")
+    parseur.add_argument('--entree', default=FICHIER_SCRAPE, help="Fichier JSON ou JSON Lines du scraping")
+    parseur.add_argument('--csv', default=FICHIER_CSV, help="Fichier CSV de sortie")
+    parseur.add_argument('--parquet', default=FICHIER_PARQUET, help="Fichier Parquet de sortie")
+    parseur.add_argument('--splits', default=REPERTOIRE_SPLITS, help="Répertoire des ensembles train/dev/test")
+    parseur.add_argument('--reference', default=REPERTOIRE_REFERENCE, help="Répertoire du cache du jeu de référence")
+    parseur.add_argument('--hors-ligne', action='store_true', help="Interdire tout accès réseau")
+    parseur.add_argument('--methode', choices=['aleatoire', 'hash'], default='aleatoire',
+                         help="Découpage aléatoire en mémoire, ou déterministe par empreinte d'URL et en flux")
+    parseur.add_argument('--grouper-par-rubrique', action='store_true',
+                         help="Avec --methode hash, garder chaque rubrique dans un seul ensemble")
+    parseur.add_argument('--incremental', action='store_true',
+                         help="Avec --methode hash, n'ajouter aux ensembles que les nouveaux articles")
+    parseur.add_argument('--dedoublonner', action='store_true',
+                         help="Retirer les articles quasi dupliqués (MinHash/LSH) avant le découpage")
+    parseur.add_argument('--seuil-doublons', type=float, default=0.8,
+                         help="Similarité de Jaccard à partir de laquelle deux articles sont des quasi-doublons")
+    args = parseur.parse_args(argv)
+
+    df = None
+    if args.etape in ('csv', 'tout'):
+        df = convertir_en_csv(args.entree, args.csv)
+    if args.etape in ('parquet', 'tout'):
+        convertir_en_parquet(args.entree, args.parquet)
+    if args.etape == 'cache-reference':
+        preparer_cache_reference(repertoire=args.reference)
+    if args.etape in ('reference', 'tout'):
+        charger_reference(repertoire=args.reference, hors_ligne=args.hors_ligne)
+    if args.etape in ('split', 'tout'):
+        if args.methode == 'hash':
+            from corpus_jsonl import lire_par_lots
+
+            lots = numeroter_lots(lire_par_lots(args.entree))
+            if args.dedoublonner:
+                from quasi_doublons import IndexQuasiDoublons, dedoublonner
+
+                lots = dedoublonner(lots, IndexQuasiDoublons(seuil=args.seuil_doublons), cle='url')
+            groupe = rubrique_depuis_url if args.grouper_par_rubrique else None
+            split_dataset_hash(lots, args.splits, groupe=groupe, incremental=args.incremental)
+        else:
+            if df is None:
+                df = charger_donnees_scrapees(args.entree)
+            if args.dedoublonner:
+                from quasi_doublons import dedoublonner_dataframe
+
+                avant = len(df)
+                df = dedoublonner_dataframe(df, args.seuil_doublons)
+                print(f"{avant - len(df)} quasi-doublons retirés avant le découpage.")
+            sauvegarder_splits(df, args.splits)
 
-# Enregistrer les ensembles train, test et dev dans des fichiers CSV
-train_set.to_csv('../data/clean/train_set.csv', index=False, encoding='utf-8')
-test_set.to_csv('../data/clean/test_set.csv', index=False, encoding='utf-8')
-dev_set.to_csv('../data/clean/dev_set.csv', index=False, encoding='utf-8')
-print("Ensembles train, test et dev enregistrés dans les fichiers correspondants.")
+if __name__ == "__main__":
+    main()
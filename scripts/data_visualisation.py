@@ -2,279 +2,393 @@
 Module d'analyse et de visualisation des données textuelles.
 
 Ce module effectue diverses analyses et visualisations sur des articles et leurs descriptions.
-Il inclut des fonctions pour compter les tokens, catégoriser les différences de tokens, 
-extraire les termes fréquents, et comparer les similarités cosines.
+Les statistiques (tokens, longueurs, catégories, matrice de comptes) sont calculées
+en une seule passe par statistiques_texte, puis réutilisées pour extraire les termes
+fréquents, tracer la loi de Zipf et comparer les similarités cosines.
+
+Par défaut, les figures sont rendues sans affichage dans le répertoire figures/ par
+rapport_figures (en parallèle, seules les figures dont les statistiques ont changé
+étant redessinées) ; l'option --afficher les ouvre plutôt une à une.
+
+Avec --par-lots, le corpus est analysé par lots en mémoire bornée (analyse_par_lots)
+et seules les colonnes numériques dérivées sont écrites, avec l'identifiant et la
+catégorie, par défaut dans un fichier distinct (donnees_analysees_par_lots.csv) pour
+ne pas remplacer le corpus enrichi de l'analyse complète. Avec --mode hachage, le
+modèle TF-IDF hache les termes (HashingVectorizer) au lieu de garder un
+vocabulaire, et l'IDF est calculé en flux : la mémoire ne dépend plus du corpus.
+
+La prédiction « Similaire » est évaluée sur tous les seuils de similarité cosine à
+la fois (evaluation_seuil) : le rapport affiche les métriques du seuil demandé et du
+meilleur seuil, avec leurs intervalles de confiance bootstrap, et trace la courbe
+précision-rappel ; --courbe l'écrit en CSV.
+
+Usage :
+    python data_visualisation.py [--entree ../data/clean/donnees_scrapees.json] [--afficher] [--par-lots [--mode hachage]]
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import nltk
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from nltk.corpus import stopwords
-from sklearn.metrics import precision_score, recall_score, f1_score
-
-# Télécharger les stop words français
-import ssl
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
-
-nltk.download('stopwords')
-
-# Charger les données JSON
-data = pd.read_json('../data/clean/donnees_scrapees.json')
-
-def count_tokens(text):
-    """
-    Compter les tokens (mots) dans un texte.
+import argparse
 
-    Args:
-        text (str): Texte à analyser.
+from analyse_par_lots import TAILLE_LOT, analyser_par_lots
+from corpus_jsonl import charger_dataframe, lire_par_lots
+from evaluation_seuil import (
+    REPETITIONS_BOOTSTRAP,
+    afficher_evaluation,
+    balayer_seuils,
+    etiquettes_reelles,
+    meilleur_seuil,
+)
+from metriques import session
+from modele_tfidf import MODES, ModeleTfidf
+from rapport_figures import (
+    Figure,
+    afficher_figures,
+    figure_cosinus_difference,
+    figure_distribution_categories,
+    figure_distribution_cosinus,
+    figure_heatmap_correlations,
+    figure_moyennes_tokens,
+    figure_precision_rappel,
+    figure_relation_longueurs,
+    figure_top_termes,
+    figure_zipf,
+    points_courbe,
+    points_zipf,
+    rendre_figures,
+    sous_echantillonner,
+    MAX_POINTS,
+)
+from statistiques_texte import calculer_statistiques, similarite_cosine_appariee
+
+COLONNES_CORRELATION = ['article_tokens', 'description_tokens', 'token_difference', 'cosine_similarity',
+                        'article_length', 'description_length', 'compression_ratio']
+
+SORTIE = '../data/clean/donnees_analysees.csv'
+
+# Répertoire du modèle TF-IDF de chaque mode : un modèle ne change pas de mode
+REPERTOIRES_TFIDF = {'vocabulaire': '../data/cache/tfidf', 'hachage': '../data/cache/tfidf_hachage'}
+
+# Fichier distinct : l'analyse par lots n'écrit pas les textes du corpus enrichi
+SORTIE_PAR_LOTS = '../data/clean/donnees_analysees_par_lots.csv'
+
+
+def charger_stop_words():
+    """
+    Télécharger au besoin et renvoyer les stop words français de NLTK.
 
     Returns:
-        int: Nombre de tokens dans le texte.
+        set: Stop words français.
     """
-    return len(text.split())
+    import ssl
 
-# Ajouter des colonnes pour le nombre de tokens dans l'article et la description
-data['article_tokens'] = data['article'].apply(count_tokens)
-data['description_tokens'] = data['description'].apply(count_tokens)
+    import nltk
+    from nltk.corpus import stopwords
 
-# Ajouter des colonnes pour la taille des textes
-data['article_length'] = data['article'].str.len()
-data['description_length'] = data['description'].str.len()
+    try:
+        _create_unverified_https_context = ssl._create_unverified_context
+    except AttributeError:
+        pass
+    else:
+        ssl._create_default_https_context = _create_unverified_https_context
 
-# Calculer le ratio de compression
-data['compression_ratio'] = data['description_length'] / data['article_length']
+    nltk.download('stopwords')
+    return set(stopwords.words('french'))
 
-# Calculer la différence de tokens
-data['token_difference'] = data['article_tokens'] - data['description_tokens']
 
-def categorize_difference(diff):
+def termes_frequents_communs(statistiques, stop_words_fr, top_n=20):
     """
-    Catégoriser les articles selon la différence de tokens.
+    Extraire autant de termes fréquents des articles que des descriptions.
 
     Args:
-        diff (int): Différence de tokens entre l'article et la description.
+        statistiques (StatistiquesTexte): Statistiques du corpus.
+        stop_words_fr (set): Termes écartés.
+        top_n (int, optional): Nombre maximal de termes par corpus. Par défaut à 20.
 
     Returns:
-        str: Catégorie de la différence de tokens.
+        dict: Couples (terme, fréquence) des articles et des descriptions.
     """
-    if diff > 50:
-        return 'Grande différence'
-    elif diff < -50:
-        return 'Grande description'
-    else:
-        return 'Similaire'
+    # Top termes dans les articles et les descriptions, hors stop words français
+    top_words = statistiques.termes_frequents(top_n, mots_vides=stop_words_fr)
 
-data['category'] = data['token_difference'].apply(categorize_difference)
+    # S'assurer que les deux listes sont de la même longueur
+    min_len = min(len(top_words['article']), len(top_words['description']))
+    return {corpus: termes[:min_len] for corpus, termes in top_words.items()}
 
-# Distribution des articles par différence de tokens
-plt.figure(figsize=(10, 6))
-ax = sns.histplot(data=data, x='category', hue='category', palette={'Grande différence': 'red', 'Similaire': 'green', 'Grande description': 'blue'}, edgecolor='black', legend=False)
 
-for p in ax.patches:
-    ax.annotate(f'{p.get_height()}', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='baseline')
+def analyser(data, stop_words_fr, modele_tfidf=None, top_n=20):
+    """
+    Calculer les statistiques du corpus, ses termes fréquents et ses similarités cosines.
 
-plt.title('Distribution des articles par différence de tokens')
-plt.xlabel('Catégorie')
-plt.ylabel('Nombre d\'articles')
-plt.show()
+    Args:
+        data (DataFrame): Corpus ; il est complété des colonnes de statistiques et de
+            la colonne cosine_similarity.
+        stop_words_fr (set): Termes écartés des termes fréquents.
+        modele_tfidf (ModeleTfidf, optional): Modèle persistant des comptes de termes.
+        top_n (int, optional): Nombre de termes fréquents par corpus. Par défaut à 20.
 
-# Comparaison des moyennes de tokens entre articles et descriptions
-mean_article_tokens = data['article_tokens'].mean()
-mean_description_tokens = data['description_tokens'].mean()
+    Returns:
+        tuple: StatistiquesTexte et termes fréquents des articles et des descriptions.
+    """
+    # Tokens, longueurs, ratio de compression, différence de tokens, catégorie
+    # et matrice de comptes des termes, en une seule passe sur le corpus ; les comptes
+    # sont repris du modèle persistant et seuls les nouveaux textes sont tokenisés
+    statistiques = calculer_statistiques(data, modele=modele_tfidf)
 
-plt.figure(figsize=(8, 6))
-categories = ['Articles', 'Descriptions']
-means = [mean_article_tokens, mean_description_tokens]
-sns.barplot(x=categories, y=means, palette=['blue', 'orange'], legend=False)
+    top_words = termes_frequents_communs(statistiques, stop_words_fr, top_n)
 
-for i, mean in enumerate(means):
-    plt.text(i, mean + 10, f'{mean:.1f}', ha='center', va='bottom')
+    # Comparaison de Similarité Cosine
+    vectors = statistiques.tfidf()
+    data['cosine_similarity'] = similarite_cosine_appariee(vectors[0], vectors[1])
+    return statistiques, top_words
 
-plt.title('Comparaison des moyennes de tokens entre articles et descriptions')
-plt.xlabel('Catégorie')
-plt.ylabel('Nombre moyen de tokens')
-plt.ylim(0, max(means) + 50)
-plt.show()
 
-def get_top_n_words(corpus, n=None):
+def preparer_figures(statistiques, top_words, courbe, max_points=MAX_POINTS):
     """
-    Extraire les termes fréquents d'un corpus.
+    Décrire les figures de l'analyse par les seules statistiques qu'elles représentent.
 
     Args:
-        corpus (list): Liste de textes à analyser.
-        n (int, optional): Nombre de termes à retourner. Par défaut None.
+        statistiques (StatistiquesTexte): Résultat de analyser.
+        top_words (dict): Termes fréquents des articles et des descriptions.
+        courbe (DataFrame): Courbe précision-rappel de evaluer_seuils.
+        max_points (int, optional): Nombre maximal de points des nuages de points.
 
     Returns:
-        list: Liste de tuples contenant les termes et leur fréquence.
+        list: Figures à rendre.
     """
-    vec = CountVectorizer().fit(corpus)
-    bag_of_words = vec.transform(corpus)
-    sum_words = bag_of_words.sum(axis=0)
-    words_freq = [(word, sum_words[0, idx]) for word, idx in vec.vocabulary_.items()]
-    words_freq = sorted(words_freq, key=lambda x: x[1], reverse=True)
-    return words_freq[:n]
-
-# Top termes dans les articles et les descriptions
-top_n = 20
-top_words_article = get_top_n_words(data['article'], top_n)
-top_words_description = get_top_n_words(data['description'], top_n)
-
-# Filtrer les stop words français
-stop_words_fr = set(stopwords.words('french'))
-top_words_article_filtered = [(word, freq) for word, freq in top_words_article if word not in stop_words_fr]
-top_words_description_filtered = [(word, freq) for word, freq in top_words_description if word not in stop_words_fr]
-
-def ensure_min_words(filtered_words, original_words, min_words=10):
+    data = statistiques.data
+    comptes_categories = data['category'].value_counts(sort=False)
+    article_tokens, description_tokens = sous_echantillonner(
+        data['article_tokens'], data['description_tokens'], max_points=max_points
+    )
+    differences, similarites = sous_echantillonner(
+        data['token_difference'], data['cosine_similarity'], max_points=max_points
+    )
+    return _decrire_figures(
+        comptes_categories.to_dict(), [data['article_tokens'].mean(), data['description_tokens'].mean()], top_words,
+        (article_tokens, description_tokens), data['cosine_similarity'].to_numpy(), (differences, similarites),
+        data[COLONNES_CORRELATION].corr(), statistiques.frequences_triees('article'), courbe,
+    )
+
+
+def preparer_figures_par_lots(analyse, top_words):
     """
-    S'assurer qu'il y a au moins un certain nombre de mots dans la liste filtrée.
+    Décrire les figures d'une analyse par lots ; les nuages de points et l'histogramme
+    des similarités portent sur son échantillon réservoir.
 
     Args:
-        filtered_words (list): Liste de mots filtrés.
-        original_words (list): Liste de mots originaux.
-        min_words (int, optional): Nombre minimum de mots requis. Par défaut à 10.
+        analyse (AnalyseParLots): Résultat de analyser_par_lots.
+        top_words (dict): Termes fréquents des articles et des descriptions.
 
     Returns:
-        list: Liste de mots filtrés avec au moins min_words mots.
+        list: Figures à rendre.
     """
-    additional_words = [(word, freq) for word, freq in original_words if word not in stop_words_fr and word not in dict(filtered_words)]
-    if len(filtered_words) < min_words:
-        filtered_words.extend(additional_words[:min_words - len(filtered_words)])
-    return filtered_words
-
-top_words_article_filtered = ensure_min_words(top_words_article_filtered, top_words_article)
-top_words_description_filtered = ensure_min_words(top_words_description_filtered, top_words_description)
-
-# S'assurer que les deux listes sont de la même longueur
-min_len = min(len(top_words_article_filtered), len(top_words_description_filtered))
-top_words_article_filtered = top_words_article_filtered[:min_len]
-top_words_description_filtered = top_words_description_filtered[:min_len]
-
-# Créer un DataFrame pour les termes
-df_top_words = pd.DataFrame({
-    'Article': [word for word, freq in top_words_article_filtered],
-    'Article_Freq': [freq for word, freq in top_words_article_filtered],
-    'Description': [word for word, freq in top_words_description_filtered],
-    'Description_Freq': [freq for word, freq in top_words_description_filtered]
-})
-
-# Comparaison des termes clés
-plt.figure(figsize=(14, 8))
-
-plt.subplot(1, 2, 1)
-sns.barplot(x='Article_Freq', y='Article', data=df_top_words, palette='Blues_d', hue='Article', dodge=False, legend=False)
-plt.title('Top termes dans les articles')
-plt.xlabel('Fréquence')
-
-plt.subplot(1, 2, 2)
-sns.barplot(x='Description_Freq', y='Description', data=df_top_words, palette='Oranges_d', hue='Description', dodge=False, legend=False)
-plt.title('Top termes dans les descriptions')
-plt.xlabel('Fréquence')
-
-plt.tight_layout()
-plt.show()
-
-# Relation entre les longueurs des articles et des descriptions
-plt.figure(figsize=(8, 6))
-plt.scatter(data['article_tokens'], data['description_tokens'], alpha=0.5)
-plt.xlabel('Nombre de tokens des articles')
-plt.ylabel('Nombre de tokens des descriptions')
-plt.title('Relation entre les longueurs des articles et des descriptions')
-plt.show()
-
-# Comparaison de Similarité Cosine
-vectorizer = TfidfVectorizer().fit_transform(data['article'].tolist() + data['description'].tolist())
-vectors = vectorizer[:len(data)], vectorizer[len(data):]
-cosine_similarities = cosine_similarity(vectors[0], vectors[1])
-cosine_similarities_diag = cosine_similarities.diagonal()
-
-plt.figure(figsize=(8, 6))
-sns.histplot(cosine_similarities_diag, kde=True, color='purple')
-plt.title('Distribution des similarités cosines entre articles et descriptions')
-plt.xlabel('Similarité Cosine')
-plt.ylabel('Nombre d\'articles')
-plt.show()
-
-# Ajouter les similarités cosines au DataFrame
-data['cosine_similarity'] = cosine_similarities_diag
-
-# Scatter Plot des similarités cosines par rapport aux différences de tokens
-plt.figure(figsize=(8, 6))
-plt.scatter(data['token_difference'], data['cosine_similarity'], alpha=0.5)
-plt.xlabel('Différence de tokens')
-plt.ylabel('Similarité Cosine')
-plt.title('Similarité Cosine vs Différence de Tokens')
-plt.show()
-
-# Heatmap de corrélation
-plt.figure(figsize=(10, 8))
-corr_matrix = data[['article_tokens', 'description_tokens', 'token_difference', 'cosine_similarity', 'article_length', 'description_length', 'compression_ratio']].corr()
-sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', vmin=-1, vmax=1)
-plt.title('Heatmap des corrélations')
-plt.show()
-
-# Sauvegarder le DataFrame avec les nouvelles colonnes
-data.to_csv('../data/clean/donnees_analysees.csv', index=False)
-
-def get_word_frequencies(corpus):
+    moments, echantillon = analyse.moments, analyse.echantillon
+    moyennes = [moments.moyennes[moments.colonnes.index(colonne)] for colonne in ('article_tokens', 'description_tokens')]
+    return _decrire_figures(
+        dict(analyse.categories), moyennes, top_words,
+        (echantillon.colonne('article_tokens'), echantillon.colonne('description_tokens')),
+        echantillon.colonne('cosine_similarity'),
+        (echantillon.colonne('token_difference'), echantillon.colonne('cosine_similarity')),
+        moments.correlations().loc[COLONNES_CORRELATION, COLONNES_CORRELATION], analyse.frequences_triees('article'),
+        analyse.courbe,
+    )
+
+
+def _decrire_figures(comptes_categories, moyennes, top_words, longueurs, similarites, points_similarites,
+                     correlations, frequences_triees, courbe):
+    article_tokens, description_tokens = longueurs
+    differences, similarites_points = points_similarites
+    rangs, frequences = points_zipf([frequence for _, frequence in frequences_triees])
+    rappels, precisions = points_courbe(courbe['rappel'], courbe['precision'])
+    meilleur = meilleur_seuil(courbe)
+
+    return [
+        Figure('Distribution_des_articles_par_difference_de_token', figure_distribution_categories, {
+            'categories': list(comptes_categories),
+            'comptes': list(comptes_categories.values()),
+        }),
+        Figure('comparaison_des_moyennes_de_tokens_entre_articles_et description', figure_moyennes_tokens, {
+            'moyennes': moyennes,
+        }),
+        Figure('Top_des_termes', figure_top_termes, {
+            'termes_article': [word for word, freq in top_words['article']],
+            'frequences_article': [freq for word, freq in top_words['article']],
+            'termes_description': [word for word, freq in top_words['description']],
+            'frequences_description': [freq for word, freq in top_words['description']],
+        }),
+        Figure('relation_longueurs_articles_descriptions', figure_relation_longueurs, {
+            'article_tokens': article_tokens,
+            'description_tokens': description_tokens,
+        }),
+        Figure('distribution_similarites_cos', figure_distribution_cosinus, {
+            'similarites': similarites,
+        }),
+        Figure('similarites_cos_vs_difference_tokens', figure_cosinus_difference, {
+            'differences': differences,
+            'similarites': similarites_points,
+        }),
+        Figure('heatmap_correlations', figure_heatmap_correlations, {
+            'colonnes': COLONNES_CORRELATION,
+            'correlations': correlations.to_numpy(),
+        }),
+        Figure('loi_zipf', figure_zipf, {'rangs': rangs, 'frequences': frequences}),
+        Figure('courbe_precision_rappel', figure_precision_rappel, {
+            'rappels': rappels,
+            'precisions': precisions,
+            'meilleur_rappel': float(meilleur['rappel']),
+            'meilleure_precision': float(meilleur['precision']),
+            'meilleur_seuil': float(meilleur['seuil']),
+        }),
+    ]
+
+
+def evaluer_seuils(data):
     """
-    Calculer les fréquences des mots dans un corpus.
+    Évaluer la prédiction « description similaire » sur tous les seuils de similarité cosine.
 
     Args:
-        corpus (list): Liste de textes à analyser.
+        data (DataFrame): Corpus analysé.
 
     Returns:
-        dict: Dictionnaire des fréquences des mots.
+        DataFrame: Courbe précision-rappel, une ligne par seuil croissant.
     """
-    vec = CountVectorizer().fit(corpus)
-    bag_of_words = vec.transform(corpus)
-    sum_words = bag_of_words.sum(axis=0)
-    words_freq = {word: sum_words[0, idx] for word, idx in vec.vocabulary_.items()}
-    words_freq = sorted(words_freq.items(), key=lambda x: x[1], reverse=True)
-    return words_freq
-
-# Calculer les fréquences des mots dans les articles
-word_frequencies_article = get_word_frequencies(data['article'])
-
-# Calculer le rang de chaque mot
-ranks = {word: i for i, (word, _) in enumerate(word_frequencies_article, 1)}
-
-# Tracer la loi de Zipf
-plt.figure(figsize=(10, 6))
-plt.loglog(
-    list(ranks.values()),
-    [freq for word, freq in word_frequencies_article if word in ranks],
-    alpha=.5,
-)
-plt.title('Loi de Zipf')
-plt.xlabel('Rang du mot')
-plt.ylabel('Fréquence du mot')
-plt.show()
+    return balayer_seuils(data['cosine_similarity'].to_numpy(), etiquettes_reelles(data['category']))
 
-# Définir le seuil de similarité cosine
-threshold = 0.5
 
-# Créer une liste de prédictions binaires (1 si la similarité cosine est supérieure au seuil, 0 sinon)
-predictions = [1 if cosine_similarity > threshold else 0 for cosine_similarity in data['cosine_similarity']]
+def produire_rapport(statistiques, top_words, sortie, repertoire_figures='../figures', afficher=False,
+                     max_workers=None, forcer=False, max_points=MAX_POINTS, seuil=0.5, bootstrap=REPETITIONS_BOOTSTRAP,
+                     fichier_courbe=None):
+    """
+    Enregistrer le corpus analysé, rendre ses figures et afficher les métriques des seuils.
 
-# Créer une liste de valeurs binaires réelles (1 si la catégorie est 'Similaire', 0 sinon)
-real_values = [1 if category == 'Similaire' else 0 for category in data['category']]
+    Args:
+        statistiques (StatistiquesTexte): Statistiques du corpus, avec la colonne cosine_similarity.
+        top_words (dict): Termes fréquents des articles et des descriptions.
+        sortie (str): Fichier CSV du corpus enrichi des statistiques.
+        repertoire_figures (str, optional): Répertoire des figures.
+        afficher (bool, optional): Afficher les figures au lieu de les enregistrer.
+        max_workers (int, optional): Nombre de processus de rendu des figures.
+        forcer (bool, optional): Redessiner toutes les figures.
+        max_points (int, optional): Nombre maximal de points par nuage.
+        seuil (float, optional): Seuil de similarité cosine. Par défaut à 0.5.
+        bootstrap (int, optional): Nombre de rééchantillonnages des intervalles de
+            confiance ; 0 pour ne pas en calculer.
+        fichier_courbe (str, optional): Fichier CSV où écrire la courbe précision-rappel.
+    """
+    data = statistiques.data
+
+    # Sauvegarder le DataFrame avec les nouvelles colonnes
+    data.to_csv(sortie, index=False)
+
+    courbe = evaluer_seuils(data)
+    if fichier_courbe:
+        courbe.to_csv(fichier_courbe, index=False)
+
+    figures = preparer_figures(statistiques, top_words, courbe, max_points)
+    if afficher:
+        afficher_figures(figures)
+    else:
+        etats = rendre_figures(figures, repertoire_figures, max_workers, forcer)
+        rendues = sum(1 for etat in etats.values() if etat == 'rendue')
+        print(f"{rendues} figures rendues, {len(etats) - rendues} inchangées, dans {repertoire_figures}")
 
-# Calculer la précision
-precision = precision_score(real_values, predictions)
-print(f'Précision : {precision:.2f}')
+    afficher_evaluation(courbe, seuil, bootstrap)
 
-# Calculer le rappel
-recall = recall_score(real_values, predictions)
-print(f'Rappel : {recall:.2f}')
 
-# Calculer la F-mesure
-f1 = f1_score(real_values, predictions)
-print(f'F-mesure : {f1:.2f}')
+def produire_rapport_par_lots(analyse, top_words, repertoire_figures='../figures', afficher=False,
+                              max_workers=None, forcer=False, bootstrap=REPETITIONS_BOOTSTRAP,
+                              fichier_courbe=None):
+    """
+    Rendre les figures d'une analyse par lots et afficher ses statistiques et les métriques des seuils.
+
+    Le meilleur seuil est cherché sur la grille des seuils de l'analyse par lots.
+
+    Args:
+        analyse (AnalyseParLots): Résultat de analyser_par_lots.
+        top_words (dict): Termes fréquents des articles et des descriptions.
+        repertoire_figures (str, optional): Répertoire des figures.
+        afficher (bool, optional): Afficher les figures au lieu de les enregistrer.
+        max_workers (int, optional): Nombre de processus de rendu des figures.
+        forcer (bool, optional): Redessiner toutes les figures.
+        bootstrap (int, optional): Nombre de rééchantillonnages des intervalles de
+            confiance ; 0 pour ne pas en calculer.
+        fichier_courbe (str, optional): Fichier CSV où écrire la courbe précision-rappel.
+    """
+    if fichier_courbe:
+        analyse.courbe.to_csv(fichier_courbe, index=False)
+
+    figures = preparer_figures_par_lots(analyse, top_words)
+    if afficher:
+        afficher_figures(figures)
+    else:
+        etats = rendre_figures(figures, repertoire_figures, max_workers, forcer)
+        rendues = sum(1 for etat in etats.values() if etat == 'rendue')
+        print(f"{rendues} figures rendues, {len(etats) - rendues} inchangées, dans {repertoire_figures}")
+
+    print(analyse.moments.resume().loc[['article_tokens', 'description_tokens', 'token_difference']].to_string())
+    afficher_evaluation(analyse.courbe, analyse.seuil, bootstrap)
+
+
+def main(argv=None):
+    """
+    Analyser le corpus, en entier ou par lots, puis produire le rapport et les figures.
+
+    Args:
+        argv (list, optional): Arguments de la ligne de commande. Par défaut ceux du processus.
+    """
+    parseur = argparse.ArgumentParser(description="Analyser le corpus et tracer les figures.")
+    parseur.add_argument('--entree', default='../data/clean/donnees_scrapees.json',
+                         help="Corpus JSON, JSON Lines (.jsonl, .jsonl.gz, .jsonl.zst) ou Parquet")
+    parseur.add_argument('--sortie',
+                         help="Fichier CSV du corpus enrichi des statistiques (par défaut "
+                              f"{SORTIE} ou, avec --par-lots, {SORTIE_PAR_LOTS})")
+    parseur.add_argument('--figures', default='../figures', help="Répertoire des figures")
+    parseur.add_argument('--modele-tfidf',
+                         help="Répertoire du modèle TF-IDF persistant (par défaut selon le mode : "
+                              f"{REPERTOIRES_TFIDF['vocabulaire']} ou {REPERTOIRES_TFIDF['hachage']})")
+    parseur.add_argument('--mode', choices=MODES, default='vocabulaire',
+                         help="Modèle TF-IDF à vocabulaire, ou par hachage des termes pour les grands corpus")
+    parseur.add_argument('--afficher', action='store_true', help="Afficher les figures au lieu de les enregistrer")
+    parseur.add_argument('--max-workers', type=int, help="Nombre de processus de rendu des figures")
+    parseur.add_argument('--max-points', type=int, default=MAX_POINTS, help="Nombre maximal de points par nuage")
+    parseur.add_argument('--forcer', action='store_true', help="Redessiner toutes les figures")
+    parseur.add_argument('--seuil', type=float, default=0.5, help="Seuil de similarité cosine")
+    parseur.add_argument('--bootstrap', type=int, default=REPETITIONS_BOOTSTRAP,
+                         help="Nombre de rééchantillonnages bootstrap des intervalles de confiance (0 : sans)")
+    parseur.add_argument('--courbe', help="Fichier CSV où écrire la courbe précision-rappel")
+    parseur.add_argument('--par-lots', action='store_true',
+                         help="Analyser le corpus par lots en mémoire bornée, sans écrire les textes")
+    parseur.add_argument('--taille-lot', type=int, default=TAILLE_LOT, help="Nombre d'articles par lot")
+    parseur.add_argument('--metriques', help="Fichier JSON où écrire les mesures de l'exécution")
+    parseur.add_argument('--profil', help="Fichier où écrire le profil cProfile de l'exécution")
+    args = parseur.parse_args(argv)
+    if args.sortie is None:
+        args.sortie = SORTIE_PAR_LOTS if args.par_lots else SORTIE
+    if args.modele_tfidf is None:
+        args.modele_tfidf = REPERTOIRES_TFIDF[args.mode]
+
+    with session('data_visualisation', args.metriques, args.profil) as mesure:
+        if args.par_lots:
+            modele_tfidf = ModeleTfidf(args.modele_tfidf, args.mode)
+            analyse = analyser_par_lots(lambda: lire_par_lots(args.entree, args.taille_lot,
+                                                              ['id', 'article', 'description']),
+                                        modele_tfidf, args.sortie, args.seuil, args.max_points)
+            modele_tfidf.fermer()
+            mesure.elements = analyse.nombre
+            top_words = termes_frequents_communs(analyse, charger_stop_words())
+            produire_rapport_par_lots(analyse, top_words, args.figures, args.afficher, args.max_workers, args.forcer,
+                                      args.bootstrap, args.courbe)
+            return
+
+        # Charger les données JSON (ou JSON Lines : .jsonl, .jsonl.gz, .jsonl.zst)
+        data = charger_dataframe(args.entree)
+        mesure.elements = len(data)
+        modele_tfidf = ModeleTfidf(args.modele_tfidf, args.mode)
+        statistiques, top_words = analyser(data, charger_stop_words(), modele_tfidf)
+        modele_tfidf.fermer()
+
+        produire_rapport(statistiques, top_words, args.sortie, args.figures, args.afficher, args.max_workers,
+                         args.forcer, args.max_points, args.seuil, args.bootstrap, args.courbe)
+
+
+if __name__ == "__main__":
+    main()
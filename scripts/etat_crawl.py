@@ -0,0 +1,267 @@
+"""
+Module d'état persistant du crawl.
+
+L'état est une base SQLite qui tient la frontière des liens à scraper (dédoublonnée
+sur l'URL normalisée), les pages de rubrique déjà parcourues et les articles
+déjà extraits. Elle est validée sur disque à intervalles réguliers, si bien qu'un
+crawl interrompu reprend là où il s'était arrêté.
+"""
+
+import json
+import os
+import sqlite3
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi qui ne changent pas le contenu de la page
+PARAMETRES_DE_SUIVI = {'xtor', 'at_medium', 'at_campaign', 'fbclid', 'gclid'}
+
+PORTS_PAR_DEFAUT = {'http': ':80', 'https': ':443'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontiere (
+    url TEXT PRIMARY KEY,
+    statut TEXT NOT NULL DEFAULT 'a_faire',
+    tentatives INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sections (
+    url TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    donnees TEXT NOT NULL,
+    importe INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def normaliser_url(url):
+    """
+    Normaliser une URL pour que deux liens vers la même page soient reconnus.
+
+    Le schéma et l'hôte passent en minuscules, le port par défaut, le fragment et
+    les paramètres de suivi sont retirés, et les paramètres restants sont triés.
+    Les liens qui ne sont pas en http(s) sont renvoyés tels quels.
+
+    Args:
+        url (str): URL à normaliser.
+
+    Returns:
+        str: URL normalisée.
+    """
+    url = url.strip()
+    morceaux = urlsplit(url)
+    schema = morceaux.scheme.lower()
+    if schema not in PORTS_PAR_DEFAUT:
+        return url
+    hote = morceaux.netloc.lower()
+    if hote.endswith(PORTS_PAR_DEFAUT[schema]):
+        hote = hote[:-len(PORTS_PAR_DEFAUT[schema])]
+    parametres = sorted(
+        (cle, valeur) for cle, valeur in parse_qsl(morceaux.query, keep_blank_values=True)
+        if cle not in PARAMETRES_DE_SUIVI and not cle.startswith('utm_')
+    )
+    return urlunsplit((schema, hote, morceaux.path or '/', urlencode(parametres), ''))
+
+
+class EtatCrawl:
+    """
+    Frontière, index de dédoublonnage et points de reprise d'un crawl.
+
+    L'état n'est manipulé que depuis le thread qui orchestre le crawl.
+    """
+
+    def __init__(self, chemin=':memory:', intervalle_checkpoint=50):
+        """
+        Args:
+            chemin (str, optional): Fichier SQLite de l'état. Par défaut en mémoire,
+                c'est-à-dire sans reprise possible.
+            intervalle_checkpoint (int, optional): Nombre de modifications entre deux
+                validations sur disque. Par défaut à 50.
+        """
+        self.chemin = chemin
+        self.intervalle_checkpoint = intervalle_checkpoint
+        if chemin != ':memory:':
+            repertoire = os.path.dirname(chemin)
+            if repertoire:
+                os.makedirs(repertoire, exist_ok=True)
+        self._connexion = sqlite3.connect(chemin)
+        self._connexion.executescript(SCHEMA)
+        self._modifications = 0
+        self.nouveaux_articles = self._connexion.execute(
+            'SELECT COUNT(*) FROM articles WHERE importe = 0'
+        ).fetchone()[0]
+
+    def _modifie(self):
+        self._modifications += 1
+        if self._modifications >= self.intervalle_checkpoint:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Valider l'état sur disque."""
+        self._connexion.commit()
+        self._modifications = 0
+
+    def section_traitee(self, url):
+        """
+        Indiquer si les liens d'une page de rubrique ont déjà été ajoutés à la frontière.
+
+        Args:
+            url (str): URL de la page de rubrique.
+
+        Returns:
+            bool: True si la page a déjà été parcourue.
+        """
+        ligne = self._connexion.execute('SELECT 1 FROM sections WHERE url = ?', (url,)).fetchone()
+        return ligne is not None
+
+    def ajouter_section(self, url, liens):
+        """
+        Ajouter à la frontière les liens d'une page de rubrique, sans doublons.
+
+        Args:
+            url (str): URL de la page de rubrique.
+            liens (list): Liens trouvés sur la page.
+        """
+        self._connexion.executemany(
+            'INSERT OR IGNORE INTO frontiere (url) VALUES (?)', ((normaliser_url(lien),) for lien in liens)
+        )
+        self._connexion.execute('INSERT OR IGNORE INTO sections (url) VALUES (?)', (url,))
+        self.checkpoint()
+
+    def a_faire(self):
+        """
+        Lister les liens de la frontière qui n'ont pas encore été scrapés.
+
+        Returns:
+            list: Liens dans l'ordre de leur découverte.
+        """
+        lignes = self._connexion.execute(
+            "SELECT url FROM frontiere WHERE statut = 'a_faire' ORDER BY rowid"
+        ).fetchall()
+        return [url for (url,) in lignes]
+
+    def echecs(self, tentatives_max=None):
+        """
+        Lister les liens dont le scraping a échoué.
+
+        Args:
+            tentatives_max (int, optional): Ne garder que les liens tentés au plus
+                ce nombre de fois. Par défaut tous.
+
+        Returns:
+            list: Liens en échec dans l'ordre de leur découverte.
+        """
+        requete = "SELECT url FROM frontiere WHERE statut = 'echec'"
+        parametres = ()
+        if tentatives_max is not None:
+            requete += ' AND tentatives <= ?'
+            parametres = (tentatives_max,)
+        lignes = self._connexion.execute(requete + ' ORDER BY rowid', parametres).fetchall()
+        return [url for (url,) in lignes]
+
+    def enregistrer_article(self, url, article):
+        """
+        Enregistrer un article valide et retirer son lien de la frontière.
+
+        Args:
+            url (str): Lien scrapé.
+            article (dict): Article extrait.
+        """
+        curseur = self._connexion.execute(
+            'INSERT OR IGNORE INTO articles (url, donnees) VALUES (?, ?)',
+            (url, json.dumps(article, ensure_ascii=False)),
+        )
+        self._connexion.execute(
+            "INSERT INTO frontiere (url, statut, tentatives) VALUES (?, 'ok', 1) "
+            "ON CONFLICT (url) DO UPDATE SET statut = 'ok', tentatives = tentatives + 1",
+            (url,),
+        )
+        self.nouveaux_articles += curseur.rowcount
+        self._modifie()
+
+    def enregistrer_echec(self, url):
+        """
+        Enregistrer l'échec du scraping d'un lien.
+
+        Args:
+            url (str): Lien scrapé.
+        """
+        self._connexion.execute(
+            "UPDATE frontiere SET statut = 'echec', tentatives = tentatives + 1 WHERE url = ?", (url,)
+        )
+        self._modifie()
+
+    def enregistrer_doublon(self, url):
+        """
+        Enregistrer qu'un lien mène à un quasi-doublon d'un article connu : il est
+        retiré de la frontière sans que l'article soit enregistré.
+
+        Args:
+            url (str): Lien scrapé.
+        """
+        self._connexion.execute(
+            "INSERT INTO frontiere (url, statut, tentatives) VALUES (?, 'doublon', 1) "
+            "ON CONFLICT (url) DO UPDATE SET statut = 'doublon', tentatives = tentatives + 1",
+            (url,),
+        )
+        self._modifie()
+
+    def importer_articles(self, articles):
+        """
+        Marquer comme déjà connus des articles issus d'un crawl précédent.
+
+        Leurs liens ne seront plus scrapés et ils ne comptent pas dans la limite
+        des nouveaux articles.
+
+        Args:
+            articles (list): Articles déjà enregistrés.
+        """
+        for article in articles:
+            url = normaliser_url(article['id'])
+            self._connexion.execute(
+                'INSERT OR IGNORE INTO articles (url, donnees, importe) VALUES (?, ?, 1)',
+                (url, json.dumps(article, ensure_ascii=False)),
+            )
+            self._connexion.execute(
+                "INSERT INTO frontiere (url, statut) VALUES (?, 'ok') "
+                "ON CONFLICT (url) DO UPDATE SET statut = 'ok'",
+                (url,),
+            )
+        self.checkpoint()
+
+    def connait_article(self, url):
+        """
+        Indiquer si un article est déjà enregistré.
+
+        Args:
+            url (str): Lien de l'article.
+
+        Returns:
+            bool: True si l'article est connu.
+        """
+        ligne = self._connexion.execute('SELECT 1 FROM articles WHERE url = ?', (url,)).fetchone()
+        return ligne is not None
+
+    def articles(self):
+        """
+        Parcourir les articles connus, les anciens d'abord puis dans l'ordre du crawl.
+
+        Yields:
+            dict: Article.
+        """
+        curseur = self._connexion.execute('SELECT donnees FROM articles ORDER BY importe DESC, rowid')
+        for (donnees,) in curseur:
+            yield json.loads(donnees)
+
+    def fermer(self, supprimer=False):
+        """
+        Valider et fermer l'état.
+
+        Args:
+            supprimer (bool, optional): Supprimer le fichier d'état, une fois le
+                crawl mené à terme. Par défaut False.
+        """
+        self.checkpoint()
+        self._connexion.close()
+        if supprimer and self.chemin != ':memory:' and os.path.exists(self.chemin):
+            os.remove(self.chemin)
@@ -0,0 +1,303 @@
+"""
+Module d'évaluation du seuil de similarité cosine qui prédit la catégorie « Similaire ».
+
+Les scores sont triés une seule fois ; les comptes cumulés des positifs, lus par
+recherche dichotomique, donnent la matrice de confusion de chaque seuil candidat, et
+donc toute la courbe précision-rappel en O(n log n), au lieu d'un passage de
+scikit-learn par seuil et par métrique. Un article est prédit « Similaire » quand sa
+similarité est strictement supérieure au seuil : entre deux scores distincts
+consécutifs, les prédictions ne changent pas, si bien que les scores distincts (et
+la borne inférieure) suffisent comme seuils candidats.
+
+Les intervalles de confiance sont obtenus par bootstrap : rééchantillonner les n
+couples avec remise revient, pour un seuil fixé, à tirer les quatre comptes de la
+matrice de confusion selon une loi multinomiale de paramètres n et leurs proportions
+observées. Tous les tirages sont faits d'un coup, sans boucle Python. L'intervalle
+du meilleur seuil ne tient pas compte de son choix sur les mêmes données et est donc
+optimiste.
+
+Usage :
+    python evaluation_seuil.py [--entree ../data/clean/donnees_analysees.csv] [--courbe courbe.csv]
+"""
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from metriques import instrumenter, session
+
+CATEGORIE_POSITIVE = 'Similaire'
+
+REPETITIONS_BOOTSTRAP = 1000
+
+NIVEAU_CONFIANCE = 0.95
+
+# Seuils évalués quand les scores ne sont pas tous disponibles (analyse par lots)
+GRILLE_SEUILS = np.linspace(0, 1, 1001)
+
+COLONNES_COURBE = ['seuil', 'vrais_positifs', 'faux_positifs', 'faux_negatifs', 'vrais_negatifs',
+                   'precision', 'rappel', 'f1']
+
+Confusion = namedtuple('Confusion', ['vrais_positifs', 'faux_positifs', 'faux_negatifs', 'vrais_negatifs'])
+
+
+def _rapport(numerateur, denominateur):
+    numerateur = np.asarray(numerateur, dtype=np.float64)
+    denominateur = np.asarray(denominateur, dtype=np.float64)
+    return np.divide(numerateur, denominateur, out=np.zeros(np.broadcast(numerateur, denominateur).shape),
+                     where=denominateur > 0)
+
+
+def metriques_confusion(vp, fp, fn):
+    """
+    Calculer la précision, le rappel et la F-mesure de matrices de confusion, vectorisé.
+
+    Un rapport sans dénominateur vaut 0, comme avec scikit-learn.
+
+    Args:
+        vp (array-like): Vrais positifs.
+        fp (array-like): Faux positifs.
+        fn (array-like): Faux négatifs.
+
+    Returns:
+        tuple: Tableaux de précisions, de rappels et de F-mesures.
+    """
+    vp, fp, fn = np.asarray(vp), np.asarray(fp), np.asarray(fn)
+    return _rapport(vp, vp + fp), _rapport(vp, vp + fn), _rapport(2 * vp, 2 * vp + fp + fn)
+
+
+def precision_rappel_f1(confusion):
+    """
+    Calculer la précision, le rappel et la F-mesure à partir d'une matrice de confusion.
+
+    Args:
+        confusion (Confusion): Comptes de la matrice de confusion.
+
+    Returns:
+        tuple: Précision, rappel et F-mesure.
+    """
+    metriques = metriques_confusion(confusion.vrais_positifs, confusion.faux_positifs, confusion.faux_negatifs)
+    return tuple(float(valeur) for valeur in metriques)
+
+
+def etiquettes_reelles(categories):
+    """
+    Dériver l'étiquette réelle de chaque article de sa catégorie de différence de tokens.
+
+    Args:
+        categories (array-like): Catégorie de chaque article (colonne category).
+
+    Returns:
+        numpy.ndarray: Booléen vrai pour chaque article de la catégorie positive.
+    """
+    return np.asarray(categories) == CATEGORIE_POSITIVE
+
+
+def comptes_au_dessus(scores, reels, seuils):
+    """
+    Compter, pour chaque seuil, les positifs et les négatifs réels dont le score le dépasse.
+
+    Les scores sont triés une fois ; chaque seuil ne coûte qu'une recherche dichotomique.
+    Les comptes de plusieurs lots pour les mêmes seuils s'additionnent.
+
+    Args:
+        scores (array-like): Similarité de chaque couple.
+        reels (array-like): Booléen vrai pour chaque couple réellement positif.
+        seuils (array-like): Seuils, dans n'importe quel ordre.
+
+    Returns:
+        tuple: Vrais positifs et faux positifs de chaque seuil.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    ordre = np.argsort(scores, kind='stable')
+    return _comptes_tries(scores[ordre], np.asarray(reels, dtype=bool)[ordre], seuils)
+
+
+def _comptes_tries(tries, reels_tries, seuils):
+    cumul = np.concatenate([[0], np.cumsum(reels_tries, dtype=np.int64)])
+    debut = np.searchsorted(tries, seuils, side='right')
+    vp = cumul[-1] - cumul[debut]
+    return vp, (len(tries) - debut) - vp
+
+
+def courbe_depuis_comptes(seuils, vp, fp, positifs, negatifs):
+    """
+    Assembler la courbe précision-rappel à partir des comptes au-dessus de chaque seuil.
+
+    Args:
+        seuils (array-like): Seuils.
+        vp (array-like): Vrais positifs de chaque seuil.
+        fp (array-like): Faux positifs de chaque seuil.
+        positifs (int): Nombre de couples réellement positifs.
+        negatifs (int): Nombre de couples réellement négatifs.
+
+    Returns:
+        DataFrame: Une ligne par seuil (colonnes COLONNES_COURBE), par seuil croissant.
+    """
+    vp, fp = np.asarray(vp, dtype=np.int64), np.asarray(fp, dtype=np.int64)
+    fn = positifs - vp
+    precision, rappel, f1 = metriques_confusion(vp, fp, fn)
+    courbe = pd.DataFrame({'seuil': np.asarray(seuils, dtype=np.float64), 'vrais_positifs': vp,
+                           'faux_positifs': fp, 'faux_negatifs': fn, 'vrais_negatifs': negatifs - fp,
+                           'precision': precision, 'rappel': rappel, 'f1': f1})
+    return courbe.sort_values('seuil', kind='stable', ignore_index=True)
+
+
+@instrumenter(elements=lambda courbe: len(courbe))
+def balayer_seuils(scores, reels, seuils=None, borne_inferieure=0.0):
+    """
+    Évaluer la précision, le rappel et la F-mesure de tous les seuils en un seul tri.
+
+    Args:
+        scores (array-like): Similarité de chaque couple.
+        reels (array-like): Booléen vrai pour chaque couple réellement positif.
+        seuils (array-like, optional): Seuils à évaluer. Par défaut, la borne inférieure
+            et tous les scores distincts, ce qui couvre tous les seuils possibles.
+        borne_inferieure (float, optional): Plus petit seuil candidat par défaut ; la
+            similarité cosine n'est jamais négative. Par défaut à 0.
+
+    Returns:
+        DataFrame: Courbe précision-rappel, une ligne par seuil croissant.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    reels = np.asarray(reels, dtype=bool)
+    ordre = np.argsort(scores, kind='stable')
+    tries = scores[ordre]
+    if seuils is None:
+        distincts = tries[np.concatenate([[True], tries[1:] != tries[:-1]])] if len(tries) else tries
+        seuils = np.union1d(distincts, [borne_inferieure])
+    vp, fp = _comptes_tries(tries, reels[ordre], seuils)
+    positifs = int(reels.sum())
+    return courbe_depuis_comptes(seuils, vp, fp, positifs, len(reels) - positifs)
+
+
+def meilleur_seuil(courbe, critere='f1'):
+    """
+    Retenir le seuil qui maximise un critère ; à égalité, le plus élevé.
+
+    Args:
+        courbe (DataFrame): Résultat de balayer_seuils ou de courbe_depuis_comptes.
+        critere (str, optional): Colonne à maximiser. Par défaut la F-mesure.
+
+    Returns:
+        Series: Ligne de la courbe du seuil retenu.
+    """
+    valeurs = courbe[critere].to_numpy()
+    return courbe.iloc[len(valeurs) - 1 - int(np.argmax(valeurs[::-1]))]
+
+
+def confusion_du_seuil(courbe, seuil):
+    """
+    Lire sur la courbe la matrice de confusion d'un seuil quelconque.
+
+    Les prédictions d'un seuil sont celles du plus grand seuil de la courbe qui ne le
+    dépasse pas ; c'est exact pour une courbe de balayer_seuils sur tous les scores
+    distincts, et pour une grille qui contient le seuil.
+
+    Args:
+        courbe (DataFrame): Courbe précision-rappel, par seuil croissant.
+        seuil (float): Seuil.
+
+    Returns:
+        Confusion: Matrice de confusion du seuil.
+
+    Raises:
+        ValueError: Si le seuil est inférieur au premier seuil de la courbe.
+    """
+    position = int(np.searchsorted(courbe['seuil'].to_numpy(), seuil, side='right')) - 1
+    if position < 0:
+        raise ValueError(f"Seuil {seuil} inférieur au premier seuil de la courbe.")
+    ligne = courbe.iloc[position]
+    return Confusion(*(int(ligne[colonne]) for colonne in Confusion._fields))
+
+
+def intervalles_bootstrap(confusion, repetitions=REPETITIONS_BOOTSTRAP, niveau=NIVEAU_CONFIANCE, graine=0):
+    """
+    Estimer par bootstrap les intervalles de confiance de la précision, du rappel et de la F-mesure.
+
+    Chaque rééchantillonnage des n couples est tiré directement sous la forme de sa
+    matrice de confusion (loi multinomiale sur les quatre cases) ; les métriques de
+    tous les tirages sont calculées ensemble, puis on retient leurs quantiles.
+
+    Args:
+        confusion (Confusion): Matrice de confusion observée.
+        repetitions (int, optional): Nombre de rééchantillonnages. Par défaut à 1000.
+        niveau (float, optional): Niveau de confiance. Par défaut à 0,95.
+        graine (int, optional): Graine des tirages. Par défaut à 0.
+
+    Returns:
+        DataFrame: Pour chaque métrique (precision, rappel, f1), sa valeur observée et
+        les bornes de son intervalle par la méthode des percentiles.
+
+    Raises:
+        ValueError: Si la matrice de confusion est vide ou si le niveau n'est pas dans ]0, 1[.
+    """
+    if not 0 < niveau < 1:
+        raise ValueError(f"Le niveau de confiance doit être compris entre 0 et 1 : {niveau}")
+    comptes = np.asarray(confusion, dtype=np.int64)
+    n = int(comptes.sum())
+    if n == 0:
+        raise ValueError("La matrice de confusion est vide.")
+
+    tirages = np.random.default_rng(graine).multinomial(n, comptes / n, size=repetitions)
+    echantillons = np.column_stack(metriques_confusion(tirages[:, 0], tirages[:, 1], tirages[:, 2]))
+    alpha = (1 - niveau) / 2
+    bornes = np.quantile(echantillons, [alpha, 1 - alpha], axis=0)
+    return pd.DataFrame({'valeur': precision_rappel_f1(Confusion(*comptes.tolist())),
+                         'borne_inferieure': bornes[0], 'borne_superieure': bornes[1]},
+                        index=['precision', 'rappel', 'f1'])
+
+
+def afficher_evaluation(courbe, seuil, repetitions=REPETITIONS_BOOTSTRAP, niveau=NIVEAU_CONFIANCE):
+    """
+    Afficher les métriques du seuil demandé et du meilleur seuil, avec leurs intervalles de confiance.
+
+    Args:
+        courbe (DataFrame): Courbe précision-rappel.
+        seuil (float): Seuil de similarité cosine demandé.
+        repetitions (int, optional): Nombre de rééchantillonnages bootstrap ; 0 pour
+            ne pas calculer d'intervalles.
+        niveau (float, optional): Niveau de confiance.
+    """
+    meilleur = meilleur_seuil(courbe)
+    for titre, valeur in ((f"Seuil {seuil:.2f}", seuil), (f"Meilleur seuil (F-mesure) : {meilleur['seuil']:.3f}",
+                                                          meilleur['seuil'])):
+        confusion = confusion_du_seuil(courbe, valeur)
+        print(titre)
+        if repetitions:
+            intervalles = intervalles_bootstrap(confusion, repetitions, niveau)
+        else:
+            intervalles = pd.DataFrame({'valeur': precision_rappel_f1(confusion)}, index=['precision', 'rappel', 'f1'])
+        for nom, cle in (('Précision', 'precision'), ('Rappel', 'rappel'), ('F-mesure', 'f1')):
+            ligne = intervalles.loc[cle]
+            texte = f'{nom} : {ligne["valeur"]:.2f}'
+            if repetitions:
+                texte += f' [{ligne["borne_inferieure"]:.2f}, {ligne["borne_superieure"]:.2f}] à {niveau:.0%}'
+            print(texte)
+
+
+def main(argv=None):
+    parseur = argparse.ArgumentParser(description="Balayer les seuils de similarité cosine du corpus analysé.")
+    parseur.add_argument('--entree', default='../data/clean/donnees_analysees.csv',
+                         help="Corpus analysé (CSV avec cosine_similarity et category)")
+    parseur.add_argument('--seuil', type=float, default=0.5, help="Seuil de similarité cosine à évaluer")
+    parseur.add_argument('--courbe', help="Fichier CSV où écrire la courbe précision-rappel")
+    parseur.add_argument('--bootstrap', type=int, default=REPETITIONS_BOOTSTRAP,
+                         help="Nombre de rééchantillonnages bootstrap (0 : sans intervalles)")
+    parseur.add_argument('--niveau', type=float, default=NIVEAU_CONFIANCE, help="Niveau de confiance")
+    parseur.add_argument('--metriques', help="Fichier JSON où écrire les mesures de l'exécution")
+    args = parseur.parse_args(argv)
+
+    with session('evaluation_seuil', args.metriques) as mesure:
+        data = pd.read_csv(args.entree, usecols=['cosine_similarity', 'category'], float_precision='round_trip')
+        mesure.elements = len(data)
+        courbe = balayer_seuils(data['cosine_similarity'], etiquettes_reelles(data['category']))
+        if args.courbe:
+            courbe.to_csv(args.courbe, index=False)
+        afficher_evaluation(courbe, args.seuil, args.bootstrap, args.niveau)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Module d'extraction du contenu des pages HTML scrapées.
+
+Plusieurs moteurs d'analyse sont disponibles pour la même extraction :
+
+- 'html.parser' : arbre BeautifulSoup complet avec l'analyseur pur Python, l'extracteur d'origine ;
+- 'strainer' : même analyseur, mais limité par un SoupStrainer aux balises utiles
+  (<title>, <meta>, <article>, <a>), ce qui évite de construire le reste de l'arbre ;
+- 'lxml' : analyseur C de lxml interrogé directement en XPath, le plus rapide.
+
+lxml ne construit pas le même arbre que html.parser sur du HTML mal formé (un <p>
+ouvert dans un autre <p> est fermé au lieu d'être imbriqué) : avant d'en faire le
+moteur d'un crawl, le script bench_extraction.py permet de mesurer le débit de
+chaque moteur et de vérifier que sa sortie est identique à celle de l'extracteur
+d'origine sur le cache HTML. test_extraction_html.py fait cette vérification sur un
+site synthétique (corpus_synthetique) et sur des pages aux cas limites.
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from metriques import instrumenter
+
+MOTEURS = ('html.parser', 'strainer', 'lxml')
+
+BALISES_CONTENU = ['p', 'h2', 'h3', 'h4']
+
+FILTRE_ARTICLE = SoupStrainer(['title', 'meta', 'article'])
+FILTRE_LIENS = SoupStrainer('a')
+
+# Texte ignoré par get_text() de BeautifulSoup (scripts, styles, gabarits)
+XPATH_TEXTE = './/text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]'
+XPATH_CONTENU = ' | '.join(f'.//{balise}' for balise in BALISES_CONTENU)
+
+
+def _construire_article(url, titre, contenu, description):
+    if titre is None:
+        titre = 'Titre non trouvé'
+    if contenu is None:
+        contenu = 'Contenu de l\'article non trouvé'
+    if description is None:
+        description = 'Aucune description trouvée'
+    return {"id": url, "article": f"{titre}\n\n{contenu}", "description": description}
+
+
+def _extraire_article_soupe(url, soupe):
+    balise_titre = soupe.find('title')
+    titre = balise_titre.get_text(strip=True) if balise_titre else None
+
+    balise_article = soupe.find('article')
+    contenu = None
+    if balise_article:
+        for meta in balise_article.find_all('meta', attrs={'name': 'description'}):
+            meta.decompose()
+        contenu = '\n'.join([p.get_text(strip=True) for p in balise_article.find_all(BALISES_CONTENU)])
+
+    balise_description = soupe.find('meta', attrs={'name': 'description'})
+    description = balise_description['content'] if balise_description else None
+
+    return _construire_article(url, titre, contenu, description)
+
+
+def _arbre_lxml(html):
+    import lxml.html
+    from lxml.etree import ParserError
+
+    # L'encodage explicite évite le refus des chaînes portant une déclaration d'encodage
+    parseur = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        return lxml.html.document_fromstring(html.encode('utf-8'), parser=parseur)
+    except ParserError:
+        # Document vide : BeautifulSoup renvoie alors un arbre sans balise
+        return None
+
+
+def _texte_lxml(element):
+    return ''.join(morceau.strip() for morceau in element.xpath(XPATH_TEXTE))
+
+
+def _extraire_article_lxml(url, html):
+    arbre = _arbre_lxml(html)
+    if arbre is None:
+        return _construire_article(url, None, None, None)
+
+    balises_titre = arbre.xpath('//title')
+    titre = _texte_lxml(balises_titre[0]) if balises_titre else None
+
+    balises_article = arbre.xpath('//article')
+    balise_article = balises_article[0] if balises_article else None
+    contenu = None
+    if balise_article is not None:
+        contenu = '\n'.join(_texte_lxml(element) for element in balise_article.xpath(XPATH_CONTENU))
+
+    # Les balises meta de l'article sont retirées avant la recherche de la description
+    description = None
+    for meta in arbre.xpath('//meta[@name="description"]'):
+        if balise_article is None or balise_article not in meta.iterancestors('article'):
+            description = meta.attrib['content']
+            break
+
+    return _construire_article(url, titre, contenu, description)
+
+
+@instrumenter()
+def extraire_article(url, html, moteur='strainer'):
+    """
+    Extraire le titre, le contenu de l'article complet et la description d'une page HTML.
+
+    Args:
+        url (str): URL de l'article, utilisée comme identifiant.
+        html (str): HTML brut de la page.
+        moteur (str, optional): Moteur d'analyse, parmi MOTEURS. Par défaut 'strainer'.
+
+    Returns:
+        dict: Dictionnaire contenant l'URL, l'article complet et la description.
+
+    Raises:
+        KeyError: Si la balise meta de description n'a pas d'attribut content.
+        ValueError: Si le moteur est inconnu.
+    """
+    if moteur == 'html.parser':
+        return _extraire_article_soupe(url, BeautifulSoup(html, 'html.parser'))
+    if moteur == 'strainer':
+        return _extraire_article_soupe(url, BeautifulSoup(html, 'html.parser', parse_only=FILTRE_ARTICLE))
+    if moteur == 'lxml':
+        return _extraire_article_lxml(url, html)
+    raise ValueError(f"Moteur d'analyse inconnu : {moteur}")
+
+
+@instrumenter()
+def extraire_liens(html, moteur='strainer'):
+    """
+    Extraire la cible de tous les liens d'une page HTML.
+
+    Les balises <a> sans attribut href sont ignorées.
+
+    Args:
+        html (str): HTML brut de la page.
+        moteur (str, optional): Moteur d'analyse, parmi MOTEURS. Par défaut 'strainer'.
+
+    Returns:
+        list: Valeurs des attributs href, dans l'ordre du document.
+
+    Raises:
+        ValueError: Si le moteur est inconnu.
+    """
+    if moteur == 'lxml':
+        arbre = _arbre_lxml(html)
+        return [] if arbre is None else [str(href) for href in arbre.xpath('//a/@href')]
+    if moteur == 'html.parser':
+        soupe = BeautifulSoup(html, 'html.parser')
+    elif moteur == 'strainer':
+        soupe = BeautifulSoup(html, 'html.parser', parse_only=FILTRE_LIENS)
+    else:
+        raise ValueError(f"Moteur d'analyse inconnu : {moteur}")
+    return [lien['href'] for lien in soupe.find_all('a') if lien.get('href') is not None]
@@ -0,0 +1,315 @@
+"""
+Module d'instrumentation : durées, temps CPU, mémoire, débits et compteurs.
+
+Les mesures sont recueillies pour tout le processus, à faible coût, même quand
+aucun fichier n'est demandé :
+
+- section(nom) chronomètre un bloc (durée, temps CPU du processus) ;
+- @instrumenter chronomètre chaque appel d'une fonction chaude (temps CPU du
+  thread appelant) ; pour un générateur, seul le temps passé à produire les
+  éléments est compté, et chaque élément produit compte pour un ;
+- compter(nom, n) incrémente un compteur (pages récupérées, octets téléchargés,
+  succès des caches, relances...).
+
+Chaque section rapporte aussi son nombre d'éléments traités et son débit, ainsi
+que le pic de mémoire résidente (RSS) du processus à sa sortie. session() encadre
+une exécution complète : elle écrit les mesures dans un fichier JSON et, sur
+demande, un profil cProfile du thread principal (lisible avec pstats ou snakeviz).
+
+Deux fichiers de mesures se comparent en ligne de commande :
+    python metriques.py comparer avant.json apres.json [--seuil 1.2]
+"""
+
+import argparse
+import contextlib
+import functools
+import inspect
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+_verrou = threading.Lock()
+_compteurs = Counter()
+_sections = {}
+
+
+def compter(nom, n=1):
+    """
+    Incrémenter un compteur.
+
+    Args:
+        nom (str): Nom du compteur.
+        n (int, optional): Valeur ajoutée. Par défaut à 1.
+    """
+    with _verrou:
+        _compteurs[nom] += n
+
+
+def _enregistrer(nom, duree, cpu, elements):
+    with _verrou:
+        mesure = _sections.get(nom)
+        if mesure is None:
+            mesure = _sections[nom] = {'appels': 0, 'duree': 0.0, 'duree_max': 0.0, 'cpu': 0.0, 'elements': 0}
+        mesure['appels'] += 1
+        mesure['duree'] += duree
+        mesure['duree_max'] = max(mesure['duree_max'], duree)
+        mesure['cpu'] += cpu
+        mesure['elements'] += elements
+        mesure['rss_max_mo'] = rss_max_mo()
+
+
+def rss_max_mo():
+    """
+    Renvoyer le pic de mémoire résidente du processus depuis son lancement.
+
+    Returns:
+        float or None: Pic de RSS en mégaoctets, None si la plateforme ne le fournit pas.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kio sous Linux, octets sous macOS
+    return pic / 1024 ** 2 if sys.platform == 'darwin' else pic / 1024
+
+
+class Section:
+    """
+    Bloc chronométré ; l'attribut `elements` peut être renseigné dans le bloc.
+    """
+
+    def __init__(self, nom, elements=0):
+        """
+        Args:
+            nom (str): Nom de la section ; les passages successifs s'additionnent.
+            elements (int, optional): Nombre d'éléments traités dans le bloc.
+        """
+        self.nom = nom
+        self.elements = elements
+
+    def __enter__(self):
+        self._debut = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, type_exception, exception, trace):
+        _enregistrer(self.nom, time.perf_counter() - self._debut, time.process_time() - self._cpu, self.elements or 0)
+        return False
+
+
+def section(nom, elements=0):
+    """
+    Chronométrer un bloc de code.
+
+    Args:
+        nom (str): Nom de la section.
+        elements (int, optional): Nombre d'éléments traités, modifiable dans le bloc.
+
+    Returns:
+        Section: Gestionnaire de contexte.
+    """
+    return Section(nom, elements)
+
+
+def _nom_fonction(fonction):
+    module = fonction.__module__
+    if module == '__main__':
+        principal = getattr(sys.modules['__main__'], '__file__', None)
+        module = os.path.splitext(os.path.basename(principal))[0] if principal else module
+    return f'{module}.{fonction.__qualname__}'
+
+
+def instrumenter(nom=None, elements=None):
+    """
+    Décorer une fonction pour chronométrer chacun de ses appels.
+
+    Args:
+        nom (str, optional): Nom de la mesure. Par défaut module.fonction.
+        elements (callable, optional): Nombre d'éléments traités, calculé à partir du
+            résultat. Par défaut un par appel, ou un par élément produit pour un générateur.
+
+    Returns:
+        callable: Décorateur.
+    """
+    def decorer(fonction):
+        cle = nom or _nom_fonction(fonction)
+
+        if inspect.isgeneratorfunction(fonction):
+            @functools.wraps(fonction)
+            def enveloppe_generateur(*args, **kwargs):
+                duree = cpu = 0.0
+                produits = 0
+                generateur = fonction(*args, **kwargs)
+                try:
+                    while True:
+                        debut, debut_cpu = time.perf_counter(), time.thread_time()
+                        try:
+                            valeur = next(generateur)
+                        except StopIteration:
+                            return
+                        finally:
+                            duree += time.perf_counter() - debut
+                            cpu += time.thread_time() - debut_cpu
+                        produits += 1
+                        yield valeur
+                finally:
+                    generateur.close()
+                    _enregistrer(cle, duree, cpu, produits)
+            return enveloppe_generateur
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            debut, debut_cpu = time.perf_counter(), time.thread_time()
+            resultat = None
+            try:
+                resultat = fonction(*args, **kwargs)
+                return resultat
+            finally:
+                _enregistrer(cle, time.perf_counter() - debut, time.thread_time() - debut_cpu,
+                             elements(resultat) if elements is not None and resultat is not None else 1)
+        return enveloppe
+    return decorer
+
+
+def instantane():
+    """
+    Renvoyer les mesures recueillies depuis le lancement ou la dernière réinitialisation.
+
+    Returns:
+        dict: Sections (avec leur débit en éléments par seconde), compteurs et pic de RSS.
+    """
+    with _verrou:
+        sections = {nom: dict(mesure) for nom, mesure in _sections.items()}
+        compteurs = dict(_compteurs)
+    for mesure in sections.values():
+        mesure['elements_par_seconde'] = mesure['elements'] / mesure['duree'] if mesure['duree'] > 0 else None
+    return {'sections': sections, 'compteurs': compteurs, 'rss_max_mo': rss_max_mo()}
+
+
+def reinitialiser():
+    """Oublier toutes les mesures recueillies."""
+    with _verrou:
+        _sections.clear()
+        _compteurs.clear()
+
+
+def ecrire_metriques(chemin, mesures=None, **contexte):
+    """
+    Écrire des mesures dans un fichier JSON, avec le contexte de l'exécution.
+
+    Args:
+        chemin (str): Fichier JSON.
+        mesures (dict, optional): Mesures à écrire. Par défaut instantane().
+        **contexte: Informations ajoutées au fichier (script, arguments...).
+    """
+    contenu = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'processeurs': os.cpu_count(),
+    }
+    contenu.update(contexte)
+    contenu.update(mesures if mesures is not None else instantane())
+    if os.path.dirname(chemin):
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    chemin_temporaire = chemin + '.tmp'
+    with open(chemin_temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(contenu, fichier, ensure_ascii=False, indent=4)
+    os.replace(chemin_temporaire, chemin)
+
+
+@contextlib.contextmanager
+def session(nom, metriques=None, profil=None):
+    """
+    Mesurer une exécution complète comme une section.
+
+    Args:
+        nom (str): Nom de l'exécution (script ou étape).
+        metriques (str, optional): Fichier JSON où écrire les mesures en sortie.
+        profil (str, optional): Fichier où écrire le profil cProfile du thread principal.
+
+    Yields:
+        Section: Section de l'exécution, dont `elements` peut être renseigné.
+    """
+    profileur = None
+    if profil:
+        import cProfile
+
+        profileur = cProfile.Profile()
+        profileur.enable()
+    try:
+        with section(nom) as mesure:
+            yield mesure
+    finally:
+        if profileur is not None:
+            profileur.disable()
+            if os.path.dirname(profil):
+                os.makedirs(os.path.dirname(profil), exist_ok=True)
+            profileur.dump_stats(profil)
+        if metriques:
+            ecrire_metriques(metriques, script=nom, arguments=sys.argv[1:])
+
+
+def _mesures_a_plat(contenu, prefixe=''):
+    mesures = {}
+    for nom, mesure in contenu.get('sections', {}).items():
+        mesures[f'{prefixe}{nom}.duree'] = mesure['duree']
+        mesures[f'{prefixe}{nom}.cpu'] = mesure['cpu']
+    if contenu.get('rss_max_mo') is not None:
+        mesures[f'{prefixe}rss_max_mo'] = contenu['rss_max_mo']
+    for nom, sous_contenu in contenu.get('etapes', {}).items():
+        mesures.update(_mesures_a_plat(sous_contenu, f'{prefixe}{nom}/'))
+    return mesures
+
+
+def comparer(avant, apres, seuil=1.2, duree_min=0.05):
+    """
+    Comparer les durées, temps CPU et pics de mémoire de deux exécutions.
+
+    Args:
+        avant (dict): Mesures de référence.
+        apres (dict): Mesures à comparer.
+        seuil (float, optional): Rapport après/avant au-delà duquel une mesure régresse.
+        duree_min (float, optional): Durée de référence en secondes sous laquelle une
+            mesure est trop bruitée pour être jugée. Par défaut à 0,05 s.
+
+    Returns:
+        list: Tuples (mesure, avant, après, rapport, régression), mesures communes aux deux.
+    """
+    mesures_avant, mesures_apres = _mesures_a_plat(avant), _mesures_a_plat(apres)
+    lignes = []
+    for nom in sorted(mesures_avant.keys() & mesures_apres.keys()):
+        valeur_avant, valeur_apres = mesures_avant[nom], mesures_apres[nom]
+        rapport = valeur_apres / valeur_avant if valeur_avant > 0 else None
+        jugeable = nom.endswith('rss_max_mo') or valeur_avant >= duree_min
+        lignes.append((nom, valeur_avant, valeur_apres, rapport, bool(jugeable and rapport and rapport > seuil)))
+    return lignes
+
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Comparer les mesures de deux exécutions.")
+    sous_parseurs = parseur.add_subparsers(dest='commande', required=True)
+    parseur_comparer = sous_parseurs.add_parser('comparer', help="Comparer deux fichiers de mesures")
+    parseur_comparer.add_argument('avant', help="Fichier JSON de référence")
+    parseur_comparer.add_argument('apres', help="Fichier JSON à comparer")
+    parseur_comparer.add_argument('--seuil', type=float, default=1.2, help="Rapport signalé comme régression")
+    args = parseur.parse_args()
+
+    with open(args.avant, 'r', encoding='utf-8') as fichier:
+        avant = json.load(fichier)
+    with open(args.apres, 'r', encoding='utf-8') as fichier:
+        apres = json.load(fichier)
+    lignes = comparer(avant, apres, args.seuil)
+    print(f"{'mesure':<60} {'avant':>10} {'après':>10} {'rapport':>8}")
+    for nom, valeur_avant, valeur_apres, rapport, regression in lignes:
+        rapport_texte = f'{rapport:.2f}' if rapport is not None else '-'
+        print(f"{nom:<60} {valeur_avant:>10.3f} {valeur_apres:>10.3f} {rapport_texte:>8}{'  !' if regression else ''}")
+    regressions = sum(1 for ligne in lignes if ligne[4])
+    print(f"{regressions} régression(s) au-delà d'un rapport de {args.seuil}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,339 @@
+"""
+Module de modèle TF-IDF persistant et incrémental.
+
+Les comptes de termes de chaque texte sont enregistrés sur disque, en fragments
+de matrices creuses (.npz), sous l'empreinte BLAKE2 du texte : d'une exécution à
+l'autre, seuls les textes nouveaux ou modifiés sont tokenisés, et un même texte
+présent plusieurs fois dans le corpus ne l'est qu'une fois. Un index SQLite
+associe chaque empreinte à sa ligne de fragment et garde le vocabulaire. Au-delà
+de MAX_FRAGMENTS fragments, ceux-ci sont fusionnés en un seul.
+
+Le modèle ne garde pas de fréquences documentaires : elles porteraient sur tous
+les textes jamais ajoutés, y compris ceux qui ont quitté le corpus ou ont été
+modifiés. L'IDF est calculé sur les comptes du corpus courant, par
+StatistiquesTexte.tfidf ou par analyse_par_lots.
+
+Deux modes sont disponibles :
+
+- 'vocabulaire' : même tokenisation et même vocabulaire que CountVectorizer et
+  TfidfVectorizer ; le vocabulaire grandit avec les textes ajoutés ;
+- 'hachage' : mêmes colonnes que HashingVectorizer (n_features colonnes, sans
+  alternance de signe), sans vocabulaire à garder en mémoire pendant l'ajout,
+  pour les corpus qui ne tiennent pas en mémoire (analyse_par_lots calcule alors
+  l'IDF en flux, lot par lot). Chaque colonne est nommée d'après le premier terme
+  qui y a été haché : les termes fréquents restent lisibles, aux collisions près.
+"""
+
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+
+from metriques import compter, instrumenter
+
+MODES = ('vocabulaire', 'hachage')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    empreinte TEXT PRIMARY KEY,
+    fragment INTEGER NOT NULL,
+    ligne INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fragments (
+    numero INTEGER PRIMARY KEY,
+    taille INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vocabulaire (
+    indice INTEGER PRIMARY KEY,
+    terme TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS meta (
+    cle TEXT PRIMARY KEY,
+    valeur BLOB
+);
+"""
+
+# Nombre maximal de paramètres d'une requête SQLite
+TAILLE_REQUETE = 500
+
+# Nombre de fragments au-delà duquel ils sont fusionnés
+MAX_FRAGMENTS = 64
+
+
+def empreinte_texte(texte):
+    """
+    Calculer l'empreinte d'un texte, qui l'identifie dans le modèle.
+
+    Args:
+        texte (str): Texte.
+
+    Returns:
+        str: Empreinte BLAKE2b (128 bits) en hexadécimal.
+    """
+    return hashlib.blake2b(texte.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ModeleTfidf:
+    """
+    Comptes de termes persistants d'un ensemble de textes, par empreinte de texte.
+    """
+
+    def __init__(self, repertoire='../data/cache/tfidf', mode='vocabulaire', n_features=2 ** 20,
+                 max_fragments=MAX_FRAGMENTS):
+        """
+        Args:
+            repertoire (str, optional): Répertoire du modèle.
+            mode (str, optional): 'vocabulaire' ou 'hachage'. Par défaut 'vocabulaire'.
+            n_features (int, optional): Nombre de colonnes en mode 'hachage'. Par défaut 2**20.
+            max_fragments (int, optional): Nombre de fragments au-delà duquel ils sont
+                fusionnés. Par défaut MAX_FRAGMENTS.
+
+        Raises:
+            ValueError: Si le mode est inconnu ou diffère de celui du modèle existant.
+        """
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu : {mode}")
+        self.repertoire = repertoire
+        os.makedirs(os.path.join(repertoire, 'fragments'), exist_ok=True)
+        self._connexion = sqlite3.connect(os.path.join(repertoire, 'index.sqlite'))
+        self._connexion.executescript(SCHEMA)
+
+        meta = dict(self._connexion.execute('SELECT cle, valeur FROM meta'))
+        if 'mode' in meta:
+            if meta['mode'] != mode or (mode == 'hachage' and int(meta['n_features']) != n_features):
+                raise ValueError(
+                    f"Le modèle de {repertoire} est en mode {meta['mode']} ; "
+                    "choisir un autre répertoire pour changer de mode."
+                )
+        else:
+            self._connexion.executemany(
+                'INSERT INTO meta (cle, valeur) VALUES (?, ?)', [('mode', mode), ('n_features', str(n_features))]
+            )
+            self._connexion.commit()
+        self.mode = mode
+
+        # HashingVectorizer a la même tokenisation par défaut que CountVectorizer
+        self._analyseur = CountVectorizer().build_analyzer()
+        if mode == 'vocabulaire':
+            self._vocabulaire = {
+                terme: indice
+                for indice, terme in self._connexion.execute('SELECT indice, terme FROM vocabulaire')
+            }
+        else:
+            self._vocabulaire = None
+        self.n_features = n_features
+        self.max_fragments = max_fragments
+
+        if 'df' in meta:
+            # Fréquences documentaires écrites par les versions précédentes
+            self._connexion.execute("DELETE FROM meta WHERE cle = 'df'")
+            self._connexion.commit()
+        self._fragments = {}
+
+    @property
+    def nombre_colonnes(self):
+        """Nombre de colonnes des matrices de comptes."""
+        return len(self._vocabulaire) if self.mode == 'vocabulaire' else self.n_features
+
+    def vocabulaire(self):
+        """
+        Renvoyer le terme de chaque colonne, comme get_feature_names_out.
+
+        En mode 'hachage', une colonne porte le premier terme qui y a été haché, et
+        une colonne à laquelle aucun terme n'est encore arrivé une chaîne vide.
+
+        Returns:
+            numpy.ndarray: Terme de chaque colonne.
+        """
+        if self.mode == 'vocabulaire':
+            termes = np.empty(len(self._vocabulaire), dtype=object)
+            for terme, indice in self._vocabulaire.items():
+                termes[indice] = terme
+            return termes
+        termes = np.full(self.n_features, '', dtype=object)
+        for indice, terme in self._connexion.execute('SELECT indice, terme FROM vocabulaire'):
+            termes[indice] = terme
+        return termes
+
+    def _colonne_hachee(self, terme):
+        from sklearn.utils import murmurhash3_32
+
+        # Même colonne que HashingVectorizer(alternate_sign=False)
+        return abs(murmurhash3_32(terme, seed=0)) % self.n_features
+
+    def _compter(self, textes):
+        # Même boucle que CountVectorizer, mais sur un vocabulaire qui grandit ou,
+        # en mode 'hachage', sur les colonnes de HashingVectorizer
+        colonnes = self._vocabulaire if self.mode == 'vocabulaire' else {}
+        nouveaux = []
+        indices, valeurs, debuts = [], [], [0]
+        for texte in textes:
+            compteur = Counter()
+            for terme in self._analyseur(texte):
+                indice = colonnes.get(terme)
+                if indice is None:
+                    if self.mode == 'vocabulaire':
+                        indice = len(colonnes)
+                    else:
+                        indice = self._colonne_hachee(terme)
+                    colonnes[terme] = indice
+                    nouveaux.append((indice, terme))
+                compteur[indice] += 1
+            indices.extend(compteur.keys())
+            valeurs.extend(compteur.values())
+            debuts.append(len(indices))
+        if nouveaux:
+            # En mode 'hachage', seul le premier terme d'une colonne est retenu
+            self._connexion.executemany('INSERT OR IGNORE INTO vocabulaire (indice, terme) VALUES (?, ?)', nouveaux)
+        comptes = sp.csr_matrix(
+            (np.array(valeurs, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(debuts, dtype=np.int64)),
+            shape=(len(textes), self.nombre_colonnes),
+        )
+        comptes.sort_indices()
+        return comptes
+
+    def _positions(self, empreintes):
+        positions = {}
+        for debut in range(0, len(empreintes), TAILLE_REQUETE):
+            morceau = empreintes[debut:debut + TAILLE_REQUETE]
+            lignes = self._connexion.execute(
+                'SELECT empreinte, fragment, ligne FROM documents WHERE empreinte IN (%s)'
+                % ','.join('?' * len(morceau)),
+                morceau,
+            )
+            positions.update((empreinte, (fragment, ligne)) for empreinte, fragment, ligne in lignes)
+        return positions
+
+    @instrumenter(elements=lambda nombre: nombre)
+    def ajouter(self, textes):
+        """
+        Tokeniser et enregistrer les textes encore inconnus du modèle.
+
+        Les nouveaux textes forment un fragment ; au-delà de max_fragments fragments,
+        ils sont ensuite fusionnés.
+
+        Args:
+            textes (iterable): Textes à ajouter.
+
+        Returns:
+            int: Nombre de textes tokenisés.
+        """
+        textes = list(textes)
+        empreintes = [empreinte_texte(texte) for texte in textes]
+        connues = self._positions(list(set(empreintes)))
+        a_ajouter = {}
+        for empreinte, texte in zip(empreintes, textes):
+            if empreinte not in connues and empreinte not in a_ajouter:
+                a_ajouter[empreinte] = texte
+        compter('tfidf_textes_connus', len(set(empreintes)) - len(a_ajouter))
+        if not a_ajouter:
+            return 0
+
+        comptes = self._compter(list(a_ajouter.values()))
+        numero = self._connexion.execute('SELECT COALESCE(MAX(numero) + 1, 0) FROM fragments').fetchone()[0]
+        sp.save_npz(self._chemin_fragment(numero), comptes)
+
+        self._connexion.execute('INSERT INTO fragments (numero, taille) VALUES (?, ?)', (numero, comptes.shape[0]))
+        self._connexion.executemany(
+            'INSERT INTO documents (empreinte, fragment, ligne) VALUES (?, ?, ?)',
+            ((empreinte, numero, ligne) for ligne, empreinte in enumerate(a_ajouter)),
+        )
+        self._connexion.commit()
+        if self._connexion.execute('SELECT COUNT(*) FROM fragments').fetchone()[0] > self.max_fragments:
+            self.compacter()
+        return len(a_ajouter)
+
+    def compacter(self):
+        """
+        Fusionner tous les fragments en un seul.
+
+        Le fragment fusionné est écrit sous un nouveau numéro avant que l'index ne
+        soit mis à jour, dans une seule transaction ; les anciens fichiers ne sont
+        supprimés qu'ensuite, si bien qu'une interruption ne perd aucun texte.
+
+        Returns:
+            int: Nombre de fragments fusionnés.
+        """
+        fragments = self._connexion.execute('SELECT numero, taille FROM fragments ORDER BY numero').fetchall()
+        if len(fragments) < 2:
+            return 0
+        blocs = []
+        for numero, _ in fragments:
+            bloc = sp.load_npz(self._chemin_fragment(numero)).tocsr()
+            bloc.resize((bloc.shape[0], self.nombre_colonnes))
+            blocs.append(bloc)
+        fusion = sp.vstack(blocs, format='csr')
+        nouveau = fragments[-1][0] + 1
+        temporaire = os.path.join(self.repertoire, 'fragments', f'{nouveau:05d}.tmp.npz')
+        sp.save_npz(temporaire, fusion)
+        os.replace(temporaire, self._chemin_fragment(nouveau))
+
+        decalage = 0
+        for numero, taille in fragments:
+            self._connexion.execute(
+                'UPDATE documents SET fragment = ?, ligne = ligne + ? WHERE fragment = ?', (nouveau, decalage, numero)
+            )
+            decalage += taille
+        self._connexion.execute('DELETE FROM fragments')
+        self._connexion.execute('INSERT INTO fragments (numero, taille) VALUES (?, ?)', (nouveau, fusion.shape[0]))
+        self._connexion.commit()
+
+        for numero, _ in fragments:
+            os.remove(self._chemin_fragment(numero))
+        self._fragments.clear()
+        compter('tfidf_fragments_fusionnes', len(fragments))
+        return len(fragments)
+
+    def _chemin_fragment(self, numero):
+        return os.path.join(self.repertoire, 'fragments', f'{numero:05d}.npz')
+
+    def _charger_fragment(self, numero):
+        if numero not in self._fragments:
+            self._fragments[numero] = sp.load_npz(self._chemin_fragment(numero)).tocsr()
+        fragment = self._fragments[numero]
+        if fragment.shape[1] < self.nombre_colonnes:
+            # Fragment écrit avant l'ajout de termes au vocabulaire
+            fragment.resize((fragment.shape[0], self.nombre_colonnes))
+        return fragment
+
+    @instrumenter(elements=lambda comptes: comptes.shape[0])
+    def comptes(self, textes):
+        """
+        Renvoyer la matrice de comptes de textes, en ajoutant d'abord les inconnus.
+
+        Args:
+            textes (iterable): Textes, éventuellement répétés.
+
+        Returns:
+            scipy.sparse.csr_matrix: Comptes des termes, une ligne par texte, dans l'ordre.
+        """
+        textes = list(textes)
+        self.ajouter(textes)
+        empreintes = [empreinte_texte(texte) for texte in textes]
+        positions = self._positions(list(set(empreintes)))
+        fragments = np.array([positions[empreinte][0] for empreinte in empreintes], dtype=np.int64)
+        lignes = np.array([positions[empreinte][1] for empreinte in empreintes], dtype=np.int64)
+
+        blocs, rangs = [], []
+        for numero in np.unique(fragments):
+            selection = np.flatnonzero(fragments == numero)
+            blocs.append(self._charger_fragment(int(numero))[lignes[selection]])
+            rangs.append(selection)
+        if not blocs:
+            return sp.csr_matrix((0, self.nombre_colonnes), dtype=np.int64)
+        empilees = sp.vstack(blocs, format='csr')
+        return empilees[np.argsort(np.concatenate(rangs))]
+
+    def vider_cache(self):
+        """Oublier les fragments chargés en mémoire, pour qu'une lecture par lots reste bornée."""
+        self._fragments.clear()
+
+    def fermer(self):
+        """Fermer l'index du modèle."""
+        self._connexion.close()
+        self._fragments.clear()
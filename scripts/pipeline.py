@@ -0,0 +1,552 @@
+"""
+Module d'exécution de la chaîne de traitement du corpus, étape par étape.
+
+Les étapes (scraping, chargement, découpage, statistiques, similarité, phrases,
+rapport) sont déclarées avec leurs fichiers d'entrée et de sortie, dont les
+chemins viennent d'un fichier de configuration JSON (pipeline.json par défaut,
+chemins relatifs à ce fichier). Une étape dépend des étapes qui produisent ses
+entrées ; les étapes indépendantes s'exécutent en parallèle dans un pool de
+processus.
+
+Chaque étape s'exécute dans un processus neuf, ce qui isole ses mesures (durée,
+temps CPU, pic de mémoire, débit, compteurs de metriques) : elles sont écrites,
+avec celles de l'exécution complète, dans un fichier JSON par exécution, et un
+profil cProfile par étape peut être demandé.
+
+Une étape n'est relancée que si l'empreinte de ses entrées a changé depuis sa
+dernière exécution réussie : contenu des fichiers d'entrée, des modules qui
+l'implémentent et des modules locaux qu'ils importent, et paramètres de l'étape. Une étape relancée qui produit des
+sorties identiques n'entraîne donc pas les suivantes. Les empreintes sont
+conservées dans etat_pipeline.json, dans le répertoire de cache.
+
+La clé mode_tfidf de la configuration ('vocabulaire' par défaut, ou 'hachage')
+choisit le modèle TF-IDF persistant des étapes statistiques, similarité et
+rapport ; elle fait partie de leurs paramètres.
+
+Usage :
+    python pipeline.py [--config pipeline.json] [--etapes statistiques rapport] [--forcer]
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from metriques import ecrire_metriques, instantane, reinitialiser, session
+
+Etape = namedtuple('Etape', ['nom', 'fonction', 'entrees', 'sorties', 'parametres'])
+
+REPERTOIRE_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+CONFIGURATION = os.path.join(REPERTOIRE_SCRIPTS, 'pipeline.json')
+FICHIER_ETAT = 'etat_pipeline.json'
+
+TAILLE_BLOC = 1 << 20
+
+# Étapes qui lisent ou complètent le modèle TF-IDF persistant
+ETAPES_TFIDF = ('statistiques', 'similarite', 'rapport')
+
+
+def charger_configuration(chemin=CONFIGURATION):
+    """
+    Lire la configuration de la chaîne et résoudre ses chemins.
+
+    Args:
+        chemin (str, optional): Fichier de configuration JSON.
+
+    Returns:
+        dict: Configuration, chemins rendus absolus par rapport au fichier.
+    """
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        configuration = json.load(fichier)
+    repertoire = os.path.dirname(os.path.abspath(chemin))
+    configuration['chemins'] = {
+        nom: os.path.normpath(os.path.join(repertoire, valeur)) if valeur else valeur
+        for nom, valeur in configuration['chemins'].items()
+    }
+    configuration.setdefault('etapes', {})
+    configuration.setdefault('desactivees', [])
+    configuration.setdefault('mode_tfidf', 'vocabulaire')
+    return configuration
+
+
+def modules_locaux(noms, repertoire=REPERTOIRE_SCRIPTS):
+    """
+    Trouver les fichiers de modules locaux et de tous ceux qu'ils importent, même indirectement.
+
+    Les imports sont lus dans le source des modules, y compris ceux faits dans les
+    fonctions ; seuls les modules du répertoire sont suivis.
+
+    Args:
+        noms (iterable): Modules de départ, sans l'extension .py.
+        repertoire (str, optional): Répertoire des modules. Par défaut celui des scripts.
+
+    Returns:
+        list: Chemins des fichiers .py, triés ; ceux des modules de départ y figurent
+        même s'ils n'existent pas.
+    """
+    fichiers = {os.path.join(repertoire, f'{nom}.py') for nom in noms}
+    vus, a_visiter = set(), list(noms)
+    while a_visiter:
+        nom = a_visiter.pop()
+        chemin = os.path.join(repertoire, f'{nom}.py')
+        if nom in vus or not os.path.exists(chemin):
+            continue
+        vus.add(nom)
+        fichiers.add(chemin)
+        with open(chemin, 'r', encoding='utf-8') as fichier:
+            arbre = ast.parse(fichier.read(), chemin)
+        for noeud in ast.walk(arbre):
+            if isinstance(noeud, ast.Import):
+                a_visiter.extend(alias.name.split('.')[0] for alias in noeud.names)
+            elif isinstance(noeud, ast.ImportFrom) and noeud.level == 0 and noeud.module:
+                a_visiter.append(noeud.module.split('.')[0])
+    return sorted(fichiers)
+
+
+def _modele_tfidf(chemins, parametres):
+    from modele_tfidf import ModeleTfidf
+
+    # Un répertoire par mode : un modèle existant ne change pas de mode
+    mode = parametres.get('mode_tfidf', 'vocabulaire')
+    return ModeleTfidf(os.path.join(chemins['cache'], 'tfidf' if mode == 'vocabulaire' else f'tfidf_{mode}'), mode)
+
+
+def etape_scraping(chemins, parametres):
+    """Scraper les articles des pages de rubrique."""
+    from scrap_data import principal
+
+    return principal(chemins['urls'], chemins['scrape'], repertoire_cache=os.path.join(chemins['cache'], 'html'),
+              fichier_etat=os.path.join(chemins['cache'], 'etat_crawl.sqlite'),
+              fichier_doublons=os.path.join(chemins['cache'], 'quasi_doublons.sqlite'), **parametres)
+
+
+def etape_chargement(chemins, parametres):
+    """Convertir le corpus scrapé en CSV et, si un chemin est configuré, en Parquet."""
+    from data_loading import convertir_en_csv, convertir_en_parquet
+
+    df = convertir_en_csv(chemins['scrape'], chemins['csv'])
+    if chemins.get('parquet'):
+        convertir_en_parquet(chemins['scrape'], chemins['parquet'])
+    return len(df)
+
+
+def etape_decoupage(chemins, parametres):
+    """Découper le corpus en ensembles train, dev et test, après en avoir retiré les quasi-doublons."""
+    from data_loading import (
+        charger_donnees_scrapees,
+        numeroter_lots,
+        rubrique_depuis_url,
+        sauvegarder_splits,
+        split_dataset_hash,
+    )
+    from quasi_doublons import SEUIL, IndexQuasiDoublons, dedoublonner, dedoublonner_dataframe
+
+    seuil = parametres.get('seuil_doublons', SEUIL)
+    if parametres.get('methode', 'aleatoire') == 'hash':
+        from corpus_jsonl import lire_par_lots
+
+        lots = numeroter_lots(lire_par_lots(chemins['scrape']))
+        if parametres.get('dedoublonner'):
+            lots = dedoublonner(lots, IndexQuasiDoublons(seuil=seuil), cle='url')
+        groupe = rubrique_depuis_url if parametres.get('grouper_par_rubrique') else None
+        ecrits = split_dataset_hash(lots, chemins['splits'], groupe=groupe,
+                                    incremental=parametres.get('incremental', False))
+        return sum(ecrits.values())
+    data = charger_donnees_scrapees(chemins['scrape'])
+    if parametres.get('dedoublonner'):
+        data = dedoublonner_dataframe(data, seuil)
+    return sum(len(ensemble) for ensemble in sauvegarder_splits(data, chemins['splits']))
+
+
+def etape_statistiques(chemins, parametres):
+    """Calculer les statistiques par article, en complétant le modèle TF-IDF persistant."""
+    from corpus_jsonl import charger_dataframe
+    from statistiques_texte import COLONNES_STATISTIQUES, calculer_statistiques
+
+    data = charger_dataframe(chemins['scrape'])
+    modele_tfidf = _modele_tfidf(chemins, parametres)
+    calculer_statistiques(data, modele=modele_tfidf)
+    modele_tfidf.fermer()
+    data[['id'] + COLONNES_STATISTIQUES].to_csv(chemins['statistiques'], index=False)
+    return len(data)
+
+
+def etape_similarite(chemins, parametres):
+    """Calculer la similarité cosine TF-IDF de chaque article et de sa description."""
+    from corpus_jsonl import charger_dataframe
+    from statistiques_texte import relire_statistiques, similarite_cosine_appariee
+
+    # Les comptes sont relus du modèle TF-IDF, complété par l'étape statistiques
+    data = charger_dataframe(chemins['scrape'])
+    modele_tfidf = _modele_tfidf(chemins, parametres)
+    articles, descriptions = relire_statistiques(data, modele_tfidf).tfidf()
+    modele_tfidf.fermer()
+    data['cosine_similarity'] = similarite_cosine_appariee(articles, descriptions)
+    data[['id', 'cosine_similarity']].to_csv(chemins['similarites'], index=False)
+    return len(data)
+
+
+def etape_phrases(chemins, parametres):
+    """Calculer la longueur moyenne des phrases par article et tracer leur distribution."""
+    import pandas as pd
+
+    from cache_docs import CacheDocs
+    from rapport_figures import Figure, figure_longueurs_phrases, rendre_figures
+    from test_de_significativite import load_spacy_model, sentence_lengths, write_sentence_lengths
+
+    # Sans modèle SpaCy, la segmentation se fait par expressions régulières
+    nlp = load_spacy_model(parametres.get('segmenteur', 'senter')) if parametres.get('moteur', 'spacy') == 'spacy' else None
+    cache = CacheDocs(os.path.join(chemins['cache'], 'docs')) if nlp is not None and parametres.get('cache', True) else None
+    data = pd.read_csv(chemins['csv'])
+    os.makedirs(os.path.dirname(chemins['longueurs_phrases']), exist_ok=True)
+    write_sentence_lengths(
+        sentence_lengths(data, nlp, parametres.get('batch_size', 64), parametres.get('n_process', 1), cache),
+        chemins['longueurs_phrases'],
+    )
+    if cache is not None:
+        # Tout le corpus a été lu : les textes qui n'y sont plus quittent le cache
+        cache.collecter()
+        cache.fermer()
+
+    longueurs = pd.read_csv(chemins['longueurs_phrases'])["Average Sentence Length"].to_numpy()
+    rendre_figures([Figure('avg_sentence_lengths_distribution', figure_longueurs_phrases, {'longueurs': longueurs})],
+                   chemins['images'], dpi=300)
+    return len(data)
+
+
+def etape_rapport(chemins, parametres):
+    """Assembler le corpus analysé, rendre les figures et évaluer les seuils de similarité."""
+    import pandas as pd
+
+    from corpus_jsonl import charger_dataframe
+    from data_visualisation import charger_stop_words, produire_rapport, termes_frequents_communs
+    from statistiques_texte import COLONNES_STATISTIQUES, relire_statistiques
+
+    data = charger_dataframe(chemins['scrape'])
+    statistiques = pd.read_csv(chemins['statistiques'], dtype={'id': str}, float_precision='round_trip')
+    similarites = pd.read_csv(chemins['similarites'], dtype={'id': str}, float_precision='round_trip')
+    identifiants = data['id'].astype(str).to_numpy()
+    if not (len(statistiques) == len(similarites) == len(data)
+            and (statistiques['id'].to_numpy() == identifiants).all()
+            and (similarites['id'].to_numpy() == identifiants).all()):
+        raise ValueError("Les statistiques et les similarités ne correspondent pas au corpus.")
+
+    # Les colonnes des étapes statistiques et similarité sont réutilisées telles quelles ;
+    # seuls les comptes de termes des figures sont relus du modèle TF-IDF
+    for colonne in COLONNES_STATISTIQUES:
+        data[colonne] = statistiques[colonne].to_numpy()
+    data['cosine_similarity'] = similarites['cosine_similarity'].to_numpy()
+    modele_tfidf = _modele_tfidf(chemins, parametres)
+    resultat = relire_statistiques(data, modele_tfidf)
+    modele_tfidf.fermer()
+
+    top_words = termes_frequents_communs(resultat, charger_stop_words(), parametres.get('top_n', 20))
+    produire_rapport(resultat, top_words, chemins['analyse'], chemins['figures'],
+                     max_workers=parametres.get('max_workers'), max_points=parametres.get('max_points', 20000),
+                     seuil=parametres.get('seuil', 0.5), bootstrap=parametres.get('bootstrap', 1000),
+                     fichier_courbe=chemins.get('courbe_seuils'))
+    return len(data)
+
+
+def declarer_etapes(configuration):
+    """
+    Déclarer les étapes de la chaîne, avec leurs entrées et leurs sorties.
+
+    Les modules qui implémentent une étape font partie de ses entrées, avec tous les
+    modules locaux qu'ils importent, même indirectement (modules_locaux) : modifier
+    n'importe quel code exécuté par l'étape la relance.
+
+    Args:
+        configuration (dict): Configuration chargée par charger_configuration.
+
+    Returns:
+        list: Étapes, dans l'ordre de la chaîne.
+    """
+    chemins = configuration['chemins']
+    parametres = configuration['etapes']
+    # Le mode du modèle TF-IDF est commun aux étapes qui le partagent
+    for nom in ETAPES_TFIDF:
+        parametres[nom] = dict(parametres.get(nom, {}), mode_tfidf=configuration.get('mode_tfidf', 'vocabulaire'))
+    splits = [os.path.join(chemins['splits'], f'{nom}_set.csv') for nom in ('train', 'test', 'dev')]
+    # Modules importés par chaque étape
+    modules = {
+        'scraping': ['scrap_data'],
+        'chargement': ['data_loading'],
+        'decoupage': ['data_loading', 'corpus_jsonl', 'quasi_doublons'],
+        'statistiques': ['corpus_jsonl', 'modele_tfidf', 'statistiques_texte'],
+        'similarite': ['corpus_jsonl', 'modele_tfidf', 'statistiques_texte'],
+        'phrases': ['cache_docs', 'rapport_figures', 'test_de_significativite'],
+        'rapport': ['data_visualisation', 'modele_tfidf', 'statistiques_texte'],
+    }
+    declarations = [
+        ('scraping', etape_scraping, [chemins['urls']], [chemins['scrape']]),
+        ('chargement', etape_chargement, [chemins['scrape']],
+         [chemins['csv']] + ([chemins['parquet']] if chemins.get('parquet') else [])),
+        ('decoupage', etape_decoupage, [chemins['scrape']], splits),
+        ('statistiques', etape_statistiques, [chemins['scrape']], [chemins['statistiques']]),
+        # Passer après les statistiques évite d'écrire à deux dans le modèle TF-IDF
+        ('similarite', etape_similarite, [chemins['scrape'], chemins['statistiques']], [chemins['similarites']]),
+        ('phrases', etape_phrases, [chemins['csv']],
+         [chemins['longueurs_phrases'], os.path.join(chemins['images'], 'avg_sentence_lengths_distribution.png')]),
+        ('rapport', etape_rapport, [chemins['scrape'], chemins['statistiques'], chemins['similarites']],
+         [chemins['analyse'], os.path.join(chemins['figures'], '.empreintes_figures.json')]
+         + ([chemins['courbe_seuils']] if chemins.get('courbe_seuils') else [])),
+    ]
+    return [Etape(nom, fonction, entrees + modules_locaux(modules[nom]), sorties, parametres.get(nom, {}))
+            for nom, fonction, entrees, sorties in declarations]
+
+
+def empreinte_fichier(chemin, connues=None):
+    """
+    Calculer l'empreinte du contenu d'un fichier, lu par blocs.
+
+    Args:
+        chemin (str): Fichier.
+        connues (dict, optional): Empreintes déjà calculées, par chemin, avec la taille
+            et la date de modification du fichier ; un fichier inchangé n'est pas relu.
+
+    Returns:
+        str: Empreinte BLAKE2b en hexadécimal.
+    """
+    infos = os.stat(chemin)
+    signature = [infos.st_size, infos.st_mtime_ns]
+    if connues is not None and connues.get(chemin, [None])[:2] == signature:
+        return connues[chemin][2]
+    empreinte = hashlib.blake2b(digest_size=16)
+    with open(chemin, 'rb') as fichier:
+        for bloc in iter(lambda: fichier.read(TAILLE_BLOC), b''):
+            empreinte.update(bloc)
+    if connues is not None:
+        connues[chemin] = signature + [empreinte.hexdigest()]
+    return empreinte.hexdigest()
+
+
+def empreinte_etape(etape, connues=None):
+    """
+    Calculer l'empreinte d'une étape : nom, paramètres et contenu de ses entrées.
+
+    Args:
+        etape (Etape): Étape.
+        connues (dict, optional): Empreintes de fichiers déjà calculées.
+
+    Returns:
+        str: Empreinte BLAKE2b en hexadécimal.
+
+    Raises:
+        FileNotFoundError: Si une entrée de l'étape n'existe pas.
+    """
+    empreinte = hashlib.blake2b(digest_size=16)
+    empreinte.update(etape.nom.encode('utf-8'))
+    empreinte.update(json.dumps(etape.parametres, sort_keys=True).encode('utf-8'))
+    for entree in etape.entrees:
+        if not os.path.exists(entree):
+            raise FileNotFoundError(f"Entrée manquante pour l'étape {etape.nom} : {entree}")
+        empreinte.update(entree.encode('utf-8'))
+        empreinte.update(empreinte_fichier(entree, connues).encode('utf-8'))
+    return empreinte.hexdigest()
+
+
+def _lire_etat(chemin):
+    if not os.path.exists(chemin):
+        return {'etapes': {}, 'fichiers': {}}
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        return json.load(fichier)
+
+
+def _ecrire_etat(etat, chemin):
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    chemin_temporaire = chemin + '.tmp'
+    with open(chemin_temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(etat, fichier, ensure_ascii=False, indent=4)
+    os.replace(chemin_temporaire, chemin)
+
+
+def dependances(etapes):
+    """
+    Relier chaque étape aux étapes qui produisent ses entrées.
+
+    Args:
+        etapes (list): Étapes de la chaîne.
+
+    Returns:
+        dict: Noms des étapes dont dépend chaque étape.
+    """
+    producteurs = {sortie: etape.nom for etape in etapes for sortie in etape.sorties}
+    return {
+        etape.nom: {producteurs[entree] for entree in etape.entrees
+                    if entree in producteurs and producteurs[entree] != etape.nom}
+        for etape in etapes
+    }
+
+
+def _executer_etape(nom, fonction, chemins, parametres, profil=None):
+    # Dans le processus de l'étape : ses seules mesures, renvoyées au processus principal
+    reinitialiser()
+    with session(nom, profil=profil) as mesure:
+        mesure.elements = fonction(chemins, parametres) or 0
+    return instantane()
+
+
+def executer(etapes, chemins, chemin_etat, max_workers=None, forcer=(), mesures=None, repertoire_profils=None):
+    """
+    Exécuter les étapes dans l'ordre de leurs dépendances, en parallèle quand elles
+    sont indépendantes, en sautant celles dont l'empreinte n'a pas changé.
+
+    Une étape en échec interrompt les étapes qui en dépendent, pas les autres.
+
+    Args:
+        etapes (list): Étapes à exécuter ; les entrées produites par une étape absente
+            de la liste doivent déjà exister.
+        chemins (dict): Chemins de la configuration, passés à chaque étape.
+        chemin_etat (str): Fichier JSON des empreintes des étapes et des fichiers.
+        max_workers (int, optional): Nombre de processus. Par défaut un par cœur.
+        forcer (iterable, optional): Noms des étapes à relancer quelle que soit leur empreinte.
+        mesures (dict, optional): Complété, pour chaque étape, de son état et des mesures
+            de metriques recueillies dans son processus.
+        repertoire_profils (str, optional): Répertoire où écrire le profil cProfile de
+            chaque étape exécutée (<étape>.prof). Par défaut aucun profil.
+
+    Returns:
+        dict: Pour chaque étape, 'exécutée', 'inchangée', 'échec' ou 'abandonnée'.
+    """
+    etat = _lire_etat(chemin_etat)
+    forcer = set(forcer)
+    graphe = dependances(etapes)
+    restantes = {etape.nom: etape for etape in etapes}
+    etats, en_cours = {}, {}
+    mesures = {} if mesures is None else mesures
+
+    # Un processus neuf par étape : pic de mémoire et compteurs propres à l'étape
+    with ProcessPoolExecutor(max_workers=max_workers, max_tasks_per_child=1) as executeur:
+        while restantes or en_cours:
+            avancement = len(restantes)
+            for nom, etape in list(restantes.items()):
+                if any(etats.get(dependance) in ('échec', 'abandonnée') for dependance in graphe[nom]):
+                    del restantes[nom]
+                    etats[nom] = 'abandonnée'
+                    print(f"[{nom}] abandonnée")
+                    continue
+                if not all(etats.get(dependance) in ('exécutée', 'inchangée') for dependance in graphe[nom]):
+                    continue
+                del restantes[nom]
+                try:
+                    empreinte = empreinte_etape(etape, etat['fichiers'])
+                except FileNotFoundError as e:
+                    etats[nom] = 'échec'
+                    print(f"[{nom}] échec : {e}")
+                    continue
+                if (nom not in forcer and etat['etapes'].get(nom) == empreinte
+                        and all(os.path.exists(sortie) for sortie in etape.sorties)):
+                    etats[nom] = 'inchangée'
+                    print(f"[{nom}] inchangée")
+                    continue
+                print(f"[{nom}] lancée")
+                profil = os.path.join(repertoire_profils, f'{nom}.prof') if repertoire_profils else None
+                en_cours[executeur.submit(_executer_etape, nom, etape.fonction, chemins, etape.parametres,
+                                          profil)] = (nom, empreinte)
+
+            if not en_cours:
+                if len(restantes) == avancement:
+                    raise RuntimeError(f"Dépendances circulaires entre : {', '.join(restantes)}")
+                # Une étape vient d'être sautée : ses dépendantes sont peut-être prêtes
+                continue
+            terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in terminees:
+                nom, empreinte = en_cours.pop(futur)
+                try:
+                    mesures[nom] = futur.result()
+                except Exception as e:
+                    etats[nom] = 'échec'
+                    etat['etapes'].pop(nom, None)
+                    print(f"[{nom}] échec : {e!r}")
+                else:
+                    etats[nom] = 'exécutée'
+                    etat['etapes'][nom] = empreinte
+                    print(f"[{nom}] terminée")
+                _ecrire_etat(etat, chemin_etat)
+    _ecrire_etat(etat, chemin_etat)
+    for nom, etat_etape in etats.items():
+        mesures.setdefault(nom, {})['etat'] = etat_etape
+    return etats
+
+
+def selectionner(etapes, noms, desactivees=()):
+    """
+    Choisir les étapes à exécuter.
+
+    Args:
+        etapes (list): Étapes de la chaîne.
+        noms (list, optional): Étapes demandées ; celles dont elles dépendent, même
+            indirectement, sont ajoutées. Par défaut toutes les étapes.
+        desactivees (iterable, optional): Étapes écartées quand elles ne sont pas
+            demandées explicitement ; leurs sorties servent alors d'entrées telles quelles.
+
+    Returns:
+        list: Étapes retenues, dans l'ordre de la chaîne.
+
+    Raises:
+        ValueError: Si une étape demandée n'existe pas.
+    """
+    connues = {etape.nom for etape in etapes}
+    inconnues = set(noms or ()) - connues
+    if inconnues:
+        raise ValueError(f"Étapes inconnues : {', '.join(sorted(inconnues))}")
+    if not noms:
+        return [etape for etape in etapes if etape.nom not in desactivees]
+
+    graphe = dependances(etapes)
+    retenues, a_visiter = set(), list(noms)
+    while a_visiter:
+        nom = a_visiter.pop()
+        if nom not in retenues:
+            retenues.add(nom)
+            a_visiter.extend(dependance for dependance in graphe[nom]
+                             if dependance not in desactivees or dependance in noms)
+    return [etape for etape in etapes if etape.nom in retenues]
+
+
+def main(argv=None):
+    parseur = argparse.ArgumentParser(description="Exécuter la chaîne de traitement du corpus.")
+    parseur.add_argument('--config', default=CONFIGURATION, help="Fichier de configuration JSON")
+    parseur.add_argument('--etapes', nargs='+', help="Étapes à exécuter, avec celles dont elles dépendent")
+    parseur.add_argument('--forcer', action='store_true', help="Relancer les étapes demandées (toutes par défaut)")
+    parseur.add_argument('--max-workers', type=int, help="Nombre maximal d'étapes simultanées")
+    parseur.add_argument('--lister', action='store_true', help="Lister les étapes et leurs dépendances")
+    parseur.add_argument('--metriques', help="Fichier JSON des mesures de l'exécution. Par défaut "
+                                             "pipeline-<date>.json dans le répertoire metriques du cache")
+    parseur.add_argument('--profil', help="Répertoire où écrire un profil cProfile par étape exécutée")
+    args = parseur.parse_args(argv)
+
+    configuration = charger_configuration(args.config)
+    etapes = declarer_etapes(configuration)
+    if args.lister:
+        graphe = dependances(etapes)
+        for etape in etapes:
+            desactivee = ' (désactivée)' if etape.nom in configuration['desactivees'] else ''
+            print(f"{etape.nom}{desactivee} <- {', '.join(sorted(graphe[etape.nom])) or '-'}")
+        return 0
+
+    try:
+        etapes = selectionner(etapes, args.etapes, configuration['desactivees'])
+    except ValueError as e:
+        parseur.error(str(e))
+    forcer = [etape.nom for etape in etapes if not args.etapes or etape.nom in args.etapes] if args.forcer else []
+    chemins = configuration['chemins']
+    metriques = args.metriques or os.path.join(chemins['cache'], 'metriques',
+                                               f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    mesures = {}
+    with session('pipeline'):
+        etats = executer(etapes, chemins, os.path.join(chemins['cache'], FICHIER_ETAT),
+                         args.max_workers or configuration.get('max_workers'), forcer, mesures, args.profil)
+    ecrire_metriques(metriques, dict(instantane(), etapes=mesures), script='pipeline', arguments=sys.argv[1:])
+    print(f"Mesures enregistrées dans {metriques}")
+    return 1 if any(etat in ('échec', 'abandonnée') for etat in etats.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
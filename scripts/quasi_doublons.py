@@ -0,0 +1,399 @@
+"""
+Module de détection des articles quasi dupliqués par MinHash et LSH.
+
+Le crawl parcourt des pages de rubrique qui se recoupent : une même dépêche
+reprise par plusieurs rubriques, ou un article mis à jour sous une autre URL,
+se retrouve plusieurs fois dans le corpus et, après le découpage, de part et
+d'autre des ensembles train, dev et test.
+
+Chaque texte est réduit à l'ensemble de ses n-grammes de mots (shingles), dont
+la signature MinHash estime la similarité de Jaccard avec celle d'un autre
+texte. Les signatures sont découpées en bandes (LSH) : deux textes ne sont
+comparés que s'ils ont une bande identique, ce qui trouve les quasi-doublons en
+un temps à peu près linéaire dans la taille du corpus, sans comparer tous les
+couples. Les candidats sont confirmés par la similarité estimée sur toute la
+signature.
+
+L'index se remplit au fil de l'eau : dedoublonner() filtre un corpus lu par
+lots avant le découpage, et le scraper consulte un index persistant (fichier
+SQLite des signatures, rechargé en mémoire à l'ouverture) pour ne pas enregistrer
+un article déjà connu sous une autre URL.
+
+Usage :
+    python quasi_doublons.py ../data/clean/donnees_scrapees.json --sortie dedoublonne.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import zlib
+
+import numpy as np
+
+from metriques import compter, instantane, instrumenter
+
+SEUIL = 0.8
+NUM_PERM = 128
+TAILLE_SHINGLE = 5
+
+MOTIF_MOT = re.compile(r'\w+')
+
+# Intégration par trapèzes : np.trapezoid depuis NumPy 2.0, np.trapz auparavant
+_trapeze = getattr(np, 'trapezoid', None) or np.trapz
+
+# Multiplicateur des n-grammes : le hachage d'un shingle est un polynôme des hachages de ses mots
+_MULTIPLICATEUR = np.uint64(0x9E3779B97F4A7C15)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    rang INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parametres (
+    cle TEXT PRIMARY KEY,
+    valeur TEXT NOT NULL
+);
+"""
+
+
+def parametres_lsh(num_perm=NUM_PERM, seuil=SEUIL, poids_faux_positifs=0.5):
+    """
+    Choisir le nombre de bandes et de lignes par bande pour un seuil de similarité.
+
+    Le couple retenu minimise la somme pondérée des probabilités de faux positifs
+    (couples sous le seuil devenus candidats) et de faux négatifs (couples au-dessus
+    du seuil jamais candidats), intégrées sur la similarité.
+
+    Args:
+        num_perm (int, optional): Nombre de permutations de la signature. Par défaut à 128.
+        seuil (float, optional): Similarité de Jaccard des quasi-doublons. Par défaut à 0,8.
+        poids_faux_positifs (float, optional): Poids des faux positifs, entre 0 et 1.
+
+    Returns:
+        tuple: Nombre de bandes et nombre de lignes par bande.
+    """
+    similarites_basses = np.linspace(0, seuil, 200)
+    similarites_hautes = np.linspace(seuil, 1, 200)
+    meilleur, meilleure_erreur = None, None
+    for lignes in range(1, num_perm + 1):
+        bandes = num_perm // lignes
+        faux_positifs = _trapeze(1 - (1 - similarites_basses ** lignes) ** bandes, similarites_basses)
+        faux_negatifs = _trapeze((1 - similarites_hautes ** lignes) ** bandes, similarites_hautes)
+        erreur = poids_faux_positifs * faux_positifs + (1 - poids_faux_positifs) * faux_negatifs
+        if meilleure_erreur is None or erreur < meilleure_erreur:
+            meilleur, meilleure_erreur = (bandes, lignes), erreur
+    return meilleur
+
+
+def hachages_shingles(texte, taille_shingle=TAILLE_SHINGLE):
+    """
+    Hacher les n-grammes de mots d'un texte, après passage en minuscules.
+
+    Un texte plus court qu'un shingle forme un seul shingle. Les hachages ne
+    dépendent que du texte, d'une exécution et d'une machine à l'autre.
+
+    Args:
+        texte (str): Texte.
+        taille_shingle (int, optional): Nombre de mots par shingle. Par défaut à 5.
+
+    Returns:
+        numpy.ndarray: Hachages 64 bits des shingles (vide pour un texte sans mot).
+    """
+    mots = MOTIF_MOT.findall(texte.lower())
+    hachages = np.fromiter((zlib.crc32(mot.encode('utf-8')) for mot in mots), dtype=np.uint64, count=len(mots))
+    taille = min(taille_shingle, len(hachages))
+    if taille == 0:
+        return hachages
+    n = len(hachages) - taille + 1
+    shingles = hachages[:n].copy()
+    for decalage in range(1, taille):
+        # Débordements voulus : le calcul se fait modulo 2**64
+        shingles = shingles * _MULTIPLICATEUR + hachages[decalage:decalage + n]
+    return shingles
+
+
+class IndexQuasiDoublons:
+    """
+    Index LSH de signatures MinHash, en mémoire, éventuellement persistant.
+    """
+
+    def __init__(self, chemin=':memory:', seuil=SEUIL, num_perm=NUM_PERM, taille_shingle=TAILLE_SHINGLE,
+                 graine=1, intervalle_checkpoint=50):
+        """
+        Args:
+            chemin (str, optional): Fichier SQLite des signatures. Par défaut en mémoire,
+                c'est-à-dire sans persistance.
+            seuil (float, optional): Similarité de Jaccard estimée à partir de laquelle
+                deux textes sont des quasi-doublons. Par défaut à 0,8.
+            num_perm (int, optional): Nombre de permutations de la signature. Par défaut à 128.
+            taille_shingle (int, optional): Nombre de mots par shingle. Par défaut à 5.
+            graine (int, optional): Graine des permutations. Par défaut à 1.
+            intervalle_checkpoint (int, optional): Nombre d'ajouts entre deux validations
+                sur disque. Par défaut à 50.
+
+        Raises:
+            ValueError: Si le fichier existant a été construit avec d'autres paramètres.
+        """
+        self.chemin = chemin
+        self.seuil = seuil
+        self.num_perm = num_perm
+        self.taille_shingle = taille_shingle
+        self.intervalle_checkpoint = intervalle_checkpoint
+        self.bandes, self.lignes = parametres_lsh(num_perm, seuil)
+        generateur = np.random.default_rng(graine)
+        # Hachage multiplier-décaler : ((a * x + b) mod 2**64) >> 32, a impair
+        self._a = generateur.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self._b = generateur.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False)
+
+        if chemin != ':memory:':
+            repertoire = os.path.dirname(chemin)
+            if repertoire:
+                os.makedirs(repertoire, exist_ok=True)
+        self._connexion = sqlite3.connect(chemin)
+        self._connexion.executescript(SCHEMA)
+        self._modifications = 0
+        self._verifier_parametres({'num_perm': num_perm, 'taille_shingle': taille_shingle, 'graine': graine})
+
+        self._reinitialiser()
+        for identifiant, signature in self._connexion.execute('SELECT id, signature FROM signatures ORDER BY rang'):
+            self._indexer(identifiant, np.frombuffer(signature, dtype=np.uint32))
+
+    def _verifier_parametres(self, parametres):
+        connus = dict(self._connexion.execute('SELECT cle, valeur FROM parametres'))
+        for cle, valeur in parametres.items():
+            if cle not in connus:
+                self._connexion.execute('INSERT INTO parametres (cle, valeur) VALUES (?, ?)', (cle, str(valeur)))
+            elif connus[cle] != str(valeur):
+                raise ValueError(f"Index {self.chemin} construit avec {cle}={connus[cle]}, pas {valeur}.")
+        self._connexion.commit()
+
+    def _reinitialiser(self):
+        self._ids = []
+        self._rangs = {}
+        self._signatures = np.empty((0, self.num_perm), dtype=np.uint32)
+        self._tables = [{} for _ in range(self.bandes)]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, identifiant):
+        return identifiant in self._rangs
+
+    def signature(self, texte):
+        """
+        Calculer la signature MinHash d'un texte.
+
+        Args:
+            texte (str): Texte.
+
+        Returns:
+            numpy.ndarray or None: Signature (num_perm entiers 32 bits), None pour un texte sans mot.
+        """
+        shingles = hachages_shingles(texte, self.taille_shingle)
+        if len(shingles) == 0:
+            return None
+        # Par blocs de shingles, pour borner la matrice permutations × shingles
+        minimums = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for debut in range(0, len(shingles), 4096):
+            bloc = shingles[debut:debut + 4096]
+            np.minimum(minimums, ((self._a[:, None] * bloc[None, :] + self._b[:, None]) >> np.uint64(32)).min(axis=1),
+                       out=minimums)
+        return minimums.astype(np.uint32)
+
+    def _cles(self, signature):
+        return [signature[bande * self.lignes:(bande + 1) * self.lignes].tobytes() for bande in range(self.bandes)]
+
+    def _indexer(self, identifiant, signature):
+        rang = len(self._ids)
+        if rang == len(self._signatures):
+            capacite = max(1024, 2 * rang)
+            signatures = np.empty((capacite, self.num_perm), dtype=np.uint32)
+            signatures[:rang] = self._signatures[:rang]
+            self._signatures = signatures
+        self._signatures[rang] = signature
+        self._ids.append(identifiant)
+        self._rangs[identifiant] = rang
+        for table, cle in zip(self._tables, self._cles(signature)):
+            table.setdefault(cle, []).append(rang)
+
+    def chercher(self, texte=None, signature=None, exclure=None):
+        """
+        Chercher les textes indexés quasi identiques à un texte.
+
+        Args:
+            texte (str, optional): Texte à chercher.
+            signature (numpy.ndarray, optional): Sa signature, si elle est déjà calculée.
+            exclure (str, optional): Identifiant à écarter des résultats (le texte lui-même).
+
+        Returns:
+            list: Couples (identifiant, similarité estimée), de la plus similaire à la
+            moins similaire, au-dessus du seuil.
+        """
+        if signature is None:
+            signature = self.signature(texte)
+        if signature is None or not self._ids:
+            return []
+        candidats = set()
+        for table, cle in zip(self._tables, self._cles(signature)):
+            candidats.update(table.get(cle, ()))
+        if not candidats:
+            return []
+        rangs = np.fromiter(candidats, dtype=np.int64, count=len(candidats))
+        similarites = (self._signatures[rangs] == signature).mean(axis=1)
+        retenus = np.flatnonzero(similarites >= self.seuil)
+        resultats = [(self._ids[rangs[indice]], float(similarites[indice])) for indice in retenus
+                     if self._ids[rangs[indice]] != exclure]
+        return sorted(resultats, key=lambda resultat: (-resultat[1], self._rangs[resultat[0]]))
+
+    def doublon(self, texte=None, signature=None, exclure=None):
+        """
+        Renvoyer le texte indexé le plus proche d'un texte, s'il en est un quasi-doublon.
+
+        Args:
+            texte (str, optional): Texte à chercher.
+            signature (numpy.ndarray, optional): Sa signature, si elle est déjà calculée.
+            exclure (str, optional): Identifiant à écarter des résultats.
+
+        Returns:
+            tuple or None: Identifiant et similarité estimée, None sans quasi-doublon.
+        """
+        resultats = self.chercher(texte, signature, exclure)
+        return resultats[0] if resultats else None
+
+    def ajouter(self, identifiant, texte=None, signature=None):
+        """
+        Ajouter un texte à l'index, s'il n'y est pas déjà sous cet identifiant.
+
+        Args:
+            identifiant (str): Identifiant du texte (URL de l'article).
+            texte (str, optional): Texte.
+            signature (numpy.ndarray, optional): Sa signature, si elle est déjà calculée.
+
+        Returns:
+            bool: True si le texte a été ajouté, False s'il était connu ou sans mot.
+        """
+        if identifiant in self._rangs:
+            return False
+        if signature is None:
+            signature = self.signature(texte)
+        if signature is None:
+            return False
+        self._indexer(identifiant, signature)
+        self._connexion.execute('INSERT INTO signatures (rang, id, signature) VALUES (?, ?, ?)',
+                                (len(self._ids) - 1, identifiant, signature.tobytes()))
+        self._modifications += 1
+        if self._modifications >= self.intervalle_checkpoint:
+            self.checkpoint()
+        return True
+
+    def vider(self):
+        """Oublier tous les textes indexés, en mémoire et sur disque."""
+        self._connexion.execute('DELETE FROM signatures')
+        self._connexion.commit()
+        self._modifications = 0
+        self._reinitialiser()
+
+    def checkpoint(self):
+        """Valider les signatures sur disque."""
+        self._connexion.commit()
+        self._modifications = 0
+
+    def fermer(self):
+        """Valider et fermer l'index."""
+        self.checkpoint()
+        self._connexion.close()
+
+
+@instrumenter()
+def dedoublonner(lots, index=None, colonne='article', cle='id', groupes=None):
+    """
+    Retirer d'un corpus lu par lots les articles quasi identiques à un article précédent.
+
+    Le premier article de chaque groupe de quasi-doublons est gardé ; une URL déjà
+    vue est aussi écartée, sans compter parmi les quasi-doublons ni figurer dans les
+    groupes. Les articles gardés sont ajoutés à l'index au fil de l'eau.
+
+    Args:
+        lots (iterable): Lots successifs d'articles (DataFrame), par exemple lire_par_lots(...).
+        index (IndexQuasiDoublons, optional): Index à consulter et compléter. Par défaut
+            un index en mémoire avec les paramètres par défaut.
+        colonne (str, optional): Colonne des textes comparés. Par défaut 'article'.
+        cle (str, optional): Colonne identifiant les articles. Par défaut 'id'.
+        groupes (dict, optional): Dictionnaire complété, pour chaque article gardé qui
+            a des quasi-doublons, de la liste de leurs identifiants (les URL répétées
+            n'y figurent pas).
+
+    Yields:
+        DataFrame: Lots d'articles sans les quasi-doublons.
+    """
+    index = index if index is not None else IndexQuasiDoublons()
+    for lot in lots:
+        gardes = np.ones(len(lot), dtype=bool)
+        repetes = 0
+        for position, (identifiant, texte) in enumerate(zip(lot[cle].astype(str), lot[colonne].fillna(''))):
+            if identifiant in index:
+                # Même URL qu'un article déjà gardé : pas un quasi-doublon
+                gardes[position] = False
+                repetes += 1
+                continue
+            signature = index.signature(texte)
+            trouve = index.doublon(signature=signature)
+            if trouve is None:
+                index.ajouter(identifiant, signature=signature)
+                continue
+            gardes[position] = False
+            if groupes is not None:
+                groupes.setdefault(trouve[0], []).append(identifiant)
+        compter('urls_repetees_retirees', repetes)
+        compter('quasi_doublons_retires', int((~gardes).sum()) - repetes)
+        yield lot[gardes]
+
+
+def dedoublonner_dataframe(df, seuil=SEUIL, colonne='article', cle='id'):
+    """
+    Retirer les quasi-doublons d'un corpus chargé en mémoire.
+
+    Args:
+        df (DataFrame): Corpus.
+        seuil (float, optional): Similarité de Jaccard des quasi-doublons. Par défaut à 0,8.
+        colonne (str, optional): Colonne des textes comparés. Par défaut 'article'.
+        cle (str, optional): Colonne identifiant les articles. Par défaut 'id'.
+
+    Returns:
+        DataFrame: Corpus sans les quasi-doublons, dans l'ordre d'origine.
+    """
+    return next(dedoublonner([df], IndexQuasiDoublons(seuil=seuil), colonne, cle))
+
+
+if __name__ == "__main__":
+    from corpus_jsonl import EcrivainJSONL, lire_par_lots
+
+    parseur = argparse.ArgumentParser(description="Trouver et retirer les articles quasi dupliqués d'un corpus.")
+    parseur.add_argument('corpus', help="Fichier de corpus JSON ou JSON Lines")
+    parseur.add_argument('--sortie', help="Fichier JSON Lines du corpus dédoublonné")
+    parseur.add_argument('--groupes', help="Fichier JSON des groupes de quasi-doublons")
+    parseur.add_argument('--seuil', type=float, default=SEUIL, help="Similarité de Jaccard des quasi-doublons")
+    parseur.add_argument('--colonne', default='article', help="Colonne des textes comparés")
+    args = parseur.parse_args()
+
+    groupes = {}
+    index = IndexQuasiDoublons(seuil=args.seuil)
+    sortie = EcrivainJSONL(args.sortie) if args.sortie else None
+    gardes = 0
+    for lot in dedoublonner(lire_par_lots(args.corpus), index, args.colonne, groupes=groupes):
+        gardes += len(lot)
+        if sortie is not None:
+            for article in lot.to_dict('records'):
+                sortie.ecrire(article)
+    if sortie is not None:
+        sortie.fermer()
+    retires = sum(len(doublons) for doublons in groupes.values())
+    repetees = instantane()['compteurs'].get('urls_repetees_retirees', 0)
+    print(f"{gardes} articles gardés, {retires} quasi-doublons retirés en {len(groupes)} groupes "
+          f"({index.bandes} bandes de {index.lignes} lignes), {repetees} URL répétées retirées")
+    if args.groupes:
+        with open(args.groupes, 'w', encoding='utf-8') as fichier:
+            json.dump(groupes, fichier, ensure_ascii=False, indent=4)
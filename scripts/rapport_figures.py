@@ -0,0 +1,401 @@
+"""
+Module de rendu des figures d'analyse du corpus.
+
+Chaque figure est décrite par une fonction de tracé et par les statistiques qu'elle
+représente (comptes, moyennes, vecteurs de valeurs), jamais par le corpus lui-même.
+En mode rapport, les figures sont rendues sans affichage (backend Agg) dans un pool
+de processus et enregistrées en PNG ; une figure dont les statistiques n'ont pas
+changé depuis le dernier rendu n'est pas redessinée. L'empreinte d'une figure couvre
+ses statistiques, le code de sa fonction de tracé et les paramètres du rendu
+(résolution, style, version de matplotlib) : modifier le tracé ou le rendu suffit
+à redessiner la figure. Les nuages de
+points sont sous-échantillonnés au-delà d'un nombre maximal de points, la
+courbe de Zipf est réduite à des rangs espacés logarithmiquement et la courbe
+précision-rappel à des seuils régulièrement espacés.
+"""
+
+import hashlib
+import inspect
+import json
+import marshal
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metriques import compter, instrumenter
+
+Figure = namedtuple('Figure', ['nom', 'fonction', 'donnees'])
+
+FICHIER_EMPREINTES = '.empreintes_figures.json'
+
+COULEUR_FOND = 'white'
+
+MAX_POINTS = 20000
+
+COULEURS_CATEGORIES = {'Grande différence': 'red', 'Similaire': 'green', 'Grande description': 'blue'}
+
+
+def sous_echantillonner(*colonnes, max_points=MAX_POINTS, graine=0):
+    """
+    Tirer au plus max_points lignes communes à plusieurs colonnes, de façon reproductible.
+
+    Args:
+        *colonnes (array-like): Colonnes de même longueur.
+        max_points (int, optional): Nombre maximal de points. Par défaut à 20000.
+        graine (int, optional): Graine du tirage. Par défaut à 0.
+
+    Returns:
+        tuple: Colonnes réduites (numpy.ndarray), dans l'ordre d'origine des lignes.
+    """
+    colonnes = tuple(np.asarray(colonne) for colonne in colonnes)
+    n = len(colonnes[0])
+    if n <= max_points:
+        return colonnes
+    indices = np.sort(np.random.default_rng(graine).choice(n, max_points, replace=False))
+    return tuple(colonne[indices] for colonne in colonnes)
+
+
+def _alimenter(empreinte, valeur):
+    if isinstance(valeur, dict):
+        empreinte.update(b'{')
+        for cle in sorted(valeur):
+            empreinte.update(repr(cle).encode('utf-8'))
+            _alimenter(empreinte, valeur[cle])
+        empreinte.update(b'}')
+    elif isinstance(valeur, (list, tuple)):
+        empreinte.update(b'[')
+        for element in valeur:
+            _alimenter(empreinte, element)
+        empreinte.update(b']')
+    elif isinstance(valeur, np.ndarray) and valeur.dtype != object:
+        empreinte.update(f'{valeur.dtype}{valeur.shape}'.encode('utf-8'))
+        empreinte.update(np.ascontiguousarray(valeur).tobytes())
+    elif isinstance(valeur, np.ndarray):
+        _alimenter(empreinte, valeur.tolist())
+    else:
+        empreinte.update(repr(valeur).encode('utf-8'))
+
+
+def code_fonction(fonction):
+    """
+    Lire le code d'une fonction de tracé, pour qu'une modification du tracé change l'empreinte.
+
+    Args:
+        fonction (callable): Fonction de tracé.
+
+    Returns:
+        bytes: Source de la fonction ou, à défaut (source introuvable), son bytecode sérialisé.
+    """
+    try:
+        return inspect.getsource(fonction).encode('utf-8')
+    except (OSError, TypeError):
+        return marshal.dumps(fonction.__code__)
+
+
+def parametres_rendu(dpi, style=None):
+    """
+    Rassembler les paramètres dont dépend l'image rendue, hors statistiques et tracé.
+
+    Args:
+        dpi (int): Résolution des PNG.
+        style (str, optional): Style matplotlib appliqué au rendu.
+
+    Returns:
+        dict: Résolution, style, couleur de fond et version de matplotlib.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        version_matplotlib = version('matplotlib')
+    except PackageNotFoundError:
+        version_matplotlib = None
+    return {'dpi': dpi, 'style': style, 'fond': COULEUR_FOND, 'matplotlib': version_matplotlib}
+
+
+def empreinte_figure(figure, parametres=None):
+    """
+    Calculer l'empreinte d'une figure : fonction de tracé, statistiques représentées
+    et paramètres du rendu.
+
+    Args:
+        figure (Figure): Figure à rendre.
+        parametres (dict, optional): Paramètres du rendu (voir parametres_rendu).
+
+    Returns:
+        str: Empreinte BLAKE2b en hexadécimal.
+    """
+    empreinte = hashlib.blake2b(digest_size=16)
+    empreinte.update(f'{figure.fonction.__module__}.{figure.fonction.__qualname__}'.encode('utf-8'))
+    empreinte.update(code_fonction(figure.fonction))
+    _alimenter(empreinte, figure.donnees)
+    _alimenter(empreinte, parametres or {})
+    return empreinte.hexdigest()
+
+
+def _rendre(fonction, donnees, chemin, dpi, style=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    with plt.style.context(style or {}):
+        fonction(**donnees)
+        plt.savefig(chemin, facecolor=COULEUR_FOND, dpi=dpi)
+    plt.close('all')
+    return chemin
+
+
+@instrumenter(elements=len)
+def rendre_figures(figures, repertoire='../figures', max_workers=None, forcer=False, dpi=100, style=None):
+    """
+    Rendre des figures en PNG sans affichage, en parallèle, en sautant celles inchangées.
+
+    Args:
+        figures (list): Figures à rendre.
+        repertoire (str, optional): Répertoire des PNG et de leurs empreintes.
+        max_workers (int, optional): Nombre de processus. Par défaut un par cœur.
+        forcer (bool, optional): Redessiner même les figures inchangées. Par défaut False.
+        dpi (int, optional): Résolution des PNG. Par défaut à 100.
+        style (str, optional): Style matplotlib (nom ou fichier .mplstyle) appliqué au
+            rendu. Par défaut le style courant.
+
+    Returns:
+        dict: Pour chaque figure, 'rendue' ou 'inchangée'.
+    """
+    os.makedirs(repertoire, exist_ok=True)
+    chemin_empreintes = os.path.join(repertoire, FICHIER_EMPREINTES)
+    empreintes = {}
+    if os.path.exists(chemin_empreintes):
+        with open(chemin_empreintes, 'r', encoding='utf-8') as fichier:
+            empreintes = json.load(fichier)
+
+    parametres = parametres_rendu(dpi, style)
+    etats, a_rendre = {}, []
+    for figure in figures:
+        chemin = os.path.join(repertoire, f'{figure.nom}.png')
+        empreinte = empreinte_figure(figure, parametres)
+        if not forcer and empreintes.get(figure.nom) == empreinte and os.path.exists(chemin):
+            etats[figure.nom] = 'inchangée'
+        else:
+            a_rendre.append((figure, chemin, empreinte))
+
+    if len(a_rendre) == 1:
+        figure, chemin, _ = a_rendre[0]
+        _rendre(figure.fonction, figure.donnees, chemin, dpi, style)
+    elif a_rendre:
+        with ProcessPoolExecutor(max_workers=max_workers or min(len(a_rendre), os.cpu_count() or 1)) as executeur:
+            travaux = [executeur.submit(_rendre, figure.fonction, figure.donnees, chemin, dpi, style)
+                       for figure, chemin, _ in a_rendre]
+            for travail in travaux:
+                travail.result()
+    for figure, _, empreinte in a_rendre:
+        empreintes[figure.nom] = empreinte
+        etats[figure.nom] = 'rendue'
+    compter('figures_rendues', len(a_rendre))
+    compter('figures_inchangees', len(figures) - len(a_rendre))
+
+    chemin_temporaire = chemin_empreintes + '.tmp'
+    with open(chemin_temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(empreintes, fichier, ensure_ascii=False, indent=4)
+    os.replace(chemin_temporaire, chemin_empreintes)
+    return etats
+
+
+def afficher_figures(figures):
+    """
+    Afficher les figures une à une dans des fenêtres interactives.
+
+    Args:
+        figures (list): Figures à afficher.
+    """
+    import matplotlib.pyplot as plt
+
+    for figure in figures:
+        figure.fonction(**figure.donnees)
+        plt.show()
+
+
+def figure_distribution_categories(categories, comptes):
+    """Distribution des articles par catégorie de différence de tokens."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    ax = plt.gca()
+    ax.bar(categories, comptes, width=1, color=[COULEURS_CATEGORIES[categorie] for categorie in categories],
+           edgecolor='black')
+    for p in ax.patches:
+        ax.annotate(f'{p.get_height():.0f}', (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='baseline')
+    plt.title('Distribution des articles par différence de tokens')
+    plt.xlabel('Catégorie')
+    plt.ylabel('Nombre d\'articles')
+
+
+def figure_moyennes_tokens(moyennes):
+    """Comparaison des moyennes de tokens entre articles et descriptions."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(8, 6))
+    categories = ['Articles', 'Descriptions']
+    sns.barplot(x=categories, y=moyennes, hue=categories, palette=['blue', 'orange'], legend=False)
+    for i, moyenne in enumerate(moyennes):
+        plt.text(i, moyenne + 10, f'{moyenne:.1f}', ha='center', va='bottom')
+    plt.title('Comparaison des moyennes de tokens entre articles et descriptions')
+    plt.xlabel('Catégorie')
+    plt.ylabel('Nombre moyen de tokens')
+    plt.ylim(0, max(moyennes) + 50)
+
+
+def figure_top_termes(termes_article, frequences_article, termes_description, frequences_description):
+    """Comparaison des termes les plus fréquents des articles et des descriptions."""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    df_top_words = pd.DataFrame({
+        'Article': termes_article,
+        'Article_Freq': frequences_article,
+        'Description': termes_description,
+        'Description_Freq': frequences_description,
+    })
+    plt.figure(figsize=(14, 8))
+
+    plt.subplot(1, 2, 1)
+    sns.barplot(x='Article_Freq', y='Article', data=df_top_words, palette='Blues_d', hue='Article', dodge=False, legend=False)
+    plt.title('Top termes dans les articles')
+    plt.xlabel('Fréquence')
+
+    plt.subplot(1, 2, 2)
+    sns.barplot(x='Description_Freq', y='Description', data=df_top_words, palette='Oranges_d', hue='Description', dodge=False, legend=False)
+    plt.title('Top termes dans les descriptions')
+    plt.xlabel('Fréquence')
+
+    plt.tight_layout()
+
+
+def figure_relation_longueurs(article_tokens, description_tokens):
+    """Relation entre les longueurs des articles et des descriptions."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 6))
+    plt.scatter(article_tokens, description_tokens, alpha=0.5)
+    plt.xlabel('Nombre de tokens des articles')
+    plt.ylabel('Nombre de tokens des descriptions')
+    plt.title('Relation entre les longueurs des articles et des descriptions')
+
+
+def figure_distribution_cosinus(similarites):
+    """Distribution des similarités cosines entre articles et descriptions."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(8, 6))
+    sns.histplot(similarites, kde=True, color='purple')
+    plt.title('Distribution des similarités cosines entre articles et descriptions')
+    plt.xlabel('Similarité Cosine')
+    plt.ylabel('Nombre d\'articles')
+
+
+def figure_cosinus_difference(differences, similarites):
+    """Similarité cosine en fonction de la différence de tokens."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 6))
+    plt.scatter(differences, similarites, alpha=0.5)
+    plt.xlabel('Différence de tokens')
+    plt.ylabel('Similarité Cosine')
+    plt.title('Similarité Cosine vs Différence de Tokens')
+
+
+def figure_heatmap_correlations(colonnes, correlations):
+    """Heatmap des corrélations entre statistiques des articles."""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 8))
+    corr_matrix = pd.DataFrame(correlations, index=colonnes, columns=colonnes)
+    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', vmin=-1, vmax=1)
+    plt.title('Heatmap des corrélations')
+
+
+def figure_zipf(rangs, frequences):
+    """Loi de Zipf : fréquence des mots en fonction de leur rang."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.loglog(rangs, frequences, alpha=.5)
+    plt.title('Loi de Zipf')
+    plt.xlabel('Rang du mot')
+    plt.ylabel('Fréquence du mot')
+
+
+def points_zipf(frequences_triees, max_points=2000):
+    """
+    Réduire une courbe rang-fréquence à des rangs espacés logarithmiquement.
+
+    Sur une échelle log-log, les rangs élevés sont si serrés que les garder tous
+    n'ajoute rien au tracé.
+
+    Args:
+        frequences_triees (array-like): Fréquences par ordre décroissant.
+        max_points (int, optional): Nombre maximal de points. Par défaut à 2000.
+
+    Returns:
+        tuple: Rangs (à partir de 1) et fréquences correspondantes.
+    """
+    frequences_triees = np.asarray(frequences_triees)
+    n = len(frequences_triees)
+    if n <= max_points:
+        rangs = np.arange(1, n + 1)
+    else:
+        rangs = np.unique(np.geomspace(1, n, max_points).astype(np.int64))
+    return rangs, frequences_triees[rangs - 1]
+
+
+def figure_precision_rappel(rappels, precisions, meilleur_rappel, meilleure_precision, meilleur_seuil):
+    """Courbe précision-rappel du seuil de similarité cosine, avec le meilleur seuil."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(8, 6))
+    plt.plot(rappels, precisions, color='purple')
+    plt.scatter([meilleur_rappel], [meilleure_precision], color='red', zorder=3,
+                label=f'Meilleur seuil (F-mesure) : {meilleur_seuil:.3f}')
+    plt.title('Courbe précision-rappel de la prédiction « Similaire »')
+    plt.xlabel('Rappel')
+    plt.ylabel('Précision')
+    plt.xlim(0, 1)
+    plt.ylim(0, 1.05)
+    plt.legend()
+
+
+def points_courbe(*colonnes, max_points=2000):
+    """
+    Réduire une courbe à au plus max_points points régulièrement espacés, extrémités comprises.
+
+    Args:
+        *colonnes (array-like): Colonnes de même longueur de la courbe.
+        max_points (int, optional): Nombre maximal de points. Par défaut à 2000.
+
+    Returns:
+        tuple: Colonnes réduites, en tableaux NumPy.
+    """
+    colonnes = [np.asarray(colonne) for colonne in colonnes]
+    n = len(colonnes[0])
+    if n <= max_points:
+        return tuple(colonnes)
+    indices = np.unique(np.linspace(0, n - 1, max_points).astype(np.int64))
+    return tuple(colonne[indices] for colonne in colonnes)
+
+
+def figure_longueurs_phrases(longueurs):
+    """Distribution des longueurs moyennes des phrases par article."""
+    import matplotlib.pyplot as plt
+
+    plt.figure()
+    plt.hist(longueurs, bins=20, alpha=0.75)
+    plt.xlabel("Average Sentence Length")
+    plt.ylabel("Frequency")
+    plt.title("Distribution of Average Sentence Lengths per Article")
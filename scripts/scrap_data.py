@@ -5,11 +5,18 @@ Ce module contient des fonctions pour lire des URL à partir d'un fichier,
 scraper des liens et des articles, et écrire les résultats dans un fichier JSON.
 """
 
-import requests
-import time
+import argparse
 import os
 import json
-from bs4 import BeautifulSoup
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from cache_html import CacheHTML
+from corpus_jsonl import EcrivainJSONL, chemin_partiel, est_jsonl, iterer_articles
+from client_http import ClientHTTP, LimiteurHote, client_partage
+from etat_crawl import EtatCrawl, normaliser_url
+from extraction_html import MOTEURS, extraire_article, extraire_liens
+from metriques import compter, instrumenter, session
+from quasi_doublons import IndexQuasiDoublons
 
 def lire_urls(chemin_fichier):
     """
@@ -24,27 +31,60 @@ def lire_urls(chemin_fichier):
     with open(chemin_fichier, 'r') as fichier:
         return [ligne.strip() for ligne in fichier if ligne.strip()]
 
-def scraper_links(url, niveau=0):
+def recuperer_html(url, client=None, cache=None, type_page='article', revalider=False):
+    """
+    Récupérer le HTML d'une page en consultant d'abord le cache.
+
+    Une page en cache et encore fraîche est servie sans requête. Sinon la page
+    est redemandée de façon conditionnelle et le cache est mis à jour.
+
+    Args:
+        url (str): URL de la page.
+        client (ClientHTTP, optional): Client HTTP à utiliser. Par défaut le client partagé.
+        cache (CacheHTML, optional): Cache à consulter. Par défaut aucun.
+        type_page (str, optional): 'article' ou 'liens', enregistré dans le cache.
+        revalider (bool, optional): Toujours revalider auprès du serveur, même si
+            la page en cache est fraîche.
+
+    Returns:
+        str: HTML brut de la page.
+    """
+    client = client or client_partage()
+    entree = cache.lire(url) if cache else None
+    if entree is None:
+        reponse = client.recuperer(url)
+    elif entree.frais and not revalider:
+        return entree.html
+    else:
+        reponse = client.recuperer(url, etag=entree.etag, last_modified=entree.last_modified)
+        if reponse.non_modifie:
+            cache.rafraichir(url)
+            return entree.html
+    if cache and not reponse.non_modifie:
+        cache.ecrire(url, reponse.texte, reponse.etag, reponse.last_modified, type_page)
+    return reponse.texte
+
+@instrumenter()
+def scraper_links(url, niveau=0, client=None, cache=None, moteur='strainer'):
     """
     Récupérer tous les liens d'une page.
 
+    Les pages de rubrique changent souvent : elles sont toujours revalidées
+    auprès du serveur, ce qui ne coûte qu'une réponse 304 si elles sont inchangées.
+
     Args:
         url (str): URL de la page à scraper.
         niveau (int, optional): Niveau de récursion pour l'affichage. Par défaut à 0.
+        client (ClientHTTP, optional): Client HTTP à utiliser. Par défaut le client partagé.
+        cache (CacheHTML, optional): Cache de pages à utiliser. Par défaut aucun.
+        moteur (str, optional): Moteur d'analyse HTML. Par défaut 'strainer'.
 
     Returns:
         list: Liste des URL trouvées sur la page.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        reponse = requests.get(url, headers=headers)
-        reponse.raise_for_status()
-
-        soupe = BeautifulSoup(reponse.text, 'html.parser')
-        liens = soupe.find_all('a')
-        urls = [lien['href'] for lien in liens]
+        html = recuperer_html(url, client, cache, type_page='liens', revalider=True)
+        urls = extraire_liens(html, moteur)
 
         for url in urls:
             print(f"{niveau * '--'}{url}")
@@ -54,44 +94,52 @@ def scraper_links(url, niveau=0):
         print(f"Échec du scraping pour {url} : {str(e)}")
         return []
 
-def scraper_article(url):
+@instrumenter()
+def scraper_article(url, client=None, cache=None, moteur='strainer'):
     """
     Récupérer le titre, le contenu d'un article complet et la description.
 
     Args:
         url (str): URL de l'article à scraper.
+        client (ClientHTTP, optional): Client HTTP à utiliser. Par défaut le client partagé.
+        cache (CacheHTML, optional): Cache de pages consulté avant le réseau. Par défaut aucun.
+        moteur (str, optional): Moteur d'analyse HTML. Par défaut 'strainer'.
 
     Returns:
         dict: Dictionnaire contenant l'URL, l'article complet et la description.
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        reponse = requests.get(url, headers=headers)
-        reponse.raise_for_status()
-
-        soupe = BeautifulSoup(reponse.text, 'html.parser')
-        balise_titre = soupe.find('title')
-        titre = balise_titre.get_text(strip=True) if balise_titre else 'Titre non trouvé'
-
-        balise_article = soupe.find('article')
-        if balise_article:
-            for meta in balise_article.find_all('meta', attrs={'name': 'description'}):
-                meta.decompose()
-            contenu = '\n'.join([p.get_text(strip=True) for p in balise_article.find_all(['p', 'h2', 'h3', 'h4'])])
-        else:
-            contenu = 'Contenu de l\'article non trouvé'
-
-        article_complet = f"{titre}\n\n{contenu}"
-        balise_description = soupe.find('meta', attrs={'name': 'description'})
-        description = balise_description['content'] if balise_description else 'Aucune description trouvée'
-
-        return {"id": url, "article": article_complet, "description": description}
+        return extraire_article(url, recuperer_html(url, client, cache), moteur)
     except Exception as e:
         print(f"Échec du scraping pour {url} : {str(e)}")
         return None
 
+def rejouer_cache(cache, moteur='strainer'):
+    """
+    Reconstruire les articles à partir du seul HTML en cache, sans accès réseau.
+
+    Args:
+        cache (CacheHTML): Cache de pages à relire.
+        moteur (str, optional): Moteur d'analyse HTML. Par défaut 'strainer'.
+
+    Returns:
+        tuple: Liste des articles valides et liste des URL dont l'extraction a échoué.
+    """
+    articles = []
+    failed_urls = []
+    for url in cache.urls(type_page='article'):
+        entree = cache.lire(url)
+        try:
+            article = extraire_article(url, entree.html, moteur) if entree else None
+        except Exception as e:
+            print(f"Échec de l'extraction pour {url} : {str(e)}")
+            article = None
+        if est_article_valide(article):
+            articles.append(article)
+        else:
+            failed_urls.append(url)
+    return articles, failed_urls
+
 def ecrire_json(donnees, fichier_json):
     """
     Écrire la liste de dictionnaires dans un fichier JSON.
@@ -107,54 +155,331 @@ def ecrire_json(donnees, fichier_json):
     with open(fichier_json, 'w', encoding='utf-8') as fichier:
         json.dump(donnees, fichier, ensure_ascii=False, indent=4)
 
-def principal():
+def est_article_valide(article):
     """
-    Fonction principale pour scraper les articles et enregistrer les données dans un fichier JSON.
+    Vérifier qu'un article scrapé est exploitable.
 
-    Lit les URL à partir d'un fichier texte, scrape les articles et les liens, 
-    et écrit les résultats dans un fichier JSON. Affiche également les URL échouées.
+    Args:
+        article (dict or None): Résultat de scraper_article.
+
+    Returns:
+        bool: True si l'article existe et est plus long que sa description.
     """
-    chemin_fichier = '../data/raw/url_leparisien.txt'
-    fichier_json = '../data/clean/donnees_scrapees.json'
+    return bool(article) and len(article['article']) > len(article['description'])
 
-    urls = lire_urls(chemin_fichier)
-    articles = []
-    failed_urls = []
-    valid_urls = 0
+def _consigner(etat, lien, article, sortie=None, doublons=None):
+    """
+    Enregistrer le résultat du scraping d'un lien dans l'état et, s'il est valide, dans la sortie.
+
+    Args:
+        etat (EtatCrawl): État du crawl.
+        lien (str): Lien scrapé.
+        article (dict or None): Résultat de scraper_article.
+        sortie (EcrivainJSONL, optional): Sortie en flux des articles valides.
+        doublons (IndexQuasiDoublons, optional): Index des articles connus ; un
+            quasi-doublon d'un article connu n'est pas enregistré.
+    """
+    if not est_article_valide(article):
+        etat.enregistrer_echec(lien)
+        return
+    nouveau = not etat.connait_article(lien)
+    if nouveau and doublons is not None:
+        signature = doublons.signature(article['article'])
+        trouve = doublons.doublon(signature=signature, exclure=article['id'])
+        if trouve is not None:
+            print(f"Quasi-doublon de {trouve[0]} ignoré : {lien}")
+            compter('quasi_doublons_ignores')
+            etat.enregistrer_doublon(lien)
+            return
+        doublons.ajouter(article['id'], signature=signature)
+    if nouveau and sortie is not None:
+        sortie.ecrire(article)
+    etat.enregistrer_article(lien, article)
+
+def client_poli(delai_par_hote=0.1, taille_pool=16, cache=None):
+    """
+    Créer un client HTTP qui espace les requêtes adressées à un même hôte.
+
+    Args:
+        delai_par_hote (float, optional): Délai minimal entre deux requêtes vers un même hôte.
+        taille_pool (int, optional): Nombre de connexions gardées ouvertes par hôte.
+        cache (CacheHTML, optional): Cache utilisé à côté du client ; s'il est fourni,
+            le client ne garde pas de copie des pages en mémoire.
+
+    Returns:
+        ClientHTTP: Client configuré.
+    """
+    return ClientHTTP(taille_pool=taille_pool, limiteur=LimiteurHote(delai_par_hote),
+                      memoriser_versions=cache is None)
+
+def crawler_sequentiel(urls, limite=1000, delai_par_hote=0.1, client=None, cache=None, etat=None,
+                       moteur='strainer', sortie=None, doublons=None):
+    """
+    Scraper les articles liés depuis les pages de rubrique, une requête à la fois.
+
+    Args:
+        urls (list): URL des pages de rubrique.
+        limite (int, optional): Nombre de nouveaux articles valides à atteindre. Par défaut à 1000.
+        delai_par_hote (float, optional): Délai minimal entre deux requêtes vers un même
+            hôte, ignoré si un client est fourni.
+        client (ClientHTTP, optional): Client HTTP à utiliser. Par défaut un client poli.
+        cache (CacheHTML, optional): Cache de pages consulté avant le réseau. Par défaut aucun.
+        etat (EtatCrawl, optional): État du crawl à compléter ou reprendre. Par défaut
+            un état en mémoire.
+        moteur (str, optional): Moteur d'analyse HTML. Par défaut 'strainer'.
+        sortie (EcrivainJSONL, optional): Sortie où écrire chaque article valide dès
+            qu'il est scrapé. Par défaut aucune.
+        doublons (IndexQuasiDoublons, optional): Index des articles connus, complété au
+            fil du crawl ; les quasi-doublons ne sont pas enregistrés. Par défaut aucun.
+
+    Returns:
+        tuple: Articles valides (itérateur sur l'état) et liste des URL échouées.
+    """
+    client = client or client_poli(delai_par_hote, cache=cache)
+    etat = etat or EtatCrawl()
 
     for url in urls:
-        if valid_urls >= 1000:
+        if etat.nouveaux_articles >= limite:
             break
-        links = scraper_links(url, niveau=1)
-        for link in links:
-            article = scraper_article(link)
-            if article and len(article['article']) > len(article['description']):
-                articles.append(article)
-                valid_urls += 1
-            else:
-                failed_urls.append(link)
-            time.sleep(0.1)
-
-    for url in failed_urls:
-        if valid_urls >= 1000:
+        if not etat.section_traitee(url):
+            etat.ajouter_section(url, scraper_links(url, niveau=1, client=client, cache=cache, moteur=moteur))
+        for link in etat.a_faire():
+            _consigner(etat, link, scraper_article(link, client=client, cache=cache, moteur=moteur), sortie, doublons)
+
+    # Seconde chance pour les liens qui n'ont échoué qu'une fois
+    for url in etat.echecs(tentatives_max=1):
+        if etat.nouveaux_articles >= limite:
             break
-        article = scraper_article(url)
-        if article and len(article['article']) > len(article['description']):
-            articles.append(article)
-            failed_urls.remove(url)
-            valid_urls += 1
-        time.sleep(0.1)
+        _consigner(etat, url, scraper_article(url, client=client, cache=cache, moteur=moteur), sortie, doublons)
+
+    return etat.articles(), etat.echecs()
+
+def _scraper_en_fenetre(executeur, liens, scraper, fenetre, etat, limite, sortie=None, doublons=None):
+    """
+    Scraper des liens en parallèle en conservant l'ordre d'origine des résultats.
+
+    Au plus `fenetre` requêtes sont en vol : le résultat le plus ancien est consommé
+    avant d'en soumettre une nouvelle, ce qui permet de s'arrêter net à la limite.
 
-    ecrire_json(articles, fichier_json)
+    Args:
+        executeur (ThreadPoolExecutor): Pool de threads partagé.
+        liens (iterable): Liens à scraper.
+        scraper (callable): Fonction appliquée à chaque lien.
+        fenetre (int): Nombre maximal de requêtes en vol.
+        etat (EtatCrawl): État du crawl, mis à jour par le seul thread appelant.
+        limite (int): Nombre de nouveaux articles valides à atteindre.
+        sortie (EcrivainJSONL, optional): Sortie en flux des articles valides.
+        doublons (IndexQuasiDoublons, optional): Index des quasi-doublons à écarter.
+    """
+    en_vol = deque()
+
+    def consommer():
+        lien, futur = en_vol.popleft()
+        article = futur.result()
+        if etat.nouveaux_articles < limite:
+            _consigner(etat, lien, article, sortie, doublons)
+
+    for lien in liens:
+        if etat.nouveaux_articles >= limite:
+            break
+        en_vol.append((lien, executeur.submit(scraper, lien)))
+        if len(en_vol) >= fenetre:
+            consommer()
+    while en_vol and etat.nouveaux_articles < limite:
+        consommer()
+    for _, futur in en_vol:
+        futur.cancel()
+
+def crawler_concurrent(urls, limite=1000, max_workers=8, delai_par_hote=0.1, client=None, cache=None, etat=None,
+                       moteur='strainer', sortie=None, doublons=None):
+    """
+    Scraper les pages de rubrique et les articles en parallèle dans un pool de threads.
+
+    Les résultats sont consommés dans le même ordre que le mode séquentiel ; seule
+    la latence réseau est recouverte. La politesse est assurée par hôte.
+
+    Args:
+        urls (list): URL des pages de rubrique.
+        limite (int, optional): Nombre de nouveaux articles valides à atteindre. Par défaut à 1000.
+        max_workers (int, optional): Nombre maximal de requêtes simultanées. Par défaut à 8.
+        delai_par_hote (float, optional): Délai minimal entre deux requêtes vers un même
+            hôte, ignoré si un client est fourni.
+        client (ClientHTTP, optional): Client HTTP à utiliser. Par défaut un client poli
+            dont le pool de connexions est dimensionné sur max_workers.
+        cache (CacheHTML, optional): Cache de pages consulté avant le réseau. Par défaut aucun.
+        etat (EtatCrawl, optional): État du crawl à compléter ou reprendre. Par défaut
+            un état en mémoire.
+        moteur (str, optional): Moteur d'analyse HTML. Par défaut 'strainer'.
+        sortie (EcrivainJSONL, optional): Sortie où écrire chaque article valide dès
+            qu'il est scrapé. Par défaut aucune.
+        doublons (IndexQuasiDoublons, optional): Index des articles connus, complété au
+            fil du crawl ; les quasi-doublons ne sont pas enregistrés. Par défaut aucun.
+
+    Returns:
+        tuple: Articles valides (itérateur sur l'état) et liste des URL échouées.
+    """
+    client = client or client_poli(delai_par_hote, taille_pool=max_workers, cache=cache)
+    etat = etat or EtatCrawl()
+
+    def liens_de(url):
+        return scraper_links(url, niveau=1, client=client, cache=cache, moteur=moteur)
+
+    def article_de(lien):
+        return scraper_article(lien, client=client, cache=cache, moteur=moteur)
+
+    fenetre = 2 * max_workers
+    executeur = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pages = [(url, None if etat.section_traitee(url) else executeur.submit(liens_de, url)) for url in urls]
+        soumis = set()
+
+        def liens_des_pages():
+            for url, page in pages:
+                if etat.nouveaux_articles >= limite:
+                    return
+                if page is not None:
+                    etat.ajouter_section(url, page.result())
+                for lien in etat.a_faire():
+                    if lien not in soumis:
+                        soumis.add(lien)
+                        yield lien
+
+        _scraper_en_fenetre(executeur, liens_des_pages(), article_de, fenetre, etat, limite, sortie, doublons)
+        # Seconde chance pour les liens qui n'ont échoué qu'une fois
+        _scraper_en_fenetre(executeur, iter(etat.echecs(tentatives_max=1)), article_de, fenetre, etat, limite, sortie,
+                            doublons)
+    finally:
+        executeur.shutdown(wait=True, cancel_futures=True)
+
+    return etat.articles(), etat.echecs()
+
+def principal(chemin_fichier='../data/raw/url_leparisien.txt',
+              fichier_json='../data/clean/donnees_scrapees.json',
+              limite=1000, concurrent=False, max_workers=8, delai_par_hote=0.1,
+              repertoire_cache='../data/cache/html', rejouer=False,
+              fichier_etat='../data/cache/etat_crawl.sqlite', incremental=False, moteur='strainer',
+              fichier_doublons='../data/cache/quasi_doublons.sqlite', seuil_doublons=0.8):
+    """
+    Fonction principale pour scraper les articles et enregistrer les données dans un fichier JSON.
+
+    Lit les URL à partir d'un fichier texte, scrape les articles et les liens, 
+    et écrit les résultats dans un fichier JSON. Affiche également les URL échouées.
+
+    Si le fichier de sortie est au format JSON Lines (.jsonl, .jsonl.gz, .jsonl.zst),
+    chaque article y est écrit dès qu'il est scrapé.
+
+    Si un fichier d'état subsiste d'un crawl interrompu, le crawl reprend là où il
+    s'était arrêté ; le fichier est supprimé une fois le JSON écrit.
+
+    Args:
+        chemin_fichier (str, optional): Fichier contenant les URL des pages de rubrique.
+        fichier_json (str, optional): Chemin du fichier JSON ou JSON Lines de sortie.
+        limite (int, optional): Nombre de nouveaux articles valides à atteindre. Par défaut à 1000.
+        concurrent (bool, optional): Scraper en parallèle plutôt qu'en séquentiel.
+        max_workers (int, optional): Nombre maximal de requêtes simultanées en mode concurrent.
+        delai_par_hote (float, optional): Délai minimal entre deux requêtes vers un même hôte.
+        repertoire_cache (str, optional): Répertoire du cache HTML, None pour s'en passer.
+        rejouer (bool, optional): Reconstruire le JSON à partir du seul cache, sans réseau.
+        fichier_etat (str, optional): Fichier SQLite de l'état du crawl, None pour un
+            état en mémoire sans reprise possible.
+        incremental (bool, optional): Conserver les articles déjà présents dans le JSON
+            de sortie et ne scraper que les liens inconnus.
+        moteur (str, optional): Moteur d'analyse HTML, parmi MOTEURS. Par défaut 'strainer'.
+        fichier_doublons (str, optional): Fichier SQLite de l'index des quasi-doublons,
+            conservé d'un crawl à l'autre en mode incrémental et reconstruit sinon ; None
+            pour enregistrer aussi les quasi-doublons.
+        seuil_doublons (float, optional): Similarité de Jaccard à partir de laquelle un
+            article est un quasi-doublon d'un article connu. Par défaut à 0,8.
+
+    Returns:
+        int: Nombre d'articles enregistrés.
+    """
+    cache = CacheHTML(repertoire_cache) if repertoire_cache else None
+    sortie = None
+    if rejouer:
+        if cache is None:
+            raise ValueError("Le mode rejeu nécessite un répertoire de cache.")
+        articles, failed_urls = rejouer_cache(cache, moteur)
+    else:
+        etat = EtatCrawl(fichier_etat or ':memory:')
+        if incremental and os.path.exists(fichier_json):
+            etat.importer_articles(iterer_articles(fichier_json))
+        elif etat.nouveaux_articles:
+            print(f"Reprise du crawl : {etat.nouveaux_articles} articles déjà scrapés.")
+        if est_jsonl(fichier_json):
+            # Articles écrits en flux par un crawl interrompu après son dernier checkpoint
+            if os.path.exists(chemin_partiel(fichier_json)):
+                for article in iterer_articles(chemin_partiel(fichier_json)):
+                    etat.enregistrer_article(normaliser_url(article['id']), article)
+            sortie = EcrivainJSONL(fichier_json)
+            for article in etat.articles():
+                sortie.ecrire(article)
+        doublons = None
+        if fichier_doublons:
+            doublons = IndexQuasiDoublons(fichier_doublons, seuil=seuil_doublons)
+            # Hors mode incrémental, le JSON de sortie est réécrit : l'index ne doit connaître
+            # que ses articles (crawl repris), pas ceux des crawls précédents
+            if not incremental:
+                doublons.vider()
+            # Articles déjà connus (crawl repris ou précédent), absents de l'index s'il est nouveau
+            for article in etat.articles():
+                doublons.ajouter(article['id'], article['article'])
+        urls = lire_urls(chemin_fichier)
+        if concurrent:
+            articles, failed_urls = crawler_concurrent(urls, limite, max_workers, delai_par_hote, cache=cache, etat=etat,
+                                                       moteur=moteur, sortie=sortie, doublons=doublons)
+        else:
+            articles, failed_urls = crawler_sequentiel(urls, limite, delai_par_hote, cache=cache, etat=etat,
+                                                       moteur=moteur, sortie=sortie, doublons=doublons)
+        if doublons is not None:
+            doublons.fermer()
 
-    with open(fichier_json, 'r', encoding='utf-8') as fichier:
-        donnees = json.load(fichier)
-        print(json.dumps(donnees, ensure_ascii=False, indent=4))
+    if sortie is None and est_jsonl(fichier_json):
+        sortie = EcrivainJSONL(fichier_json)
+        for article in articles:
+            sortie.ecrire(article)
+    if sortie is not None:
+        sortie.fermer()
+        nombre = sortie.ecrits
+    else:
+        articles = list(articles)
+        ecrire_json(articles, fichier_json)
+        nombre = len(articles)
+    if not rejouer:
+        etat.fermer(supprimer=True)
+    print(f"{nombre} articles enregistrés dans {fichier_json}")
+    compter('articles_enregistres', nombre)
 
     if failed_urls:
         print("Les URL suivantes ont échoué après deux tentatives :")
         for url in failed_urls:
             print(url)
+    return nombre
 
 if __name__ == "__main__":
-    principal()
+    parseur = argparse.ArgumentParser(description="Scraper les articles du Parisien.")
+    parseur.add_argument('--urls', default='../data/raw/url_leparisien.txt', help="Fichier des pages de rubrique")
+    parseur.add_argument('--sortie', default='../data/clean/donnees_scrapees.json', help="Fichier JSON ou JSON Lines (.jsonl, .jsonl.gz, .jsonl.zst) de sortie")
+    parseur.add_argument('--limite', type=int, default=1000, help="Nombre de nouveaux articles valides à atteindre")
+    parseur.add_argument('--concurrent', action='store_true', help="Scraper en parallèle")
+    parseur.add_argument('--max-workers', type=int, default=8, help="Nombre maximal de requêtes simultanées")
+    parseur.add_argument('--delai-par-hote', type=float, default=0.1, help="Délai minimal entre deux requêtes vers un même hôte")
+    parseur.add_argument('--cache', default='../data/cache/html', help="Répertoire du cache HTML")
+    parseur.add_argument('--sans-cache', action='store_true', help="Ne pas utiliser le cache HTML")
+    parseur.add_argument('--rejouer', action='store_true', help="Reconstruire le JSON à partir du cache, sans réseau")
+    parseur.add_argument('--etat', default='../data/cache/etat_crawl.sqlite', help="Fichier d'état pour reprendre un crawl interrompu")
+    parseur.add_argument('--incremental', action='store_true', help="Ne scraper que les articles absents du JSON de sortie")
+    parseur.add_argument('--moteur', choices=MOTEURS, default='strainer', help="Moteur d'analyse HTML")
+    parseur.add_argument('--doublons', default='../data/cache/quasi_doublons.sqlite',
+                         help="Index des quasi-doublons à ne pas enregistrer")
+    parseur.add_argument('--sans-doublons', action='store_true', help="Enregistrer aussi les quasi-doublons")
+    parseur.add_argument('--seuil-doublons', type=float, default=0.8,
+                         help="Similarité de Jaccard à partir de laquelle un article est un quasi-doublon")
+    parseur.add_argument('--metriques', help="Fichier JSON où écrire les mesures de l'exécution")
+    parseur.add_argument('--profil', help="Fichier où écrire le profil cProfile de l'exécution")
+    args = parseur.parse_args()
+    with session('scrap_data', args.metriques, args.profil) as mesure:
+        mesure.elements = principal(args.urls, args.sortie, args.limite, args.concurrent, args.max_workers,
+                                    args.delai_par_hote, None if args.sans_cache else args.cache, args.rejouer,
+                                    args.etat, args.incremental, args.moteur,
+                                    None if args.sans_doublons else args.doublons, args.seuil_doublons)
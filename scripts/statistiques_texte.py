@@ -0,0 +1,319 @@
+"""
+Module de calcul des statistiques textuelles du corpus en une seule passe.
+
+Chaque article et chaque description n'est tokenisé qu'une fois : la passe calcule
+les nombres de tokens, les longueurs, le ratio de compression et la catégorie de
+différence de tokens avec des opérations vectorisées pandas/NumPy, puis construit
+une seule matrice creuse de comptes (documents × vocabulaire) pour les articles et
+les descriptions. Les figures et les métriques de data_visualisation (termes
+fréquents, loi de Zipf, similarité cosine) réutilisent cette matrice au lieu de
+retokeniser le corpus. La similarité cosine entre un article et sa description
+est calculée couple par couple, sans la matrice de tous les couples.
+"""
+
+import numpy as np
+import pandas as pd
+
+from metriques import instrumenter
+
+CORPUS = ('article', 'description')
+
+SEUIL_DIFFERENCE = 50
+
+CATEGORIES = ('Grande différence', 'Similaire', 'Grande description')
+
+# Colonnes ajoutées par ajouter_statistiques
+COLONNES_STATISTIQUES = ['article_tokens', 'description_tokens', 'article_length', 'description_length',
+                         'compression_ratio', 'token_difference', 'category']
+
+
+def compter_tokens(textes):
+    """
+    Compter les tokens (mots séparés par des espaces) de chaque texte d'une série.
+
+    Équivalent vectorisé de len(texte.split()). Le découpage passe par str.split
+    plutôt que par une expression régulière : le moteur RE2 des chaînes Arrow ne
+    compte pas les espaces insécables parmi les espaces.
+
+    Args:
+        textes (Series): Textes à analyser.
+
+    Returns:
+        Series: Nombre de tokens de chaque texte.
+    """
+    return textes.str.split().str.len().astype('int64')
+
+
+def categoriser_difference(differences, seuil=SEUIL_DIFFERENCE):
+    """
+    Catégoriser les articles selon la différence de tokens entre article et description.
+
+    Args:
+        differences (array-like): Différences de tokens (article - description).
+        seuil (int, optional): Écart au-delà duquel la différence est grande. Par défaut à 50.
+
+    Returns:
+        numpy.ndarray: Catégorie de chaque article, parmi CATEGORIES.
+    """
+    differences = np.asarray(differences)
+    return np.select(
+        [differences > seuil, differences < -seuil],
+        ['Grande différence', 'Grande description'],
+        'Similaire',
+    )
+
+
+def ajouter_statistiques(data, seuil=SEUIL_DIFFERENCE):
+    """
+    Ajouter au corpus les colonnes de statistiques par article.
+
+    Les nombres de tokens déjà présents (corpus Parquet) sont réutilisés.
+
+    Args:
+        data (DataFrame): Corpus avec les colonnes article et description.
+        seuil (int, optional): Seuil de categoriser_difference. Par défaut à 50.
+
+    Returns:
+        DataFrame: Le même DataFrame, complété des colonnes article_tokens,
+        description_tokens, article_length, description_length, compression_ratio,
+        token_difference et category.
+    """
+    for colonne in CORPUS:
+        if f'{colonne}_tokens' not in data:
+            data[f'{colonne}_tokens'] = compter_tokens(data[colonne])
+    data['article_length'] = data['article'].str.len()
+    data['description_length'] = data['description'].str.len()
+    data['compression_ratio'] = data['description_length'] / data['article_length']
+    data['token_difference'] = data['article_tokens'] - data['description_tokens']
+    data['category'] = categoriser_difference(data['token_difference'].to_numpy(), seuil)
+    return data
+
+
+def trier_frequences(frequences, vocabulaire):
+    """
+    Classer les termes présents, du plus fréquent au moins fréquent.
+
+    Args:
+        frequences (numpy.ndarray): Fréquence de chaque terme du vocabulaire.
+        vocabulaire (numpy.ndarray): Terme de chaque colonne.
+
+    Returns:
+        list: Couples (terme, fréquence), les ex aequo dans l'ordre du vocabulaire.
+    """
+    indices = np.flatnonzero(frequences)
+    indices = indices[np.argsort(-frequences[indices], kind='stable')]
+    return list(zip(vocabulaire[indices].tolist(), frequences[indices].tolist()))
+
+
+def termes_les_plus_frequents(frequences, vocabulaire, n=20, masque=None):
+    """
+    Extraire les n termes les plus fréquents, sans trier tout le vocabulaire.
+
+    Les n meilleurs termes sont sélectionnés par argpartition ; seuls ces n
+    termes sont ensuite triés.
+
+    Args:
+        frequences (numpy.ndarray): Fréquence de chaque terme du vocabulaire.
+        vocabulaire (numpy.ndarray): Terme de chaque colonne.
+        n (int, optional): Nombre de termes. Par défaut à 20.
+        masque (numpy.ndarray, optional): Termes à écarter (booléen par colonne).
+
+    Returns:
+        list: Couples (terme, fréquence) par fréquence décroissante, les ex aequo
+        dans l'ordre alphabétique.
+    """
+    if masque is not None:
+        frequences = np.where(masque, 0, frequences)
+    k = min(n, np.count_nonzero(frequences))
+    if k == 0:
+        return []
+    indices = np.argpartition(-frequences, k - 1)[:k]
+    indices = sorted(indices, key=lambda indice: (-frequences[indice], vocabulaire[indice]))
+    return list(zip(vocabulaire[indices].tolist(), frequences[indices].tolist()))
+
+
+class StatistiquesTexte:
+    """
+    Résultat de la passe de statistiques : corpus enrichi et matrice de comptes.
+
+    La matrice de comptes empile les articles (lignes 0 à n-1) puis les descriptions
+    (lignes n à 2n-1) sur un vocabulaire commun, avec la tokenisation par défaut
+    de scikit-learn (celle de CountVectorizer et de TfidfVectorizer).
+    """
+
+    def __init__(self, data, comptes, vocabulaire):
+        """
+        Args:
+            data (DataFrame): Corpus enrichi par ajouter_statistiques.
+            comptes (scipy.sparse.csr_matrix): Comptes des termes, articles puis descriptions.
+            vocabulaire (numpy.ndarray): Terme de chaque colonne de la matrice.
+        """
+        self.data = data
+        self.comptes = comptes
+        self.vocabulaire = vocabulaire
+        self._frequences = {}
+
+    def comptes_corpus(self, corpus):
+        """
+        Renvoyer les lignes de la matrice de comptes d'un corpus.
+
+        Args:
+            corpus (str): 'article' ou 'description'.
+
+        Returns:
+            scipy.sparse.csr_matrix: Comptes des termes, un document par ligne.
+        """
+        n = len(self.data)
+        if corpus == 'article':
+            return self.comptes[:n]
+        if corpus == 'description':
+            return self.comptes[n:]
+        raise ValueError(f"Corpus inconnu : {corpus}")
+
+    def frequences(self, corpus):
+        """
+        Renvoyer le nombre total d'occurrences de chaque terme dans un corpus.
+
+        Args:
+            corpus (str): 'article' ou 'description'.
+
+        Returns:
+            numpy.ndarray: Fréquence de chaque terme du vocabulaire.
+        """
+        if corpus not in self._frequences:
+            self._frequences[corpus] = np.asarray(self.comptes_corpus(corpus).sum(axis=0)).ravel()
+        return self._frequences[corpus]
+
+    def frequences_triees(self, corpus):
+        """
+        Renvoyer les termes présents dans un corpus, du plus fréquent au moins fréquent.
+
+        Args:
+            corpus (str): 'article' ou 'description'.
+
+        Returns:
+            list: Couples (terme, fréquence).
+        """
+        return trier_frequences(self.frequences(corpus), self.vocabulaire)
+
+    def termes_frequents(self, n=20, corpus=CORPUS, mots_vides=None):
+        """
+        Extraire les n termes les plus fréquents de plusieurs corpus en un appel.
+
+        Les mots vides sont écartés avant le classement, comme avec l'option
+        stop_words de CountVectorizer, mais en masquant leurs colonnes dans la
+        matrice déjà construite plutôt qu'en retokenisant (termes_les_plus_frequents).
+
+        Args:
+            n (int, optional): Nombre de termes par corpus. Par défaut à 20.
+            corpus (tuple, optional): Corpus à traiter. Par défaut articles et descriptions.
+            mots_vides (iterable, optional): Termes à écarter. Par défaut aucun.
+
+        Returns:
+            dict: Pour chaque corpus, liste de couples (terme, fréquence) par
+            fréquence décroissante, les ex aequo dans l'ordre alphabétique.
+        """
+        masque = None
+        if mots_vides is not None:
+            masque = np.isin(self.vocabulaire, list(mots_vides))
+        return {nom: termes_les_plus_frequents(self.frequences(nom), self.vocabulaire, n, masque) for nom in corpus}
+
+    @instrumenter(elements=lambda vecteurs: vecteurs[0].shape[0])
+    def tfidf(self):
+        """
+        Pondérer la matrice de comptes en TF-IDF, comme TfidfVectorizer sur les deux corpus.
+
+        Returns:
+            tuple: Matrices TF-IDF des articles et des descriptions.
+        """
+        from sklearn.feature_extraction.text import TfidfTransformer
+
+        vecteurs = TfidfTransformer().fit_transform(self.comptes)
+        n = len(self.data)
+        return vecteurs[:n], vecteurs[n:]
+
+
+@instrumenter(elements=len)
+def similarite_cosine_appariee(a, b, taille_bloc=10000):
+    """
+    Calculer la similarité cosine de chaque ligne de a avec la ligne de même rang de b.
+
+    Seule la diagonale de cosine_similarity(a, b) est calculée : les lignes sont
+    normalisées (norme L2) puis multipliées terme à terme et sommées, par blocs de
+    lignes, sans jamais construire la matrice n × n.
+
+    Args:
+        a (scipy.sparse matrix or numpy.ndarray): Vecteurs des articles, un par ligne.
+        b (scipy.sparse matrix or numpy.ndarray): Vecteurs des descriptions, alignés sur a.
+        taille_bloc (int, optional): Nombre de lignes traitées à la fois. Par défaut à 10000.
+
+    Returns:
+        numpy.ndarray: Similarité cosine de chaque couple de lignes.
+
+    Raises:
+        ValueError: Si a et b n'ont pas la même forme.
+    """
+    from sklearn.preprocessing import normalize
+
+    if a.shape != b.shape:
+        raise ValueError(f"Matrices non alignées : {a.shape} et {b.shape}")
+    similarites = np.empty(a.shape[0])
+    for debut in range(0, a.shape[0], taille_bloc):
+        fin = debut + taille_bloc
+        bloc_a = normalize(a[debut:fin])
+        bloc_b = normalize(b[debut:fin])
+        if hasattr(bloc_a, 'multiply'):
+            produits = bloc_a.multiply(bloc_b).sum(axis=1)
+        else:
+            produits = (bloc_a * bloc_b).sum(axis=1)
+        similarites[debut:fin] = np.asarray(produits).ravel()
+    return similarites
+
+
+@instrumenter(elements=lambda statistiques: len(statistiques.data))
+def calculer_statistiques(data, seuil=SEUIL_DIFFERENCE, modele=None):
+    """
+    Calculer en une passe les statistiques par article et la matrice de comptes du corpus.
+
+    Args:
+        data (DataFrame): Corpus avec les colonnes article et description.
+        seuil (int, optional): Seuil de categoriser_difference. Par défaut à 50.
+        modele (ModeleTfidf, optional): Modèle persistant qui fournit les comptes :
+            seuls les textes qu'il ne connaît pas encore sont tokenisés. Par défaut
+            tout le corpus est tokenisé.
+
+    Returns:
+        StatistiquesTexte: Corpus enrichi et matrice de comptes.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    ajouter_statistiques(data, seuil)
+    documents = pd.concat([data['article'], data['description']], ignore_index=True)
+    if modele is not None:
+        comptes = modele.comptes(documents)
+        return StatistiquesTexte(data, comptes, modele.vocabulaire())
+    vectoriseur = CountVectorizer()
+    comptes = vectoriseur.fit_transform(documents)
+    return StatistiquesTexte(data, comptes, vectoriseur.get_feature_names_out())
+
+
+@instrumenter(elements=lambda statistiques: len(statistiques.data))
+def relire_statistiques(data, modele):
+    """
+    Reconstituer les statistiques d'un corpus déjà enrichi, à partir des comptes d'un modèle persistant.
+
+    Contrairement à calculer_statistiques, les colonnes de statistiques ne sont pas
+    recalculées (le corpus les a déjà, par exemple relues du CSV d'une étape
+    précédente) et les comptes sont relus du modèle, sans retokeniser les textes
+    qu'il connaît.
+
+    Args:
+        data (DataFrame): Corpus avec les colonnes article et description, et au
+            besoin les colonnes de COLONNES_STATISTIQUES.
+        modele (ModeleTfidf): Modèle persistant qui fournit les comptes.
+
+    Returns:
+        StatistiquesTexte: Corpus et matrice de comptes.
+    """
+    documents = pd.concat([data['article'], data['description']], ignore_index=True)
+    return StatistiquesTexte(data, modele.comptes(documents), modele.vocabulaire())
@@ -1,65 +1,119 @@
+import argparse
+import csv
 import os
-import spacy
 import pandas as pd
-import matplotlib.pyplot as plt
+import tokeniseur_regex
+from cache_docs import CacheDocs
+from metriques import session
+from rapport_figures import Figure, figure_longueurs_phrases, rendre_figures
+from traitement_spacy import MODELE_FR, SEGMENTEURS, charger_modele_phrases, longueurs_moyennes_phrases
 
-# Charger le modèle SpaCy pour le français
-def load_spacy_model():
+# Moteurs de tokenisation et de segmentation en phrases
+MOTEURS = ("spacy", "regex")
+
+# Charger le modèle SpaCy pour le français (complet, ou réduit à la segmentation en phrases) ;
+# un modèle absent (OSError), incompatible avec la version de SpaCy ou sans le segmenteur
+# demandé (ValueError), ou une dépendance manquante (ImportError) laissent la place au
+# tokeniseur par expressions régulières
+def load_spacy_model(segmenteur=None):
     try:
-        nlp = spacy.load("fr_core_news_sm")
-    except OSError:
-        print("Le modèle SpaCy pour le français n'a pas pu être chargé.")
+        if segmenteur is None:
+            import spacy
+
+            nlp = spacy.load(MODELE_FR)
+        else:
+            nlp = charger_modele_phrases(MODELE_FR, segmenteur)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Le modèle SpaCy pour le français n'a pas pu être chargé : {e}")
         nlp = None
     return nlp
 
-# Tokenisation du texte en fonction de la langue (ici, uniquement en français)
-def tokenize(nlp, text):
+# Tokenisation du texte en fonction de la langue (ici, uniquement en français),
+# en relisant le document annoté depuis le cache quand l'article y est déjà ;
+# sans modèle SpaCy, le tokeniseur par expressions régulières prend le relais
+def tokenize(nlp, text, cache=None, article_id=None):
     if nlp:
-        doc = nlp(text)
+        if cache is not None and article_id is not None:
+            _, doc = next(cache.docs(nlp, [article_id], [text]))
+        else:
+            doc = nlp(text)
         return [token.text for token in doc]
     else:
-        return []
+        return tokeniseur_regex.tokeniser(text)
 
-# Charger le modèle SpaCy
-nlp = load_spacy_model()
+# Calculer la longueur moyenne des phrases par article, les articles passant par lots dans nlp.pipe
+def average_sentence_length(data, nlp, batch_size=64, n_process=1, cache=None):
+    return dict(sentence_lengths(data, nlp, batch_size, n_process, cache))
 
-# Calculer la longueur moyenne des phrases par article
-def average_sentence_length(data, nlp):
-    avg_lengths = {}
-    for _, row in data.iterrows():
-        article_id = row["id"]
-        text = row["article"]
-        doc = nlp(text)
-        total_sentences = len(list(doc.sents))
-        total_words = len(text.split())
-        avg_lengths[article_id] = total_words / total_sentences if total_sentences > 0 else 0
-    return avg_lengths
+# Longueurs moyennes des phrases au fil de l'eau, par SpaCy ou, sans modèle, par expressions régulières
+def sentence_lengths(data, nlp, batch_size=64, n_process=1, cache=None):
+    if nlp is None:
+        return tokeniseur_regex.longueurs_moyennes_phrases(data["id"], data["article"])
+    return longueurs_moyennes_phrases(nlp, data["id"], data["article"], batch_size, n_process, cache)
 
-# Vérifier et créer les répertoires s'ils n'existent pas
-resultats_dirs = ["./results/CSV", "./results/IMAGES"]
-for directory in resultats_dirs:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    else:
-        print(f"Le répertoire '{directory}' existe déjà.")
+# Écrire les longueurs moyennes des phrases au fur et à mesure de leur calcul
+def write_sentence_lengths(resultats, chemin):
+    with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(["Article ID", "Average Sentence Length"])
+        for article_id, longueur in resultats:
+            ecrivain.writerow([article_id, float(longueur)])
+
+if __name__ == "__main__":
+    parseur = argparse.ArgumentParser(description="Calculer la longueur moyenne des phrases par article.")
+    parseur.add_argument("--moteur", choices=MOTEURS, default="spacy",
+                         help="Segmentation par SpaCy, ou par expressions régulières (sans modèle, bien plus rapide)")
+    parseur.add_argument("--batch-size", type=int, default=64, help="Nombre d'articles par lot passé à spaCy")
+    parseur.add_argument("--n-process", type=int, default=1, help="Nombre de processus spaCy (-1 : tous les cœurs)")
+    parseur.add_argument("--segmenteur", choices=SEGMENTEURS, default="senter",
+                         help="Composant qui découpe les phrases : senter (rapide) ou parser (modèle complet)")
+    parseur.add_argument("--cache-docs", default="../data/cache/docs",
+                         help="Répertoire du cache des documents annotés par spaCy")
+    parseur.add_argument("--sans-cache", action="store_true", help="Annoter tous les articles sans passer par le cache")
+    parseur.add_argument("--entree", default="../data/clean/donnees_scrapees.csv", help="Fichier CSV des articles")
+    parseur.add_argument("--resultats", default="./results", help="Répertoire des résultats (CSV et IMAGES)")
+    parseur.add_argument("--metriques", help="Fichier JSON où écrire les mesures de l'exécution")
+    parseur.add_argument("--profil", help="Fichier où écrire le profil cProfile de l'exécution")
+    args = parseur.parse_args()
+
+    with session("test_de_significativite", args.metriques, args.profil) as mesure:
+        # Charger le modèle SpaCy, sans les composants inutiles à la segmentation en phrases
+        nlp = load_spacy_model(args.segmenteur) if args.moteur == "spacy" else None
+        if nlp is None:
+            print("Segmentation en phrases par expressions régulières.")
+
+        # Vérifier et créer les répertoires s'ils n'existent pas
+        resultats_dirs = [os.path.join(args.resultats, "CSV"), os.path.join(args.resultats, "IMAGES")]
+        for directory in resultats_dirs:
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+            else:
+                print(f"Le répertoire '{directory}' existe déjà.")
 
-# Charger les données
-data = pd.read_csv("/Users/anissa/Documents/Anissa2/Master_TAL/OTC/OutilsdeTraitementdeCorpus/data/clean/donnees_scrapees.csv")  # Remplacer par le chemin correct vers votre fichier CSV
-print("Les données ont été chargées avec succès.")
+        # Charger les données
+        data = pd.read_csv(args.entree)
+        mesure.elements = len(data)
+        print("Les données ont été chargées avec succès.")
 
-# Calculer et sauvegarder la longueur moyenne des phrases par article
-avg_sentence_lengths = average_sentence_length(data, nlp)
-avg_sentence_lengths_df = pd.DataFrame(avg_sentence_lengths.items(), columns=["Article ID", "Average Sentence Length"])
-print(avg_sentence_lengths_df)  # Affichage des longueurs moyennes des phrases
-avg_sentence_lengths_df.to_csv("./results/CSV/avg_sentence_lengths.csv", index=False)
-print("La longueur moyenne des phrases par article a été calculée et enregistrée avec succès.")
+        # Calculer et sauvegarder la longueur moyenne des phrases par article
+        # Les articles déjà annotés lors d'une exécution précédente sont relus depuis le cache
+        cache = None if args.sans_cache or nlp is None else CacheDocs(args.cache_docs)
+        resultats = sentence_lengths(data, nlp, args.batch_size, args.n_process, cache)
+        write_sentence_lengths(resultats, os.path.join(resultats_dirs[0], "avg_sentence_lengths.csv"))
+        if cache is not None:
+            print(f"{cache.lus} articles relus depuis le cache, {cache.annotes} articles annotés.")
+            # Tout le corpus a été lu : les textes qui n'y sont plus quittent le cache
+            collecte = cache.collecter()
+            print(f"{collecte['oublies']} articles oubliés du cache, {collecte['fragments_supprimes']} fragments "
+                  f"supprimés et {collecte['fragments_reecrits']} réécrits.")
+            cache.fermer()
+        avg_sentence_lengths_df = pd.read_csv(os.path.join(resultats_dirs[0], "avg_sentence_lengths.csv"))
+        print(avg_sentence_lengths_df)  # Affichage des longueurs moyennes des phrases
+        print("La longueur moyenne des phrases par article a été calculée et enregistrée avec succès.")
 
-# Tracer la distribution des longueurs moyennes des phrases par article
-plt.hist(avg_sentence_lengths_df["Average Sentence Length"], bins=20, alpha=0.75)
-plt.xlabel("Average Sentence Length")
-plt.ylabel("Frequency")
-plt.title("Distribution of Average Sentence Lengths per Article")
-plt.savefig("./results/IMAGES/avg_sentence_lengths_distribution.png", facecolor="white", dpi=300)
-plt.show()
+        # Tracer la distribution des longueurs moyennes des phrases par article, sans affichage
+        rendre_figures([Figure("avg_sentence_lengths_distribution", figure_longueurs_phrases,
+                               {"longueurs": avg_sentence_lengths_df["Average Sentence Length"].to_numpy()})],
+                       resultats_dirs[1], dpi=300)
 
-print("La distribution des longueurs moyennes des phrases par article a été calculée et enregistrée avec succès.")
+        print("La distribution des longueurs moyennes des phrases par article a été calculée et enregistrée avec succès.")
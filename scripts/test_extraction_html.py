@@ -0,0 +1,61 @@
+"""
+Concordance des moteurs d'extraction HTML avec l'extracteur d'origine ('html.parser'),
+sur un site synthétique de corpus_synthetique et sur des pages aux cas limites.
+"""
+
+import pytest
+
+from bench_extraction import charger_pages, mesurer
+from corpus_synthetique import generer_site
+from extraction_html import MOTEURS, extraire_article, extraire_liens
+
+# Pages aux cas limites bien formées : lxml et html.parser n'y construisent pas
+# d'arbres différents (contrairement à un <p> imbriqué dans un autre <p>)
+PAGES_LIMITES = {
+    'vide.html': '',
+    'sans_article.html': '<html><head><title>Seul titre</title></head><body><p>Hors article</p></body></html>',
+    'sans_description.html': '<html><head><title> Titre </title></head>'
+                             '<body><article><h2>Intertitre</h2><p>Un  paragraphe</p></article></body></html>',
+    'scripts_et_entites.html': '<html><head><title>A &amp; B</title>'
+                               '<meta name="description" content="L&#39;été &quot;chaud&quot;"></head>'
+                               '<body><article><p>Avant<script>var x = 1;</script> après</p>'
+                               '<p><b>Gras</b> et <i>italique</i></p><h3>Fin</h3></article></body></html>',
+    'liens.html': '<html><body><a href="/a">A</a><a name="ancre">sans cible</a>'
+                  '<a href="https://exemple.fr/b?x=1&amp;y=2">B</a><a href="">vide</a></body></html>',
+}
+
+
+@pytest.fixture(scope='module')
+def pages(tmp_path_factory):
+    repertoire = tmp_path_factory.mktemp('site')
+    generer_site(str(repertoire), 'http://exemple.test', pages=30, rubriques=3, graine=7)
+    pages = charger_pages(str(repertoire / 'articles')) + charger_pages(str(repertoire))
+    return pages + list(PAGES_LIMITES.items())
+
+
+@pytest.mark.parametrize('moteur', MOTEURS)
+def test_articles_identiques(pages, moteur):
+    if moteur == 'lxml':
+        pytest.importorskip('lxml')
+    for url, html in pages:
+        assert extraire_article(url, html, moteur) == extraire_article(url, html, 'html.parser'), url
+
+
+@pytest.mark.parametrize('moteur', MOTEURS)
+def test_liens_identiques(pages, moteur):
+    if moteur == 'lxml':
+        pytest.importorskip('lxml')
+    for url, html in pages:
+        assert extraire_liens(html, moteur) == extraire_liens(html, 'html.parser'), url
+
+
+def test_banc_sans_ecart(pages):
+    pytest.importorskip('lxml')
+    resultats = mesurer(pages, repetitions=1)
+    for moteur, mesure in resultats.items():
+        assert mesure['differences_articles'] == mesure['differences_liens'] == 0, moteur
+
+
+def test_moteur_inconnu():
+    with pytest.raises(ValueError):
+        extraire_article('u', '<html></html>', 'inconnu')
@@ -0,0 +1,63 @@
+"""
+Entrées des étapes de la chaîne : les modules importés, même indirectement, en font partie.
+"""
+
+import os
+
+import pytest
+
+from pipeline import REPERTOIRE_SCRIPTS, Etape, charger_configuration, declarer_etapes, executer, modules_locaux
+
+
+def _ecrire(chemin, contenu):
+    with open(chemin, 'w', encoding='utf-8') as fichier:
+        fichier.write(contenu)
+
+
+def etape_copie(chemins, parametres):
+    with open(chemins['entree'], 'r', encoding='utf-8') as entree, \
+            open(chemins['sortie'], 'w', encoding='utf-8') as sortie:
+        sortie.write(entree.read())
+    return 1
+
+
+@pytest.fixture
+def modules(tmp_path):
+    # a importe b au niveau du module, b importe c dans une fonction ; json n'est pas local
+    _ecrire(tmp_path / 'a.py', 'import json\nimport b\n')
+    _ecrire(tmp_path / 'b.py', 'def f():\n    from c import g\n    return g()\n')
+    _ecrire(tmp_path / 'c.py', 'def g():\n    return 1\n')
+    _ecrire(tmp_path / 'd.py', 'X = 1\n')
+    return tmp_path
+
+
+def test_fermeture_transitive(modules):
+    assert modules_locaux(['a'], str(modules)) == [str(modules / f'{nom}.py') for nom in ('a', 'b', 'c')]
+
+
+def test_dependance_modifiee_relance_etape(modules):
+    chemins = {'entree': str(modules / 'entree.txt'), 'sortie': str(modules / 'sortie.txt')}
+    _ecrire(chemins['entree'], 'texte')
+    etape = Etape('copie', etape_copie, [chemins['entree']] + modules_locaux(['a'], str(modules)),
+                  [chemins['sortie']], {})
+    etat = str(modules / 'etat.json')
+
+    assert executer([etape], chemins, etat, max_workers=1) == {'copie': 'exécutée'}
+    assert executer([etape], chemins, etat, max_workers=1) == {'copie': 'inchangée'}
+    # Module importé seulement par un module importé par l'étape
+    _ecrire(modules / 'c.py', 'def g():\n    return 2\n')
+    assert executer([etape], chemins, etat, max_workers=1) == {'copie': 'exécutée'}
+    assert executer([etape], chemins, etat, max_workers=1) == {'copie': 'inchangée'}
+
+
+@pytest.mark.parametrize('nom, attendus', [
+    ('scraping', ['client_http', 'cache_html', 'etat_crawl']),
+    ('chargement', ['statistiques_texte']),
+    ('decoupage', ['corpus_jsonl']),
+    ('phrases', ['cache_docs', 'rapport_figures']),
+    ('rapport', ['modele_tfidf', 'corpus_jsonl', 'analyse_par_lots']),
+])
+def test_modules_des_etapes(nom, attendus):
+    etapes = {etape.nom: etape for etape in declarer_etapes(charger_configuration())}
+    for module in attendus:
+        assert os.path.join(REPERTOIRE_SCRIPTS, f'{module}.py') in etapes[nom].entrees
@@ -0,0 +1,65 @@
+"""
+Similarité cosine appariée : égale à la diagonale de cosine_similarity de scikit-learn.
+"""
+
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from statistiques_texte import similarite_cosine_appariee
+
+ARTICLES = [
+    "le conseil municipal vote le budget de la ville",
+    "la finale se joue ce soir au stade de france",
+    "les prix de l'énergie augmentent encore cet hiver",
+    "un texte sans aucun mot commun",
+    "",
+]
+
+DESCRIPTIONS = [
+    "la ville vote son budget",
+    "finale au stade ce soir",
+    "hausse des prix de l'énergie",
+    "rien à voir",
+    "description d'un article vide",
+]
+
+
+@pytest.fixture(scope='module')
+def matrices():
+    vectoriseur = TfidfVectorizer().fit(ARTICLES + DESCRIPTIONS)
+    return vectoriseur.transform(ARTICLES).tocsr(), vectoriseur.transform(DESCRIPTIONS).tocsr()
+
+
+@pytest.mark.parametrize('taille_bloc', [1, 2, 10000])
+def test_diagonale_cosine_similarity(matrices, taille_bloc):
+    articles, descriptions = matrices
+    # Ligne entièrement nulle : l'article vide n'a aucun terme
+    assert articles[4].nnz == 0
+    attendu = cosine_similarity(articles, descriptions).diagonal()
+    np.testing.assert_allclose(similarite_cosine_appariee(articles, descriptions, taille_bloc), attendu,
+                               rtol=1e-12, atol=1e-15)
+
+
+def test_matrices_denses(matrices):
+    articles, descriptions = (matrice.toarray() for matrice in matrices)
+    np.testing.assert_allclose(similarite_cosine_appariee(articles, descriptions),
+                               cosine_similarity(articles, descriptions).diagonal(), rtol=1e-12, atol=1e-15)
+
+
+def test_aleatoire_creux():
+    rng = np.random.default_rng(0)
+    a = sp.random(300, 50, density=0.05, format='lil', random_state=rng)
+    b = sp.random(300, 50, density=0.05, format='lil', random_state=rng)
+    a[7] = 0
+    b[11] = 0
+    a, b = a.tocsr(), b.tocsr()
+    np.testing.assert_allclose(similarite_cosine_appariee(a, b, taille_bloc=64),
+                               cosine_similarity(a, b).diagonal(), rtol=1e-12, atol=1e-15)
+
+
+def test_formes_differentes():
+    with pytest.raises(ValueError):
+        similarite_cosine_appariee(sp.csr_matrix((3, 4)), sp.csr_matrix((2, 4)))
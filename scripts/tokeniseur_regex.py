@@ -0,0 +1,168 @@
+"""
+Module de tokenisation et de segmentation en phrases du français par expressions régulières.
+
+C'est une alternative légère à spaCy, sans modèle à charger, pour les statistiques
+qui n'ont besoin que de compter des tokens et des phrases :
+
+- les élisions (l', d', qu', jusqu'...) forment un token à part, apostrophe droite
+  ou typographique, alors qu'aujourd'hui reste un seul mot ;
+- les abréviations courantes (M., Mme, p., etc.) gardent leur point et ne
+  terminent pas la phrase, pas plus que les initiales (J. Dupont) ;
+- une phrase se termine par . ! ? ou … suivis d'une majuscule ou d'un chiffre,
+  ou par un retour à la ligne (titre, paragraphes des articles scrapés).
+
+Le script bench_tokenisation.py mesure son débit et sa concordance avec spaCy.
+"""
+
+import re
+
+from metriques import instrumenter
+
+ABREVIATIONS = [
+    'M', 'MM', 'Mme', 'Mmes', 'Mlle', 'Mlles', 'Me', 'Mgr', 'Dr', 'Pr', 'St', 'Ste',
+    'av', 'apr', 'bd', 'cf', 'chap', 'coll', 'env', 'etc', 'ex', 'fig', 'hab', 'min',
+    'max', 'n', 'no', 'p', 'pp', 'réf', 'sq', 'tél', 'vol', 'vs',
+    'janv', 'févr', 'avr', 'juill', 'sept', 'oct', 'nov', 'déc',
+]
+
+# Les plus longues d'abord, pour que « Mme. » ne s'arrête pas à « M »
+_ABREVIATIONS = '|'.join(sorted((re.escape(abreviation) for abreviation in ABREVIATIONS), key=len, reverse=True))
+
+MOTIF_TOKEN = re.compile(
+    rf"""
+    (?<!\w)(?i:jusqu|lorsqu|puisqu|quoiqu|presqu|qu|[cdjlmnst])['’]   # élision
+    | (?<!\w)(?:{_ABREVIATIONS}|J\.-C|[A-ZÀ-ÖØ-Þ])\.(?!\w)            # abréviation, initiale
+    | \d+(?:[.,]\d+)*                                                 # nombre
+    | \w+(?:['’-]\w+)*                                                # mot
+    | \.\.\.|…                                                        # points de suspension
+    | [^\w\s]                                                         # ponctuation
+    """,
+    re.VERBOSE,
+)
+
+# Fin de phrase candidate : ponctuation forte (et guillemets ou parenthèses fermants, qui
+# restent dans la phrase), puis une majuscule ou un chiffre ; ou retour à la ligne
+MOTIF_FIN_PHRASE = re.compile(
+    r"""
+    (?<=[.!?…])(?P<fermeture>(?:[ \t\xa0]*[»"”’)\]])*)[ \t\xa0]+(?=[«"“(\[—–-]?[ \t\xa0]*[A-ZÀ-ÖØ-Þ0-9])
+    | \s*\n\s*
+    """,
+    re.VERBOSE,
+)
+
+# Point qui ne termine pas une phrase : abréviation ou initiale
+MOTIF_FAUSSE_FIN = re.compile(rf"(?<!\w)(?:{_ABREVIATIONS}|[A-ZÀ-ÖØ-Þ])\.$")
+
+
+def tokeniser(texte):
+    """
+    Découper un texte en tokens.
+
+    Args:
+        texte (str): Texte à découper.
+
+    Returns:
+        list: Tokens, dans l'ordre du texte.
+    """
+    return MOTIF_TOKEN.findall(texte)
+
+
+def nombre_tokens(texte):
+    """
+    Compter les tokens d'un texte.
+
+    Args:
+        texte (str): Texte à analyser.
+
+    Returns:
+        int: Nombre de tokens.
+    """
+    return len(MOTIF_TOKEN.findall(texte))
+
+
+def positions_tokens(texte):
+    """
+    Renvoyer la position de chaque token dans le texte.
+
+    Args:
+        texte (str): Texte à découper.
+
+    Returns:
+        list: Couples (début, fin) des tokens.
+    """
+    return [correspondance.span() for correspondance in MOTIF_TOKEN.finditer(texte)]
+
+
+def positions_phrases(texte):
+    """
+    Renvoyer la position de chaque phrase dans le texte.
+
+    Args:
+        texte (str): Texte à segmenter.
+
+    Returns:
+        list: Couples (début, fin) des phrases, sans les espaces qui les entourent.
+    """
+    phrases = []
+    debut = 0
+    for fin in MOTIF_FIN_PHRASE.finditer(texte):
+        if '\n' not in fin.group() and MOTIF_FAUSSE_FIN.search(texte, debut, fin.start()):
+            continue
+        _ajouter_phrase(phrases, texte, debut, fin.end('fermeture') if fin.group('fermeture') else fin.start())
+        debut = fin.end()
+    _ajouter_phrase(phrases, texte, debut, len(texte))
+    return phrases
+
+
+def _ajouter_phrase(phrases, texte, debut, fin):
+    segment = texte[debut:fin]
+    contenu = segment.strip()
+    if contenu:
+        debut += len(segment) - len(segment.lstrip())
+        phrases.append((debut, debut + len(contenu)))
+
+
+def segmenter_phrases(texte):
+    """
+    Découper un texte en phrases.
+
+    Args:
+        texte (str): Texte à segmenter.
+
+    Returns:
+        list: Phrases, dans l'ordre du texte.
+    """
+    return [texte[debut:fin] for debut, fin in positions_phrases(texte)]
+
+
+def nombre_phrases(texte):
+    """
+    Compter les phrases d'un texte.
+
+    Args:
+        texte (str): Texte à analyser.
+
+    Returns:
+        int: Nombre de phrases.
+    """
+    return len(positions_phrases(texte))
+
+
+@instrumenter()
+def longueurs_moyennes_phrases(ids, textes):
+    """
+    Calculer la longueur moyenne des phrases (en mots) de chaque texte, au fil de l'eau.
+
+    Même résultat que traitement_spacy.longueurs_moyennes_phrases, avec la
+    segmentation en phrases de ce module.
+
+    Args:
+        ids (iterable): Identifiants des textes.
+        textes (iterable): Textes, dans le même ordre que les identifiants.
+
+    Yields:
+        tuple: Identifiant et longueur moyenne des phrases (0 sans phrase).
+    """
+    for identifiant, texte in zip(ids, textes):
+        phrases = nombre_phrases(texte)
+        yield identifiant, len(texte.split()) / phrases if phrases > 0 else 0
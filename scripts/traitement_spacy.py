@@ -0,0 +1,103 @@
+"""
+Module de traitement du corpus par spaCy, par lots et en flux.
+
+Le modèle n'est chargé qu'avec les composants utiles à l'analyse demandée : pour
+les statistiques de phrases, les composants de reconnaissance d'entités, de
+lemmatisation et de morphologie sont exclus, et l'analyseur syntaxique peut être
+remplacé par le segmenteur de phrases 'senter', bien plus rapide. Les textes
+passent par nlp.pipe, par lots de batch_size et éventuellement sur plusieurs
+processus, et les résultats sont produits au fil de l'eau. Avec un CacheDocs
+(module cache_docs), les documents déjà annotés sont relus au lieu d'être recalculés.
+
+spaCy n'est importé qu'au chargement du modèle : les constantes du module restent
+utilisables sans lui, par exemple par le tokeniseur par expressions régulières.
+"""
+
+from metriques import instrumenter
+
+MODELE_FR = 'fr_core_news_sm'
+
+# Composants de fr_core_news_sm dont la segmentation en phrases n'a pas besoin
+COMPOSANTS_INUTILES = ['ner', 'lemmatizer', 'attribute_ruler', 'morphologizer']
+
+SEGMENTEURS = ('senter', 'parser')
+
+
+def charger_modele_phrases(nom=MODELE_FR, segmenteur='senter'):
+    """
+    Charger un modèle spaCy réduit à la tokenisation et à la segmentation en phrases.
+
+    Args:
+        nom (str, optional): Nom ou chemin du modèle. Par défaut 'fr_core_news_sm'.
+        segmenteur (str, optional): 'senter' (segmenteur dédié, désactivé par défaut
+            dans les modèles spaCy) ou 'parser' (frontières issues de l'analyse
+            syntaxique, comme le modèle complet). Par défaut 'senter'.
+
+    Returns:
+        spacy.language.Language: Modèle chargé.
+
+    Raises:
+        OSError: Si le modèle n'est pas installé.
+        ValueError: Si le segmenteur est inconnu ou absent du modèle.
+        ImportError: Si spaCy n'est pas installé.
+    """
+    import spacy
+
+    if segmenteur not in SEGMENTEURS:
+        raise ValueError(f"Segmenteur inconnu : {segmenteur}")
+    autre = 'parser' if segmenteur == 'senter' else 'senter'
+    nlp = spacy.load(nom, exclude=COMPOSANTS_INUTILES + [autre])
+    if segmenteur not in nlp.component_names:
+        raise ValueError(f"Le modèle {nom} n'a pas de composant {segmenteur}.")
+    if segmenteur in nlp.disabled:
+        nlp.enable_pipe(segmenteur)
+    # Le tok2vec partagé ne sert que si un composant actif l'écoute
+    if 'tok2vec' in nlp.pipe_names:
+        ecouteurs = set(nlp.get_pipe('tok2vec').listening_components)
+        if not ecouteurs & set(nlp.pipe_names):
+            nlp.disable_pipe('tok2vec')
+    return nlp
+
+
+def iterer_docs(nlp, ids, textes, batch_size=64, n_process=1, cache=None):
+    """
+    Annoter des textes par lots, ou les relire depuis un cache de documents.
+
+    Args:
+        nlp (spacy.language.Language): Modèle.
+        ids (iterable): Identifiants des textes.
+        textes (iterable): Textes, dans le même ordre que les identifiants.
+        batch_size (int, optional): Nombre de textes par lot. Par défaut à 64.
+        n_process (int, optional): Nombre de processus. Par défaut à 1.
+        cache (CacheDocs, optional): Cache des documents déjà annotés. Par défaut aucun.
+
+    Yields:
+        tuple: Identifiant et Doc de chaque texte, dans l'ordre.
+    """
+    if cache is not None:
+        yield from cache.docs(nlp, ids, textes, batch_size, n_process)
+        return
+    for doc, identifiant in nlp.pipe(zip(textes, ids), as_tuples=True, batch_size=batch_size, n_process=n_process):
+        yield identifiant, doc
+
+
+@instrumenter()
+def longueurs_moyennes_phrases(nlp, ids, textes, batch_size=64, n_process=1, cache=None):
+    """
+    Calculer la longueur moyenne des phrases (en mots) de chaque texte, au fil de l'eau.
+
+    Args:
+        nlp (spacy.language.Language): Modèle qui segmente en phrases.
+        ids (iterable): Identifiants des textes.
+        textes (iterable): Textes, dans le même ordre que les identifiants.
+        batch_size (int, optional): Nombre de textes par lot. Par défaut à 64.
+        n_process (int, optional): Nombre de processus. Par défaut à 1.
+        cache (CacheDocs, optional): Cache des documents déjà annotés. Par défaut aucun.
+
+    Yields:
+        tuple: Identifiant et longueur moyenne des phrases (0 sans phrase).
+    """
+    for identifiant, doc in iterer_docs(nlp, ids, textes, batch_size, n_process, cache):
+        nombre_phrases = sum(1 for _ in doc.sents)
+        nombre_mots = len(doc.text.split())
+        yield identifiant, nombre_mots / nombre_phrases if nombre_phrases > 0 else 0